@@ -1,7 +1,16 @@
-# Import necessary components for the app to work
-from app.core.supabase_client import supabase, get_supabase
-
-# Import API
-from app.api.v1 import api
+# Submodules load on first use so workers and one-off commands don't import the whole API
+import importlib
 
 __all__ = ["supabase", "get_supabase", "api"]
+
+
+def __getattr__(name):
+    if name == "supabase":
+        from app.core.supabase_client import get_supabase
+        return get_supabase()
+    if name == "get_supabase":
+        from app.core.supabase_client import get_supabase
+        return get_supabase
+    if name == "api":
+        return importlib.import_module("app.api.v1.api")
+    raise AttributeError(f"module 'app' has no attribute {name!r}")
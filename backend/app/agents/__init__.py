@@ -2,6 +2,6 @@
 AI Agents package using the OpenAI Agents SDK.
 """
 
-from app.agents.celery_tasks import process_candidate, search_candidates, process_task
+from app.agents.celery_tasks import process_candidate, search_candidates, screen_candidates, process_task
 
-__all__ = ["process_candidate", "search_candidates", "process_task"]
+__all__ = ["process_candidate", "search_candidates", "screen_candidates", "process_task"]
@@ -5,11 +5,18 @@ Replaces the legacy OpenAI Assistants implementation with the Agents SDK.
 
 import logging
 import asyncio
+import threading
 import json
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from datetime import datetime
 
+from celery.signals import task_revoked
+
 from app.worker import celery_app
+from app.core import claim_check, metrics
+from app.core.cancellation import TaskCancelled, run_cancellable
+from app.core.config import settings
+from app.core.deadlines import deadline_scope
 from app.services.agents_sdk_service import AgentSDKService
 from app.schemas.agent import TaskStatus
 
@@ -18,16 +25,91 @@ logger = logging.getLogger(__name__)
 # Initialize the Agent SDK service
 agent_sdk_service = AgentSDKService()
 
-def run_async_in_celery(coroutine):
-    """Helper to run an async function in Celery's synchronous environment."""
-    loop = asyncio.new_event_loop()
-    asyncio.set_event_loop(loop)
+# Event loop reused by every task in this worker thread. Pooled HTTP
+# connections are bound to the loop that opened them, so a fresh loop per
+# task would throw away every keep-alive connection after each run. Loops
+# are per thread because eager tasks run concurrently in the API threadpool,
+# and each loop gets its own pooled OpenAI client.
+_worker_loops = threading.local()
+
+def get_worker_loop() -> asyncio.AbstractEventLoop:
+    """Return this thread's long-lived event loop, creating it on first use."""
+    loop = getattr(_worker_loops, "loop", None)
+    if loop is None or loop.is_closed():
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        _worker_loops.loop = loop
+    return loop
+
+def close_worker_loop():
+    """Close this thread's event loop and the OpenAI client bound to it."""
+    loop = getattr(_worker_loops, "loop", None)
+    if loop is None or loop.is_closed():
+        return
     try:
-        return loop.run_until_complete(coroutine)
+        from app.core.openai_client import close_openai_client
+        loop.run_until_complete(close_openai_client())
     finally:
         loop.close()
+        _worker_loops.loop = None
+
+def task_time_budget(task) -> Optional[float]:
+    """
+    Seconds a task may spend on agent runs: its soft time limit minus a margin.
+    
+    The margin lets the deadline cancel in-flight runs cleanly before Celery
+    raises SoftTimeLimitExceeded into the event loop.
+    """
+    timelimit = getattr(task.request, "timelimit", None) or (None, None)
+    soft_limit = timelimit[1] or task.soft_time_limit
+    if not soft_limit:
+        return None
+    return max(soft_limit - settings.AGENT_DEADLINE_MARGIN, 0.0)
+
+def run_async_in_celery(coroutine, time_budget: Optional[float] = None, task_id: Optional[str] = None):
+    """
+    Helper to run an async function in Celery's synchronous environment.
+    
+    With a task_id, the run stops with TaskCancelled as soon as the task's
+    cancellation is requested.
+    """
+    if task_id:
+        coroutine = run_cancellable(coroutine, task_id)
+    # The task wrapping the coroutine copies the context, deadline included
+    with deadline_scope(time_budget):
+        return get_worker_loop().run_until_complete(coroutine)
+
+UNIFIED_TASKS = {
+    "app.agents.celery_tasks.process_candidate",
+    "app.agents.celery_tasks.search_candidates",
+    "app.agents.celery_tasks.screen_candidates",
+    "app.agents.celery_tasks.process_task",
+}
+
+def record_cancelled(task, task_id: str):
+    """Log and count a task that stopped because it was cancelled."""
+    logger.info(f"Task {task_id} cancelled")
+    metrics.record_task_cancelled(task.request.id, task.name, "running")
+
+@task_revoked.connect
+def mark_expired(sender=None, request=None, expired: bool = False, **kwargs):
+    """Record tasks whose message outlived its TTL; the worker has dropped it unrun."""
+    if not expired or sender is None or sender.name not in UNIFIED_TASKS:
+        return
+    from app.services.agent_service import AgentService
+    try:
+        # These tasks' Celery IDs are their agent_tasks IDs
+        AgentService().update_task_status(request.id, TaskStatus.EXPIRED, error="Expired in the queue before it ran")
+        logger.info(f"Task {request.id} expired before it ran")
+    except Exception as e:
+        logger.error(f"Error marking task {request.id} expired: {str(e)}")
 
-@celery_app.task(name="app.agents.celery_tasks.process_candidate", bind=True)
+@celery_app.task(
+    name="app.agents.celery_tasks.process_candidate",
+    bind=True,
+    soft_time_limit=settings.AGENT_TASK_SOFT_TIME_LIMIT,
+    time_limit=settings.AGENT_TASK_TIME_LIMIT,
+)
 def process_candidate(self, task_id: str, **kwargs):
     """
     Process a candidate application and provide a summary using the Agents SDK.
@@ -46,21 +128,28 @@ def process_candidate(self, task_id: str, **kwargs):
         self.update_state(state=TaskStatus.RUNNING.value, meta={'started_at': datetime.utcnow().isoformat()})
         
         # Get parameters from the task
-        candidate_data = kwargs.get("candidate_data", {})
-        job_data = kwargs.get("job_data", {})
+        candidate_data = claim_check.resolve(kwargs.get("candidate_data", {}))
+        job_data = claim_check.resolve(kwargs.get("job_data", {}))
         
         # Process using Agents SDK
         result = run_async_in_celery(
-            agent_sdk_service.process_candidate(candidate_data, job_data)
+            agent_sdk_service.process_candidate(candidate_data, job_data),
+            task_time_budget(self),
+            task_id
         )
         
         # Store result in Celery backend
         return {
             'status': TaskStatus.COMPLETED.value,
-            'result': result,
+            'result': claim_check.check_in(result),
+            'usage': metrics.task_usage(),
             'completed_at': datetime.utcnow().isoformat()
         }
         
+    except TaskCancelled:
+        record_cancelled(self, task_id)
+        raise
+        
     except Exception as e:
         logger.error(f"Error processing candidate: {str(e)}")
         
@@ -74,14 +163,79 @@ def process_candidate(self, task_id: str, **kwargs):
         
         raise
 
-@celery_app.task(name="app.agents.celery_tasks.search_candidates", bind=True)
+@celery_app.task(
+    name="app.agents.celery_tasks.screen_candidates",
+    bind=True,
+    soft_time_limit=settings.AGENT_TASK_SOFT_TIME_LIMIT,
+    time_limit=settings.AGENT_TASK_TIME_LIMIT,
+)
+def screen_candidates(self, task_id: str, **kwargs):
+    """
+    Screen many candidates for one job, packing several into each model call.
+    
+    Args:
+        task_id: The ID of the task
+        **kwargs: Task parameters including candidates and job_data
+    
+    Returns:
+        Dict with per-candidate evaluations
+    """
+    logger.info(f"Screening candidates for task {task_id}")
+    
+    try:
+        # Update task status to running using Celery backend
+        self.update_state(state=TaskStatus.RUNNING.value, meta={'started_at': datetime.utcnow().isoformat()})
+        
+        # Get parameters from the task
+        candidates = claim_check.resolve(kwargs.get("candidates", []))
+        job_data = claim_check.resolve(kwargs.get("job_data", {}))
+        
+        # Process using Agents SDK
+        result = run_async_in_celery(
+            agent_sdk_service.screen_candidates(candidates, job_data),
+            task_time_budget(self),
+            task_id
+        )
+        
+        # Store result in Celery backend
+        return {
+            'status': TaskStatus.COMPLETED.value,
+            'result': claim_check.check_in(result),
+            'usage': metrics.task_usage(),
+            'completed_at': datetime.utcnow().isoformat()
+        }
+        
+    except TaskCancelled:
+        record_cancelled(self, task_id)
+        raise
+        
+    except Exception as e:
+        logger.error(f"Error screening candidates: {str(e)}")
+        
+        # Update task with error in Celery backend
+        error_data = {
+            'status': TaskStatus.FAILED.value,
+            'error': str(e),
+            'completed_at': datetime.utcnow().isoformat()
+        }
+        self.update_state(state=TaskStatus.FAILED.value, meta=error_data)
+        
+        raise
+
+@celery_app.task(
+    name="app.agents.celery_tasks.search_candidates",
+    bind=True,
+    soft_time_limit=settings.AGENT_TASK_SOFT_TIME_LIMIT,
+    time_limit=settings.AGENT_TASK_TIME_LIMIT,
+)
 def search_candidates(self, task_id: str, **kwargs):
     """
     Search for candidates matching job requirements using the Agents SDK.
     
     Args:
         task_id: The ID of the task
-        **kwargs: Task parameters including job_requirements and filters
+        **kwargs: Task parameters including job_requirements, filters and the
+            tenant_id (the caller's tenant, if known) whose semantic search cache to use
     
     Returns:
         Dict with search results
@@ -93,21 +247,28 @@ def search_candidates(self, task_id: str, **kwargs):
         self.update_state(state=TaskStatus.RUNNING.value, meta={'started_at': datetime.utcnow().isoformat()})
         
         # Get parameters from the task
-        job_requirements = kwargs.get("job_requirements", {})
-        filters = kwargs.get("filters", {})
+        job_requirements = claim_check.resolve(kwargs.get("job_requirements", {}))
+        filters = claim_check.resolve(kwargs.get("filters", {}))
         
         # Process using Agents SDK
         result = run_async_in_celery(
-            agent_sdk_service.search_candidates(job_requirements, filters)
+            agent_sdk_service.search_candidates(job_requirements, filters, tenant_id=kwargs.get("tenant_id")),
+            task_time_budget(self),
+            task_id
         )
         
         # Store result in Celery backend
         return {
             'status': TaskStatus.COMPLETED.value,
-            'result': result,
+            'result': claim_check.check_in(result),
+            'usage': metrics.task_usage(),
             'completed_at': datetime.utcnow().isoformat()
         }
         
+    except TaskCancelled:
+        record_cancelled(self, task_id)
+        raise
+        
     except Exception as e:
         logger.error(f"Error searching candidates: {str(e)}")
         
@@ -121,7 +282,12 @@ def search_candidates(self, task_id: str, **kwargs):
         
         raise
 
-@celery_app.task(name="app.agents.celery_tasks.process_task", bind=True)
+@celery_app.task(
+    name="app.agents.celery_tasks.process_task",
+    bind=True,
+    soft_time_limit=settings.AGENT_TASK_SOFT_TIME_LIMIT,
+    time_limit=settings.AGENT_TASK_TIME_LIMIT,
+)
 def process_task(self, task_id: str, action: str, **kwargs):
     """
     Process a general task using the Agents SDK triage agent.
@@ -142,16 +308,23 @@ def process_task(self, task_id: str, action: str, **kwargs):
         
         # Process using Agents SDK
         result = run_async_in_celery(
-            agent_sdk_service.process_task(task_id, action, kwargs)
+            agent_sdk_service.process_task(task_id, action, claim_check.resolve_values(kwargs)),
+            task_time_budget(self),
+            task_id
         )
         
         # Store result in Celery backend
         return {
             'status': TaskStatus.COMPLETED.value,
-            'result': result,
+            'result': claim_check.check_in(result),
+            'usage': metrics.task_usage(),
             'completed_at': datetime.utcnow().isoformat()
         }
         
+    except TaskCancelled:
+        record_cancelled(self, task_id)
+        raise
+        
     except Exception as e:
         logger.error(f"Error processing task: {str(e)}")
         
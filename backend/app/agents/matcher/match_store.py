@@ -0,0 +1,307 @@
+"""
+Materialized job-to-candidate matches: a bounded top-K per open job.
+
+Each open job keeps its criteria in the "match:jobs" hash and its K best
+candidates in a sorted set, "match:top:<job_id>". A new or changed
+candidate is scored against the open jobs only, and each job's set is
+updated by a Lua script that keeps at most K members. A new job is scored
+against the whole candidate index in one pass. Reading the best
+candidates for a job is a ZREVRANGE of at most K members.
+
+Because a set only keeps K members, a candidate it evicted is forgotten.
+Each job therefore records its floor: the best score it has evicted. A
+kept candidate whose score drops below the floor, or a kept candidate
+that is removed, may hide a better evicted one, so the script reports the
+job stale and it is rebuilt from the index in one pass.
+
+The store follows writes to the candidates and jobs tables through the
+Celery tasks in app.agents.matcher.tasks. Those writes happen in Supabase,
+not in this API, so a Supabase database webhook on both tables posts each
+change to /api/v1/webhooks/match-store, and tasks_for_change turns it into
+the task to queue.
+
+Incremental updates score against this process's cached index, but every
+full ranking (opening a job, rebuilding a stale one) reloads the
+candidates first: a cached index misses candidates other workers indexed
+since it was loaded, and a ranking built from it would drop them until
+the next rebuild.
+"""
+
+import json
+import time
+import heapq
+import logging
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from app.agents.search.sharding import candidate_features, prepare_criteria, score_features
+from app.core import metrics
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+JOBS_KEY = "match:jobs"
+TOP_PREFIX = "match:top:"
+FLOOR_PREFIX = "match:floor:"
+
+# Criteria keys read from a job; the skills may be listed as required_skills
+CRITERIA_KEYS = ("skills", "title", "location", "min_years_experience")
+
+# Candidate fields scoring reads, the only ones sent to index_candidate
+INDEX_KEYS = ("id", "skills", "key_skills", "title", "location", "years_experience")
+
+# Jobs in these statuses keep no matches
+CLOSED_JOB_STATUSES = {"closed", "filled", "archived", "draft"}
+
+# KEYS[1]: job's sorted set, KEYS[2]: job's floor; ARGV[1]: K,
+# ARGV[2]: candidate ID, ARGV[3]: score, or "" to remove the candidate.
+# Returns 1 when the job may have lost a better evicted candidate.
+_OFFER_SCRIPT = """
+local k = tonumber(ARGV[1])
+local member = ARGV[2]
+local floor = tonumber(redis.call('GET', KEYS[2]) or '-1')
+local old = redis.call('ZSCORE', KEYS[1], member)
+
+if ARGV[3] == '' then
+    if old and floor >= 0 then
+        redis.call('ZREM', KEYS[1], member)
+        return 1
+    end
+    redis.call('ZREM', KEYS[1], member)
+    return 0
+end
+
+local score = tonumber(ARGV[3])
+if old and score < tonumber(old) and score < floor then
+    return 1
+end
+
+redis.call('ZADD', KEYS[1], score, member)
+if redis.call('ZCARD', KEYS[1]) > k then
+    local evicted = redis.call('ZRANGE', KEYS[1], 0, 0, 'WITHSCORES')
+    redis.call('ZREMRANGEBYRANK', KEYS[1], 0, 0)
+    if tonumber(evicted[2]) > floor then
+        redis.call('SET', KEYS[2], evicted[2])
+    end
+end
+return 0
+"""
+
+
+def job_criteria(job: Dict[str, Any]) -> Dict[str, Any]:
+    """Extract search criteria from a job posting."""
+    criteria = {key: job[key] for key in CRITERIA_KEYS if job.get(key)}
+    if "skills" not in criteria and job.get("required_skills"):
+        criteria["skills"] = job["required_skills"]
+    return criteria
+
+
+def tasks_for_change(
+    table: str, change: str, record: Optional[Dict[str, Any]], old_record: Optional[Dict[str, Any]] = None
+) -> List[Tuple[str, List[Any]]]:
+    """
+    Map a row change in the candidates or jobs table to the match store task to queue.
+
+    Args:
+        table: "candidates" or "jobs"; other tables need no task
+        change: "INSERT", "UPDATE" or "DELETE"
+        record: The row after the change, None for deletes
+        old_record: The row before the change, None for inserts
+
+    Returns:
+        list: (task name, args) pairs, empty if the change needs no task
+    """
+    row = record if change != "DELETE" else old_record
+    if not row or row.get("id") is None:
+        return []
+
+    if table == "candidates":
+        if change == "DELETE":
+            return [("app.agents.matcher.tasks.remove_candidate", [str(row["id"])])]
+        return [("app.agents.matcher.tasks.index_candidate", [{key: row[key] for key in INDEX_KEYS if key in row}])]
+
+    if table == "jobs":
+        if change == "DELETE" or str(row.get("status", "")).lower() in CLOSED_JOB_STATUSES:
+            return [("app.agents.matcher.tasks.close_job", [str(row["id"])])]
+        job = {key: row[key] for key in ("id", "required_skills", *CRITERIA_KEYS) if key in row}
+        return [("app.agents.matcher.tasks.open_job", [job])]
+
+    return []
+
+
+class CandidateIndex:
+    """Candidates' precomputed scoring features, keyed by candidate ID."""
+
+    def __init__(self, candidates: Iterable[Dict[str, Any]] = ()):
+        self.features: Dict[str, Tuple] = {}
+        for candidate in candidates:
+            self.upsert(candidate)
+
+    def __len__(self) -> int:
+        return len(self.features)
+
+    def upsert(self, candidate: Dict[str, Any]) -> None:
+        self.features[str(candidate["id"])] = candidate_features(candidate)
+
+    def remove(self, candidate_id: str) -> None:
+        self.features.pop(str(candidate_id), None)
+
+    def top(self, criteria: Dict[str, Any], k: int) -> List[Tuple[float, str]]:
+        """
+        Score every candidate against one job's criteria in a single pass.
+
+        Returns:
+            list: The k+1 best (score, candidate_id), best first; the extra
+                one is the best candidate left out, which sets the job's floor
+        """
+        prepared = prepare_criteria(criteria)
+        return heapq.nlargest(
+            k + 1, ((score_features(features, prepared), candidate_id) for candidate_id, features in self.features.items())
+        )
+
+
+# Per-process index: (loaded_at, index)
+_index_cache: Optional[Tuple[float, CandidateIndex]] = None
+
+
+def load_candidate_index(ttl: float = None) -> CandidateIndex:
+    """
+    Load the candidate index from Supabase, caching it in this process for ttl seconds.
+
+    A ttl of 0 always reloads, and the fresh index replaces the cached one.
+    """
+    global _index_cache
+
+    ttl = settings.MATCH_INDEX_CACHE_TTL if ttl is None else ttl
+    if _index_cache and time.monotonic() - _index_cache[0] < ttl:
+        metrics.record_cache("match_index", True)
+        return _index_cache[1]
+    metrics.record_cache("match_index", False)
+
+    from app.core.supabase_client import get_supabase
+
+    rows = get_supabase().table("candidates").select("*").execute().data or []
+    index = CandidateIndex(rows)
+    _index_cache = (time.monotonic(), index)
+    logger.info(f"Loaded {len(index)} candidates into the match index")
+    return index
+
+
+class MatchStore:
+    """
+    Top-K candidates per open job, kept in Redis.
+
+    Args:
+        redis: Redis client; defaults to the process's shared client
+        k: Candidates kept per job
+        reload_index: Returns a freshly loaded candidate index for rebuilds;
+            defaults to reloading from Supabase
+    """
+
+    def __init__(self, redis=None, k: int = None, reload_index: Optional[Callable[[], CandidateIndex]] = None):
+        if redis is None:
+            from app.core.redis_client import get_redis
+            redis = get_redis()
+        self.redis = redis
+        self.k = k or settings.MATCH_TOP_K
+        self.reload_index = reload_index or (lambda: load_candidate_index(ttl=0))
+        self._offer = redis.register_script(_OFFER_SCRIPT)
+
+    def open_job(self, job_id: str, criteria: Dict[str, Any], index: CandidateIndex) -> None:
+        """Start keeping matches for a job and rank the whole index for it."""
+        self.redis.hset(JOBS_KEY, job_id, json.dumps(criteria))
+        self._rebuild(job_id, criteria, index)
+
+    def close_job(self, job_id: str) -> None:
+        """Stop keeping matches for a job."""
+        pipeline = self.redis.pipeline()
+        pipeline.hdel(JOBS_KEY, job_id)
+        pipeline.delete(TOP_PREFIX + job_id, FLOOR_PREFIX + job_id)
+        pipeline.execute()
+
+    def open_jobs(self) -> Dict[str, Dict[str, Any]]:
+        """Criteria of every open job, by job ID."""
+        return {
+            (job_id.decode() if isinstance(job_id, bytes) else job_id): json.loads(criteria)
+            for job_id, criteria in self.redis.hgetall(JOBS_KEY).items()
+        }
+
+    def upsert_candidate(self, candidate: Dict[str, Any], index: CandidateIndex) -> int:
+        """
+        Score a new or changed candidate against the open jobs only.
+
+        Args:
+            candidate: The candidate profile, with its id
+            index: The candidate index, updated with this candidate
+
+        Returns:
+            int: Number of open jobs scored
+        """
+        index.upsert(candidate)
+        candidate_id = str(candidate["id"])
+        features = candidate_features(candidate)
+        jobs = self.open_jobs()
+
+        offers = [
+            (job_id, criteria, score_features(features, prepare_criteria(criteria)))
+            for job_id, criteria in jobs.items()
+        ]
+        stale = self._apply(candidate_id, offers)
+        if stale:
+            # The database may not have this write yet, so it is applied to the fresh index too
+            fresh = self.reload_index()
+            fresh.upsert(candidate)
+            self._rebuild_stale(candidate_id, stale, fresh)
+        return len(jobs)
+
+    def remove_candidate(self, candidate_id: str, index: CandidateIndex) -> None:
+        """Drop a candidate from the index and from every open job's matches."""
+        candidate_id = str(candidate_id)
+        index.remove(candidate_id)
+        stale = self._apply(candidate_id, [(job_id, criteria, "") for job_id, criteria in self.open_jobs().items()])
+        if stale:
+            fresh = self.reload_index()
+            fresh.remove(candidate_id)
+            self._rebuild_stale(candidate_id, stale, fresh)
+
+    def top_candidates(self, job_id: str, limit: Optional[int] = None) -> Optional[List[Dict[str, Any]]]:
+        """
+        The best candidates for an open job, best first.
+
+        Returns:
+            list: Dicts with candidate_id and match_score, or None if the job is not open
+        """
+        limit = min(limit or self.k, self.k)
+        pipeline = self.redis.pipeline()
+        pipeline.hexists(JOBS_KEY, job_id)
+        pipeline.zrevrange(TOP_PREFIX + job_id, 0, limit - 1, withscores=True)
+        is_open, members = pipeline.execute()
+        if not is_open:
+            return None
+        return [
+            {"candidate_id": member.decode() if isinstance(member, bytes) else member, "match_score": score}
+            for member, score in members
+        ]
+
+    def _apply(self, candidate_id: str, offers: List[Tuple[str, Dict[str, Any], Any]]) -> List[Tuple[str, Dict[str, Any]]]:
+        """Offer a candidate's scores to jobs; returns the (job_id, criteria) of jobs that went stale."""
+        pipeline = self.redis.pipeline(transaction=False)
+        for job_id, _, score in offers:
+            self._offer(keys=[TOP_PREFIX + job_id, FLOOR_PREFIX + job_id], args=[self.k, candidate_id, score], client=pipeline)
+        return [(job_id, criteria) for (job_id, criteria, _), result in zip(offers, pipeline.execute()) if result]
+
+    def _rebuild_stale(self, candidate_id: str, stale: List[Tuple[str, Dict[str, Any]]], index: CandidateIndex) -> None:
+        for job_id, criteria in stale:
+            logger.info(f"Rebuilding matches of job {job_id} after candidate {candidate_id} dropped out")
+            self._rebuild(job_id, criteria, index)
+
+    def _rebuild(self, job_id: str, criteria: Dict[str, Any], index: CandidateIndex) -> None:
+        ranked = index.top(criteria, self.k)
+        kept, left_out = ranked[:self.k], ranked[self.k:]
+
+        pipeline = self.redis.pipeline()
+        pipeline.delete(TOP_PREFIX + job_id, FLOOR_PREFIX + job_id)
+        if kept:
+            pipeline.zadd(TOP_PREFIX + job_id, {candidate_id: score for score, candidate_id in kept})
+        if left_out:
+            pipeline.set(FLOOR_PREFIX + job_id, left_out[0][0])
+        pipeline.execute()
@@ -1,10 +1,11 @@
 import logging
 from typing import Dict, Any, List
 
-from sqlalchemy.orm import Session
 
-from app.core.database import get_db
-from app.models.agent import AgentTaskModel, TaskStatus
+from app.agents.matcher.match_store import MatchStore, job_criteria
+from app.core import claim_check
+from app.core.database import update_task_status
+from app.schemas.agent import TaskStatus
 from app.worker import celery_app
 
 logger = logging.getLogger(__name__)
@@ -23,21 +24,27 @@ def match_candidates(task_id: str, **kwargs):
         Dict with matching results
     """
     logger.info(f"Matching candidates for task {task_id}")
-    db = next(get_db())
-    
     try:
-        # Get the task from the database
-        task = db.query(AgentTaskModel).filter(AgentTaskModel.id == task_id).first()
-        if not task:
+        # Mark the task running; no row means no such task
+        if not update_task_status(task_id, TaskStatus.RUNNING):
             raise ValueError(f"Task {task_id} not found")
         
-        # Update task status to running
-        task.status = TaskStatus.RUNNING
-        db.commit()
-        
         # Get parameters from the task
-        job_data = kwargs.get("job_data", {})
-        candidate_pool = kwargs.get("candidate_pool", [])
+        job_data = claim_check.resolve(kwargs.get("job_data", {}))
+        candidate_pool = claim_check.resolve(kwargs.get("candidate_pool", []))
+        
+        # An open job's standing rankings are already materialized; the
+        # pool they were ranked from is not counted again to say so
+        matches = _stored_matches(job_data.get("id"), kwargs.get("limit"))
+        if matches is not None and not candidate_pool:
+            result = {
+                "job_id": job_data.get("id"),
+                "job_title": job_data.get("title"),
+                "matches": matches,
+                "source": "match_store",
+            }
+            update_task_status(task_id, TaskStatus.COMPLETED, result=result)
+            return result
         
         # Implement the actual candidate matching logic here
         # For now, we'll just return a mock result
@@ -72,9 +79,7 @@ def match_candidates(task_id: str, **kwargs):
         }
         
         # Update task with result
-        task.status = TaskStatus.COMPLETED
-        task.result = result
-        db.commit()
+        update_task_status(task_id, TaskStatus.COMPLETED, result=result)
         
         return result
         
@@ -82,11 +87,7 @@ def match_candidates(task_id: str, **kwargs):
         logger.error(f"Error matching candidates: {str(e)}")
         
         # Update task with error
-        task = db.query(AgentTaskModel).filter(AgentTaskModel.id == task_id).first()
-        if task:
-            task.status = TaskStatus.FAILED
-            task.error = str(e)
-            db.commit()
+        update_task_status(task_id, TaskStatus.FAILED, error=str(e))
         
         raise
 
@@ -104,21 +105,14 @@ def score_candidate(task_id: str, **kwargs):
         Dict with candidate scoring results
     """
     logger.info(f"Scoring candidate for task {task_id}")
-    db = next(get_db())
-    
     try:
-        # Get the task from the database
-        task = db.query(AgentTaskModel).filter(AgentTaskModel.id == task_id).first()
-        if not task:
+        # Mark the task running; no row means no such task
+        if not update_task_status(task_id, TaskStatus.RUNNING):
             raise ValueError(f"Task {task_id} not found")
         
-        # Update task status to running
-        task.status = TaskStatus.RUNNING
-        db.commit()
-        
         # Get parameters from the task
-        job_data = kwargs.get("job_data", {})
-        candidate_data = kwargs.get("candidate_data", {})
+        job_data = claim_check.resolve(kwargs.get("job_data", {}))
+        candidate_data = claim_check.resolve(kwargs.get("candidate_data", {}))
         
         # Implement the actual candidate scoring logic here
         # For now, we'll just return a mock result
@@ -155,9 +149,7 @@ def score_candidate(task_id: str, **kwargs):
         }
         
         # Update task with result
-        task.status = TaskStatus.COMPLETED
-        task.result = result
-        db.commit()
+        update_task_status(task_id, TaskStatus.COMPLETED, result=result)
         
         return result
         
@@ -165,10 +157,78 @@ def score_candidate(task_id: str, **kwargs):
         logger.error(f"Error scoring candidate: {str(e)}")
         
         # Update task with error
-        task = db.query(AgentTaskModel).filter(AgentTaskModel.id == task_id).first()
-        if task:
-            task.status = TaskStatus.FAILED
-            task.error = str(e)
-            db.commit()
+        update_task_status(task_id, TaskStatus.FAILED, error=str(e))
         
-        raise 
\ No newline at end of file
+        raise
+
+
+def _stored_matches(job_id, limit=None):
+    """The stored top candidates of an open job, or None if it is not open or Redis is unreachable."""
+    if not job_id:
+        return None
+    try:
+        return MatchStore().top_candidates(str(job_id), limit)
+    except Exception as e:
+        logger.warning(f"Could not read stored matches of job {job_id}: {str(e)}")
+        return None
+
+
+@celery_app.task(name="app.agents.matcher.tasks.open_job")
+def open_job(job: Dict[str, Any]):
+    """
+    Start keeping the best candidates of a job, ranking the whole candidate index once.
+    
+    Queued by POST /api/v1/webhooks/match-store when a job is created, or
+    changed while open; reopening an open job re-ranks it.
+    
+    Args:
+        job: The job posting, with its id
+    
+    Returns:
+        Dict with the job ID and the number of candidates ranked
+    """
+    # A full ranking must not miss candidates indexed since this process loaded them
+    index = load_candidate_index(ttl=0)
+    MatchStore().open_job(str(job["id"]), job_criteria(job), index)
+    logger.info(f"Opened job {job['id']} over {len(index)} candidates")
+    return {"job_id": job["id"], "candidates_ranked": len(index)}
+
+
+@celery_app.task(name="app.agents.matcher.tasks.close_job")
+def close_job(job_id: str):
+    """
+    Stop keeping matches for a job that is no longer open.
+    
+    Queued by POST /api/v1/webhooks/match-store when a job is deleted or
+    moves to a closed status.
+    """
+    MatchStore().close_job(str(job_id))
+    return {"job_id": job_id}
+
+
+@celery_app.task(name="app.agents.matcher.tasks.index_candidate")
+def index_candidate(candidate: Dict[str, Any]):
+    """
+    Score a new or changed candidate against the open jobs only.
+    
+    Queued by POST /api/v1/webhooks/match-store when a candidate is created or changed.
+    
+    Args:
+        candidate: The candidate profile, with its id
+    
+    Returns:
+        Dict with the candidate ID and the number of jobs scored
+    """
+    jobs_scored = MatchStore().upsert_candidate(candidate, load_candidate_index())
+    return {"candidate_id": candidate["id"], "jobs_scored": jobs_scored}
+
+
+@celery_app.task(name="app.agents.matcher.tasks.remove_candidate")
+def remove_candidate(candidate_id: str):
+    """
+    Drop a withdrawn candidate from every open job's matches.
+    
+    Queued by POST /api/v1/webhooks/match-store when a candidate is deleted.
+    """
+    MatchStore().remove_candidate(str(candidate_id), load_candidate_index())
+    return {"candidate_id": candidate_id}
@@ -1,10 +1,10 @@
 import logging
 from typing import Dict, Any, List
 
-from sqlalchemy.orm import Session
 
-from app.core.database import get_db
-from app.models.agent import AgentTaskModel, TaskStatus
+from app.core import claim_check
+from app.core.database import update_task_status
+from app.schemas.agent import TaskStatus
 from app.worker import celery_app
 
 logger = logging.getLogger(__name__)
@@ -23,20 +23,13 @@ def process_application(task_id: str, **kwargs):
         Dict with processing result
     """
     logger.info(f"Processing application for task {task_id}")
-    db = next(get_db())
-    
     try:
-        # Get the task from the database
-        task = db.query(AgentTaskModel).filter(AgentTaskModel.id == task_id).first()
-        if not task:
+        # Mark the task running; no row means no such task
+        if not update_task_status(task_id, TaskStatus.RUNNING):
             raise ValueError(f"Task {task_id} not found")
         
-        # Update task status to running
-        task.status = TaskStatus.RUNNING
-        db.commit()
-        
         # Get parameters from the task
-        application_data = kwargs.get("application_data", {})
+        application_data = claim_check.resolve(kwargs.get("application_data", {}))
         
         # Implement the actual application processing logic here
         # For now, we'll just return a mock result
@@ -56,9 +49,7 @@ def process_application(task_id: str, **kwargs):
         }
         
         # Update task with result
-        task.status = TaskStatus.COMPLETED
-        task.result = result
-        db.commit()
+        update_task_status(task_id, TaskStatus.COMPLETED, result=result)
         
         return result
         
@@ -66,11 +57,7 @@ def process_application(task_id: str, **kwargs):
         logger.error(f"Error processing application: {str(e)}")
         
         # Update task with error
-        task = db.query(AgentTaskModel).filter(AgentTaskModel.id == task_id).first()
-        if task:
-            task.status = TaskStatus.FAILED
-            task.error = str(e)
-            db.commit()
+        update_task_status(task_id, TaskStatus.FAILED, error=str(e))
         
         raise
 
@@ -88,21 +75,14 @@ def evaluate_application(task_id: str, **kwargs):
         Dict with evaluation results
     """
     logger.info(f"Evaluating application for task {task_id}")
-    db = next(get_db())
-    
     try:
-        # Get the task from the database
-        task = db.query(AgentTaskModel).filter(AgentTaskModel.id == task_id).first()
-        if not task:
+        # Mark the task running; no row means no such task
+        if not update_task_status(task_id, TaskStatus.RUNNING):
             raise ValueError(f"Task {task_id} not found")
         
-        # Update task status to running
-        task.status = TaskStatus.RUNNING
-        db.commit()
-        
         # Get parameters from the task
-        application_data = kwargs.get("application_data", {})
-        criteria = kwargs.get("criteria", {})
+        application_data = claim_check.resolve(kwargs.get("application_data", {}))
+        criteria = claim_check.resolve(kwargs.get("criteria", {}))
         
         # Implement the actual application evaluation logic here
         # For now, we'll just return a mock result
@@ -131,9 +111,7 @@ def evaluate_application(task_id: str, **kwargs):
         }
         
         # Update task with result
-        task.status = TaskStatus.COMPLETED
-        task.result = result
-        db.commit()
+        update_task_status(task_id, TaskStatus.COMPLETED, result=result)
         
         return result
         
@@ -141,10 +119,6 @@ def evaluate_application(task_id: str, **kwargs):
         logger.error(f"Error evaluating application: {str(e)}")
         
         # Update task with error
-        task = db.query(AgentTaskModel).filter(AgentTaskModel.id == task_id).first()
-        if task:
-            task.status = TaskStatus.FAILED
-            task.error = str(e)
-            db.commit()
+        update_task_status(task_id, TaskStatus.FAILED, error=str(e))
         
         raise 
\ No newline at end of file
@@ -0,0 +1,204 @@
+"""
+Candidate corpus sharding and top-K scoring for scatter-gather search.
+"""
+
+import time
+import heapq
+import hashlib
+import logging
+from typing import Dict, Any, List, Iterable, Optional, Tuple
+
+from app.core import metrics
+
+logger = logging.getLogger(__name__)
+
+# Per-process cache of loaded shards: (shard_index, shard_count) -> (loaded_at, candidates)
+_shard_cache: Dict[Tuple[int, int], Tuple[float, List[Dict[str, Any]]]] = {}
+
+
+# Shard keys are the first 32 bits of md5(id), the same value the database
+# stores in candidates.shard_key (migrations/003_candidates_shard_key.sql)
+SHARD_KEY_SPACE = 1 << 32
+
+
+def shard_key(candidate_id: str) -> int:
+    """Return a candidate's shard key, as stored in candidates.shard_key."""
+    return int(hashlib.md5(str(candidate_id).encode("utf-8")).hexdigest()[:8], 16)
+
+
+def shard_range(shard_index: int, shard_count: int) -> Tuple[int, int]:
+    """
+    Return the [low, high) range of shard keys a shard owns.
+
+    Shards own contiguous key ranges, so one indexed range predicate selects a
+    shard's rows for any shard count.
+    """
+    def bound(index: int) -> int:
+        return -(-index * SHARD_KEY_SPACE // shard_count)
+
+    return bound(shard_index), bound(shard_index + 1)
+
+
+def shard_for(candidate_id: str, shard_count: int) -> int:
+    """Return the shard that owns a candidate. Stable across processes and restarts."""
+    return shard_key(candidate_id) * shard_count // SHARD_KEY_SPACE
+
+
+def _terms(values: Iterable[Any]) -> set:
+    return {str(value).strip().lower() for value in values if value}
+
+
+def candidate_features(candidate: Dict[str, Any]) -> Tuple[set, set, str, float]:
+    """
+    Precompute the parts of a candidate that scoring reads.
+
+    Returns:
+        tuple: (skill terms, title words, lowercased location, years of experience)
+    """
+    return (
+        _terms(candidate.get("skills") or candidate.get("key_skills") or []),
+        set(str(candidate.get("title", "")).lower().split()),
+        str(candidate.get("location", "")).lower(),
+        candidate.get("years_experience") or 0,
+    )
+
+
+def prepare_criteria(criteria: Dict[str, Any]) -> Tuple[set, set, str, float]:
+    """Precompute search criteria in the shape score_features expects."""
+    title = criteria.get("title")
+    location = criteria.get("location")
+    return (
+        _terms(criteria.get("skills", [])),
+        set(str(title).lower().split()) if title else set(),
+        str(location).lower() if location else "",
+        criteria.get("min_years_experience") or 0,
+    )
+
+
+def score_features(features: Tuple[set, set, str, float], criteria: Tuple[set, set, str, float]) -> float:
+    """
+    Score precomputed candidate features against prepared criteria.
+
+    Scoring many candidates against one set of criteria, or one candidate
+    against many, only pays for the preparation once per side.
+
+    Returns:
+        float: Relevance score between 0 and 1
+    """
+    skills, title_words, location, years = features
+    wanted_skills, wanted_title, wanted_location, min_years = criteria
+    score = 0.0
+    weight = 0.0
+
+    if wanted_skills:
+        score += 0.6 * len(wanted_skills & skills) / len(wanted_skills)
+        weight += 0.6
+
+    if wanted_title:
+        score += 0.2 * len(wanted_title & title_words) / len(wanted_title)
+        weight += 0.2
+
+    if wanted_location:
+        if wanted_location in location or "remote" in location:
+            score += 0.1
+        weight += 0.1
+
+    if min_years:
+        score += 0.1 * min(years / min_years, 1.0)
+        weight += 0.1
+
+    return round(score / weight, 4) if weight else 0.0
+
+
+def score_candidate(candidate: Dict[str, Any], criteria: Dict[str, Any]) -> float:
+    """
+    Score a candidate against search criteria.
+
+    Args:
+        candidate: Candidate profile with skills, title, location and experience
+        criteria: Search criteria with optional skills, title, location and min_years_experience
+
+    Returns:
+        float: Relevance score between 0 and 1
+    """
+    return score_features(candidate_features(candidate), prepare_criteria(criteria))
+
+
+class TopK:
+    """Bounded min-heap keeping the K highest-scoring candidates seen so far."""
+
+    def __init__(self, k: int):
+        self.k = k
+        self._heap: List[Tuple[float, str, Dict[str, Any]]] = []
+
+    def push(self, score: float, candidate: Dict[str, Any]) -> None:
+        entry = (score, str(candidate.get("id", "")), candidate)
+        if len(self._heap) < self.k:
+            heapq.heappush(self._heap, entry)
+        elif entry[:2] > self._heap[0][:2]:
+            heapq.heapreplace(self._heap, entry)
+
+    def results(self) -> List[Dict[str, Any]]:
+        """Return the kept candidates, best first, each with its relevance_score."""
+        ordered = sorted(self._heap, key=lambda entry: entry[:2], reverse=True)
+        return [{**candidate, "relevance_score": score} for score, _, candidate in ordered]
+
+
+def merge_top_k(shard_results: List[Dict[str, Any]], k: int) -> List[Dict[str, Any]]:
+    """
+    Merge per-shard top-K lists into the global top-K.
+
+    Args:
+        shard_results: Results of the shard tasks, each with a `candidates` list
+        k: Number of candidates to keep
+
+    Returns:
+        List of the K best candidates across all shards, best first
+    """
+    merged = TopK(k)
+    for shard in shard_results:
+        for candidate in shard.get("candidates", []):
+            merged.push(candidate.get("relevance_score", 0.0), candidate)
+    return merged.results()
+
+
+def load_shard(shard_index: int, shard_count: int, ttl: float = 300.0) -> List[Dict[str, Any]]:
+    """
+    Load the candidates owned by a shard, caching them in this worker process.
+
+    Args:
+        shard_index: Index of the shard to load
+        shard_count: Total number of shards the corpus is split into
+        ttl: Seconds before the cached shard is reloaded
+
+    Returns:
+        List of candidate profiles in the shard
+    """
+    key = (shard_index, shard_count)
+    cached = _shard_cache.get(key)
+    if cached and time.monotonic() - cached[0] < ttl:
+        metrics.record_cache("search_shard", True)
+        return cached[1]
+    metrics.record_cache("search_shard", False)
+
+    from app.core.supabase_client import get_supabase
+
+    # Only this shard's rows leave the database
+    low, high = shard_range(shard_index, shard_count)
+    candidates = (
+        get_supabase().table("candidates").select("*")
+        .gte("shard_key", low).lt("shard_key", high)
+        .execute().data or []
+    )
+    _shard_cache[key] = (time.monotonic(), candidates)
+    logger.info(f"Loaded {len(candidates)} candidates for shard {shard_index}/{shard_count}")
+    return candidates
+
+
+def shard_queue(shard_index: int) -> Optional[str]:
+    """Return the queue owning a shard when shard queues are enabled, else None."""
+    from app.core.config import settings
+
+    if not settings.SEARCH_SHARD_QUEUES:
+        return None
+    return f"search-shard-{shard_index}"
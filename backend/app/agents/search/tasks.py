@@ -1,11 +1,16 @@
+import time
 import logging
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 
-from sqlalchemy.orm import Session
+from celery import group
+from celery.exceptions import SoftTimeLimitExceeded
 
-from app.core.database import get_db
-from app.models.agent import AgentTaskModel, TaskStatus
+from app.core.config import settings
+from app.core import claim_check
+from app.core.database import update_task_status
+from app.schemas.agent import TaskStatus
 from app.worker import celery_app
+from app.agents.search.sharding import TopK, load_shard, merge_top_k, score_candidate, shard_queue
 
 logger = logging.getLogger(__name__)
 
@@ -23,20 +28,13 @@ def search_jobs(task_id: str, **kwargs):
         Dict with search results
     """
     logger.info(f"Searching jobs for task {task_id}")
-    db = next(get_db())
-    
     try:
-        # Get the task from the database
-        task = db.query(AgentTaskModel).filter(AgentTaskModel.id == task_id).first()
-        if not task:
+        # Mark the task running; no row means no such task
+        if not update_task_status(task_id, TaskStatus.RUNNING):
             raise ValueError(f"Task {task_id} not found")
         
-        # Update task status to running
-        task.status = TaskStatus.RUNNING
-        db.commit()
-        
         # Get parameters from the task
-        search_criteria = kwargs.get("search_criteria", {})
+        search_criteria = claim_check.resolve(kwargs.get("search_criteria", {}))
         
         # Implement the actual job search logic here
         # For now, we'll just return a mock result
@@ -75,9 +73,7 @@ def search_jobs(task_id: str, **kwargs):
         }
         
         # Update task with result
-        task.status = TaskStatus.COMPLETED
-        task.result = result
-        db.commit()
+        update_task_status(task_id, TaskStatus.COMPLETED, result=result)
         
         return result
         
@@ -85,94 +81,197 @@ def search_jobs(task_id: str, **kwargs):
         logger.error(f"Error searching jobs: {str(e)}")
         
         # Update task with error
-        task = db.query(AgentTaskModel).filter(AgentTaskModel.id == task_id).first()
-        if task:
-            task.status = TaskStatus.FAILED
-            task.error = str(e)
-            db.commit()
+        update_task_status(task_id, TaskStatus.FAILED, error=str(e))
         
         raise
 
 
-@celery_app.task(name="app.agents.search.tasks.search_candidates")
-def search_candidates(task_id: str, **kwargs):
+@celery_app.task(name="app.agents.search.tasks.search_candidates", bind=True)
+def search_candidates(self, task_id: str, **kwargs):
     """
     Search for candidates matching specific criteria.
     
+    The search fans out to SEARCH_SHARD_COUNT shard tasks, each returning a
+    local top-K, and merge_candidate_results combines them into the global
+    top-K. The merge replaces this task, so its result is the merged one.
+    
     Args:
         task_id: The ID of the task in the database
-        **kwargs: Task parameters including search_criteria
+        **kwargs: Task parameters including search_criteria and top_k
     
     Returns:
         Dict with search results
     """
     logger.info(f"Searching candidates for task {task_id}")
-    db = next(get_db())
-    
     try:
-        # Get the task from the database
-        task = db.query(AgentTaskModel).filter(AgentTaskModel.id == task_id).first()
-        if not task:
+        # Mark the task running; no row means no such task
+        if not update_task_status(task_id, TaskStatus.RUNNING):
             raise ValueError(f"Task {task_id} not found")
         
-        # Update task status to running
-        task.status = TaskStatus.RUNNING
-        db.commit()
-        
         # Get parameters from the task
-        search_criteria = kwargs.get("search_criteria", {})
+        search_criteria = claim_check.resolve(kwargs.get("search_criteria", {}))
+        top_k = kwargs.get("top_k", settings.SEARCH_TOP_K)
+        
+        # A shard that has not returned by then, queued or running, is left out of the merge
+        deadline = time.time() + settings.SEARCH_SHARD_EXPIRES + settings.SEARCH_SHARD_TIMEOUT
+        shards = group(
+            _shard_signature(shard_index, settings.SEARCH_SHARD_COUNT, search_criteria, top_k)
+            for shard_index in range(settings.SEARCH_SHARD_COUNT)
+        ).apply_async()
+        
+        if self.request.is_eager:
+            # The shards already ran in-process, and eager results are not stored for the merge to read
+            return complete_search(task_id, search_criteria, top_k, [shard.result for shard in shards.results])
+        merge = merge_candidate_results.s([shard.id for shard in shards.results], task_id, search_criteria, top_k, deadline)
+        
+    except Exception as e:
+        logger.error(f"Error searching candidates: {str(e)}")
+        
+        # Update task with error
+        update_task_status(task_id, TaskStatus.FAILED, error=str(e))
+        
+        raise
+    
+    # Gather into the merge task
+    raise self.replace(merge)
+
+
+def _shard_signature(shard_index: int, shard_count: int, search_criteria: Dict[str, Any], top_k: int):
+    """Build the signature for one shard, routed to its owning queue if enabled."""
+    # Dropped unrun if no worker takes it in time, e.g. when its queue has no consumer
+    signature = search_candidate_shard.s(shard_index, shard_count, search_criteria, top_k).set(
+        expires=settings.SEARCH_SHARD_EXPIRES
+    )
+    queue = shard_queue(shard_index)
+    if queue:
+        signature.set(queue=queue)
+    return signature
+
+
+@celery_app.task(
+    name="app.agents.search.tasks.search_candidate_shard",
+    soft_time_limit=settings.SEARCH_SHARD_TIMEOUT,
+)
+def search_candidate_shard(shard_index: int, shard_count: int, search_criteria: Dict[str, Any], top_k: int):
+    """
+    Score one shard of the candidate corpus and return its local top-K.
+    
+    A shard that runs past its soft time limit returns what it has scored so
+    far, marked partial, so one slow shard never blocks the whole search.
+    
+    Args:
+        shard_index: Index of the shard to search
+        shard_count: Total number of shards
+        search_criteria: Criteria to score candidates against
+        top_k: Number of candidates to return
+    
+    Returns:
+        Dict with the shard's best candidates and whether the scan was partial
+    """
+    best = TopK(top_k)
+    scanned = 0
+    partial = False
+    error = None
+    
+    try:
+        for candidate in load_shard(shard_index, shard_count, settings.SEARCH_SHARD_CACHE_TTL):
+            best.push(score_candidate(candidate, search_criteria), candidate)
+            scanned += 1
+    except SoftTimeLimitExceeded:
+        logger.warning(f"Shard {shard_index} timed out after scanning {scanned} candidates")
+        partial = True
+    except Exception as e:
+        logger.error(f"Error searching shard {shard_index}: {str(e)}")
+        partial = True
+        error = str(e)
+    
+    return {
+        "shard": shard_index,
+        "scanned": scanned,
+        "partial": partial,
+        "error": error,
+        "candidates": best.results(),
+    }
+
+
+@celery_app.task(name="app.agents.search.tasks.merge_candidate_results", bind=True, max_retries=None)
+def merge_candidate_results(
+    self,
+    shard_task_ids: List[str],
+    task_id: str,
+    search_criteria: Dict[str, Any],
+    top_k: int,
+    deadline: float,
+):
+    """
+    Wait for the shards until the deadline, then merge whatever they returned.
+    
+    Args:
+        shard_task_ids: Celery task IDs of the shard tasks, in shard order
+        task_id: The ID of the task in the database
+        search_criteria: Criteria the search ran with
+        top_k: Number of candidates to return
+        deadline: Unix time after which missing shards are given up on
+    
+    Returns:
+        Dict with search results
+    """
+    shards = [celery_app.AsyncResult(shard_task_id) for shard_task_id in shard_task_ids]
+    if time.time() < deadline and not all(shard.ready() for shard in shards):
+        raise self.retry(countdown=settings.SEARCH_MERGE_POLL_INTERVAL)
+    
+    missing = [shard.id for shard in shards if not shard.successful()]
+    if missing:
+        logger.warning(f"Merging search {task_id} without {len(missing)} of {len(shards)} shards")
+        # Drop the ones still queued now rather than when they expire
+        celery_app.control.revoke(missing)
+    return complete_search(
+        task_id, search_criteria, top_k, [shard.result if shard.successful() else None for shard in shards]
+    )
+
+
+def complete_search(
+    task_id: str, search_criteria: Dict[str, Any], top_k: int, shard_results: List[Optional[Dict[str, Any]]]
+) -> Dict[str, Any]:
+    """
+    Merge per-shard results into the global top-K and complete the task.
+    
+    Args:
+        task_id: The ID of the task in the database
+        search_criteria: Criteria the search ran with
+        top_k: Number of candidates to return
+        shard_results: Results returned by search_candidate_shard, in shard order,
+            with None for shards that did not return one
+    
+    Returns:
+        Dict with search results
+    """
+    try:
+        returned = [shard for shard in shard_results if shard is not None]
+        candidates = merge_top_k(returned, top_k)
+        partial_shards = [
+            index for index, shard in enumerate(shard_results) if shard is None or shard.get("partial")
+        ]
         
-        # Implement the actual candidate search logic here
-        # For now, we'll just return a mock result
         result = {
             "search_criteria": search_criteria,
-            "total_results": 3,
-            "candidates": [
-                {
-                    "id": "c001",
-                    "name": "Alice Johnson",
-                    "title": "Senior Software Engineer",
-                    "location": "New York, NY",
-                    "years_experience": 8,
-                    "relevance_score": 0.94,
-                    "key_skills": ["Python", "React", "AWS", "Microservices"]
-                },
-                {
-                    "id": "c002",
-                    "name": "Bob Williams",
-                    "title": "Backend Developer",
-                    "location": "Chicago, IL",
-                    "years_experience": 6,
-                    "relevance_score": 0.91,
-                    "key_skills": ["Python", "Django", "PostgreSQL", "Docker"]
-                },
-                {
-                    "id": "c003",
-                    "name": "Carol Davis",
-                    "title": "Full Stack Developer",
-                    "location": "Austin, TX",
-                    "years_experience": 5,
-                    "relevance_score": 0.87,
-                    "key_skills": ["Python", "JavaScript", "React", "Node.js"]
-                }
-            ]
+            "total_results": len(candidates),
+            "candidates": candidates,
+            "candidates_scanned": sum(shard.get("scanned", 0) for shard in returned),
+            "shards": len(shard_results),
+            "partial_shards": partial_shards,
+            "partial": bool(partial_shards),
         }
         
         # Update task with result
-        task.status = TaskStatus.COMPLETED
-        task.result = result
-        db.commit()
+        update_task_status(task_id, TaskStatus.COMPLETED, result=result)
         
         return result
         
     except Exception as e:
-        logger.error(f"Error searching candidates: {str(e)}")
+        logger.error(f"Error merging candidate search results: {str(e)}")
         
         # Update task with error
-        task = db.query(AgentTaskModel).filter(AgentTaskModel.id == task_id).first()
-        if task:
-            task.status = TaskStatus.FAILED
-            task.error = str(e)
-            db.commit()
+        update_task_status(task_id, TaskStatus.FAILED, error=str(e))
         
-        raise 
\ No newline at end of file
+        raise
@@ -1,9 +1,12 @@
 from fastapi import APIRouter
 
-from app.api.v1.endpoints import agents, health, agents_sdk, auth
+from app.api.v1.endpoints import agents, health, agents_sdk, auth, tasks, jobs, webhooks
 
 api_router = APIRouter()
 api_router.include_router(health.router, prefix="/health", tags=["health"])
 api_router.include_router(agents.router, prefix="/agents", tags=["agents"])
+api_router.include_router(tasks.router, prefix="/tasks", tags=["tasks"])
+api_router.include_router(jobs.router, prefix="/jobs", tags=["jobs"])
+api_router.include_router(webhooks.router, prefix="/webhooks", tags=["webhooks"])
 api_router.include_router(agents_sdk.router, prefix="/agents-sdk", tags=["agents-sdk"])
 api_router.include_router(auth.router, prefix="/auth", tags=["auth"]) 
\ No newline at end of file
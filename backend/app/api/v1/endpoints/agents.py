@@ -1,20 +1,55 @@
-from typing import List
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional
 
-from fastapi import APIRouter, BackgroundTasks, HTTPException, Path, Depends, status
+from fastapi import APIRouter, BackgroundTasks, HTTPException, Path, Query, Depends, Request, Response, status
 
+from app.core import http_cache, task_events
+from app.core.auth import get_optional_user, tenant_for
+from app.core.config import settings
 from app.schemas.agent import (
     AgentCreate, 
     AgentResponse, 
     AgentType, 
     AgentStatus, 
     AgentTask,
-    AgentTaskResponse
+    AgentTaskBatch,
+    AgentTaskBatchCancelResponse,
+    AgentTaskBatchProgress,
+    AgentTaskBatchResponse,
+    AgentTaskResponse,
+    TaskStatus
 )
 from app.services.agent_service import AgentService
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter()
 agent_service = AgentService()
 
+# Task states whose response can never change again
+FINISHED_TASK_STATUSES = {
+    TaskStatus.COMPLETED.value, TaskStatus.FAILED.value, TaskStatus.CANCELLED.value, TaskStatus.EXPIRED.value
+}
+
+def _agent_cache_headers(etag: str, updated_at: Any) -> Dict[str, str]:
+    """Agents change rarely but do change: allow short-lived reuse, then revalidate."""
+    return http_cache.cache_headers(
+        etag,
+        http_cache.parse_timestamp(updated_at),
+        f"private, max-age={settings.HTTP_CACHE_AGENT_MAX_AGE}",
+    )
+
+def _task_cache_headers(task_id: str, task_status: Any, updated_at: Any) -> Dict[str, str]:
+    """Finished tasks are immutable; running ones must be revalidated on every poll."""
+    task_status = getattr(task_status, "value", task_status)
+    if task_status in FINISHED_TASK_STATUSES:
+        cache_control = f"private, max-age={settings.HTTP_CACHE_FINISHED_TASK_MAX_AGE}, immutable"
+    else:
+        cache_control = "private, no-cache"
+    etag = http_cache.make_etag("task", task_id, task_status, updated_at)
+    return http_cache.cache_headers(etag, http_cache.parse_timestamp(updated_at), cache_control)
+
 @router.post("/", response_model=AgentResponse, status_code=status.HTTP_201_CREATED)
 async def create_agent(agent: AgentCreate):
     """
@@ -23,33 +58,65 @@ async def create_agent(agent: AgentCreate):
     return agent_service.create_agent(agent)
 
 @router.get("/", response_model=List[AgentResponse])
-async def list_agents():
+async def list_agents(request: Request, response: Response):
     """
     List all AI agents.
     """
-    return agent_service.get_all_agents()
+    # Revalidation reads only ids and timestamps, never the full rows
+    if http_cache.has_validators(request):
+        versions = agent_service.get_agents_versions()
+        etag, last_modified = http_cache.collection_version(
+            (row["id"], row.get("updated_at") or row.get("created_at")) for row in versions
+        )
+        headers = _agent_cache_headers(etag, last_modified)
+        if http_cache.is_not_modified(request, etag, last_modified):
+            return http_cache.not_modified(headers)
+    
+    agents = agent_service.get_all_agents()
+    etag, last_modified = http_cache.collection_version(
+        (agent.id, agent.updated_at or agent.created_at) for agent in agents
+    )
+    response.headers.update(_agent_cache_headers(etag, last_modified))
+    return agents
 
 @router.get("/{agent_id}", response_model=AgentResponse)
-async def get_agent(agent_id: str = Path(..., description="The ID of the agent to get")):
+async def get_agent(
+    request: Request,
+    response: Response,
+    agent_id: str = Path(..., description="The ID of the agent to get")
+):
     """
     Get a specific AI agent by ID.
     """
+    if http_cache.has_validators(request):
+        version = agent_service.get_agent_version(agent_id)
+        if version:
+            updated_at = version.get("updated_at") or version.get("created_at")
+            headers = _agent_cache_headers(http_cache.make_etag("agent", agent_id, updated_at), updated_at)
+            if http_cache.is_not_modified(request, headers["ETag"], http_cache.parse_timestamp(updated_at)):
+                return http_cache.not_modified(headers)
+    
     agent = agent_service.get_agent(agent_id)
     if not agent:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Agent with ID {agent_id} not found"
         )
+    updated_at = agent.updated_at or agent.created_at
+    response.headers.update(_agent_cache_headers(http_cache.make_etag("agent", agent_id, updated_at), updated_at))
     return agent
 
 @router.post("/{agent_id}/tasks", response_model=AgentTaskResponse)
 async def create_agent_task(
     agent_id: str = Path(..., description="The ID of the agent to run the task"),
     task: AgentTask = ...,
-    background_tasks: BackgroundTasks = None
+    background_tasks: BackgroundTasks = None,
+    user: Optional[Dict[str, Any]] = Depends(get_optional_user)
 ):
     """
     Create a new task for an agent to execute.
+    
+    Searches by signed-in callers may be served from their tenant's semantic cache.
     """
     agent = agent_service.get_agent(agent_id)
     if not agent:
@@ -58,21 +125,160 @@ async def create_agent_task(
             detail=f"Agent with ID {agent_id} not found"
         )
     
-    task_id = agent_service.create_task(agent_id, task, background_tasks)
+    task_id = agent_service.create_task(agent_id, task, background_tasks, tenant_id=tenant_for(user))
     return {"task_id": task_id, "status": "queued"}
 
+@router.post("/{agent_id}/tasks:batch", response_model=AgentTaskBatchResponse)
+async def create_agent_task_batch(
+    agent_id: str = Path(..., description="The ID of the agent to run the tasks"),
+    batch: AgentTaskBatch = ...,
+    background_tasks: BackgroundTasks = None,
+    user: Optional[Dict[str, Any]] = Depends(get_optional_user)
+):
+    """
+    Create many tasks for an agent in one request.
+    
+    The agent is validated once, every task row is written with one insert
+    and the tasks are queued together as one Celery group.
+    """
+    if len(batch.tasks) > settings.TASK_BATCH_MAX_SIZE:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"A batch holds at most {settings.TASK_BATCH_MAX_SIZE} tasks"
+        )
+    
+    agent = agent_service.get_agent(agent_id)
+    if not agent:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Agent with ID {agent_id} not found"
+        )
+    
+    created = agent_service.create_task_batch(agent_id, batch.tasks, background_tasks, tenant_id=tenant_for(user))
+    return {
+        **created,
+        "status": "queued",
+        "status_url": f"{settings.API_V1_STR}/agents/{agent_id}/batches/{created['batch_id']}",
+    }
+
+@router.get("/{agent_id}/batches/{batch_id}", response_model=AgentTaskBatchProgress)
+async def get_agent_task_batch(
+    agent_id: str = Path(..., description="The ID of the agent"),
+    batch_id: str = Path(..., description="The ID of the batch")
+):
+    """
+    Get how many of a batch's tasks are in each status.
+    """
+    progress = agent_service.get_batch_progress(agent_id, batch_id)
+    if not progress:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Batch with ID {batch_id} for agent {agent_id} not found"
+        )
+    return progress
+
 @router.get("/{agent_id}/tasks/{task_id}", response_model=AgentTaskResponse)
 async def get_agent_task_status(
+    request: Request,
+    response: Response,
     agent_id: str = Path(..., description="The ID of the agent"),
-    task_id: str = Path(..., description="The ID of the task")
+    task_id: str = Path(..., description="The ID of the task"),
+    wait: Optional[float] = Query(
+        None, ge=0, description="Seconds to hold the request until the task's status changes (long poll)"
+    )
 ):
     """
     Get the status of a specific agent task.
+    
+    With ?wait=N the response is held until the task's status changes, or
+    until N seconds pass, unless the task is already finished or differs
+    from the client's copy (If-None-Match). The wait is an asyncio event
+    woken over Redis pub/sub: no thread and no database queries meanwhile.
     """
+    if wait:
+        await _wait_for_task_change(request, agent_id, task_id, min(wait, settings.TASK_LONG_POLL_MAX_WAIT))
+    
+    # Pollers revalidate without downloading the (possibly large) result
+    if http_cache.has_validators(request):
+        version = agent_service.get_task_version(agent_id, task_id)
+        if version:
+            updated_at = version.get("updated_at") or version.get("created_at")
+            headers = _task_cache_headers(task_id, version["status"], updated_at)
+            if http_cache.is_not_modified(request, headers["ETag"], http_cache.parse_timestamp(updated_at)):
+                return http_cache.not_modified(headers)
+    
     task_status = agent_service.get_task_status(agent_id, task_id)
     if not task_status:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Task with ID {task_id} for agent {agent_id} not found"
         )
-    return task_status 
\ No newline at end of file
+    updated_at = task_status.get("updated_at") or task_status.get("created_at")
+    response.headers.update(_task_cache_headers(task_id, task_status["status"], updated_at))
+    return task_status 
+
+@router.delete("/{agent_id}/tasks/{task_id}", response_model=AgentTaskResponse)
+async def cancel_agent_task(
+    agent_id: str = Path(..., description="The ID of the agent"),
+    task_id: str = Path(..., description="The ID of the task to cancel")
+):
+    """
+    Cancel a queued or running task.
+    
+    A queued task is revoked before any worker starts it; a running one is
+    stopped cooperatively, aborting its in-flight model requests.
+    """
+    cancelled = agent_service.cancel_task(agent_id, task_id)
+    if not cancelled:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Task with ID {task_id} for agent {agent_id} not found"
+        )
+    if not cancelled["cancelled"]:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Task with ID {task_id} already {cancelled['status']}"
+        )
+    return {"task_id": task_id, "status": cancelled["status"]}
+
+@router.delete("/{agent_id}/batches/{batch_id}", response_model=AgentTaskBatchCancelResponse)
+async def cancel_agent_task_batch(
+    agent_id: str = Path(..., description="The ID of the agent"),
+    batch_id: str = Path(..., description="The ID of the batch to cancel")
+):
+    """
+    Cancel every task of a batch that is still queued or running.
+    """
+    cancelled = agent_service.cancel_batch(agent_id, batch_id)
+    if cancelled is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Batch with ID {batch_id} for agent {agent_id} not found"
+        )
+    return {"batch_id": batch_id, "cancelled": cancelled}
+
+async def _wait_for_task_change(request: Request, agent_id: str, task_id: str, timeout: float) -> None:
+    """Return once the task changes, or when there is nothing worth waiting for."""
+    hub = task_events.get_event_hub()
+    try:
+        # Subscribe before reading, so a change in between is not missed
+        changed = await hub.subscribe(task_id)
+    except Exception as e:
+        logger.warning(f"Long poll unavailable, answering immediately: {str(e)}")
+        return
+    
+    try:
+        version = agent_service.get_task_version(agent_id, task_id)
+        if not version or version["status"] in FINISHED_TASK_STATUSES:
+            return
+        if http_cache.has_validators(request):
+            updated_at = version.get("updated_at") or version.get("created_at")
+            etag = _task_cache_headers(task_id, version["status"], updated_at)["ETag"]
+            if not http_cache.is_not_modified(request, etag, http_cache.parse_timestamp(updated_at)):
+                return
+        try:
+            await asyncio.wait_for(changed.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            pass
+    finally:
+        await hub.unsubscribe(task_id, changed)
@@ -1,12 +1,29 @@
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 import asyncio
+import threading
 
-from fastapi import APIRouter, HTTPException, status, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks
 
-from app.services.agents_sdk_service import AgentSDKService
+from app.core.auth import get_optional_user, tenant_for
+from app.core.deadlines import DeadlineExceeded
 
 router = APIRouter()
-agent_sdk_service = AgentSDKService()
+
+# Created on first use: importing the Agents SDK dominates API cold start
+_agent_sdk_service = None
+_agent_sdk_lock = threading.Lock()
+
+def get_agent_sdk_service():
+    """Return the shared AgentSDKService, importing and configuring the SDK on first call."""
+    global _agent_sdk_service
+    if _agent_sdk_service is None:
+        # The startup warm-up thread and a first request may race here
+        with _agent_sdk_lock:
+            if _agent_sdk_service is None:
+                from app.services.agents_sdk_service import AgentSDKService, configure_agents_sdk
+                configure_agents_sdk()
+                _agent_sdk_service = AgentSDKService()
+    return _agent_sdk_service
 
 @router.post("/process-candidate")
 async def process_candidate(data: Dict[str, Any]):
@@ -20,36 +37,76 @@ async def process_candidate(data: Dict[str, Any]):
         job_data = data.get("job_data", {})
         
         # Run the Agents SDK processing
-        result = await agent_sdk_service.process_candidate(candidate_data, job_data)
+        result = await get_agent_sdk_service().process_candidate(candidate_data, job_data)
         
         return {
             "status": "success",
             "result": result
         }
+    except DeadlineExceeded as e:
+        raise HTTPException(
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+            detail=f"Timed out processing candidate: {str(e)}"
+        )
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error processing candidate: {str(e)}"
         )
 
+@router.post("/screen-candidates")
+async def screen_candidates(data: Dict[str, Any]):
+    """
+    Screen many candidates for one job, packing several into each model call.
+    
+    This endpoint allows direct testing of the Agents SDK without going through Celery.
+    """
+    try:
+        candidates = data.get("candidates", [])
+        job_data = data.get("job_data", {})
+        
+        # Run the Agents SDK processing
+        result = await get_agent_sdk_service().screen_candidates(candidates, job_data)
+        
+        return {
+            "status": "success",
+            "result": result
+        }
+    except DeadlineExceeded as e:
+        raise HTTPException(
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+            detail=f"Timed out screening candidates: {str(e)}"
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error screening candidates: {str(e)}"
+        )
+
 @router.post("/search-candidates")
-async def search_candidates(data: Dict[str, Any]):
+async def search_candidates(data: Dict[str, Any], user: Optional[Dict[str, Any]] = Depends(get_optional_user)):
     """
     Search for candidates using the Agents SDK.
     
     This endpoint allows direct testing of the Agents SDK without going through Celery.
+    Signed-in callers get paraphrases of their earlier searches from a cache.
     """
     try:
         job_requirements = data.get("job_requirements", {})
         filters = data.get("filters", {})
         
         # Run the Agents SDK processing
-        result = await agent_sdk_service.search_candidates(job_requirements, filters)
+        result = await get_agent_sdk_service().search_candidates(job_requirements, filters, tenant_id=tenant_for(user))
         
         return {
             "status": "success",
             "result": result
         }
+    except DeadlineExceeded as e:
+        raise HTTPException(
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+            detail=f"Timed out searching candidates: {str(e)}"
+        )
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -69,14 +126,33 @@ async def process_task(data: Dict[str, Any]):
         parameters = data.get("parameters", {})
         
         # Run the Agents SDK processing
-        result = await agent_sdk_service.process_task(task_id, action, parameters)
+        result = await get_agent_sdk_service().process_task(task_id, action, parameters)
         
         return {
             "status": "success",
             "result": result
         }
+    except DeadlineExceeded as e:
+        raise HTTPException(
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+            detail=f"Timed out processing task: {str(e)}"
+        )
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error processing task: {str(e)}"
-        ) 
\ No newline at end of file
+        )
+
+@router.get("/stats")
+async def get_run_stats():
+    """
+    Get latency, timeout and hedging statistics for agent runs in this process.
+    """
+    return get_agent_sdk_service().get_run_stats()
+
+@router.get("/search-cache/stats")
+async def get_search_cache_stats():
+    """
+    Get the search cache's hit rate and the share of search tokens it saved in this process.
+    """
+    return get_agent_sdk_service().search_cache.stats.snapshot()
@@ -0,0 +1,50 @@
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Query, status
+
+from app.agents.matcher.match_store import MatchStore
+from app.core.config import settings
+from app.schemas.agent import JobEvaluationsResponse, JobMatchesResponse, Recommendation
+from app.services.agent_service import AgentService
+
+router = APIRouter()
+agent_service = AgentService()
+
+@router.get("/{job_id}/matches", response_model=JobMatchesResponse)
+def get_job_matches(job_id: str, limit: Optional[int] = Query(None, ge=1, le=settings.MATCH_TOP_K)):
+    """
+    Get the best candidates for an open job.
+    
+    Rankings are kept up to date as candidates and jobs change, so this reads
+    at most MATCH_TOP_K stored entries instead of scoring the candidate pool.
+    """
+    matches = MatchStore().top_candidates(job_id, limit)
+    if matches is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Job with ID {job_id} is not open for matching"
+        )
+    return {"job_id": job_id, "matches": matches}
+
+@router.get("/{job_id}/evaluations", response_model=JobEvaluationsResponse)
+def get_job_evaluations(
+    job_id: str,
+    recommendation: Optional[Recommendation] = None,
+    min_score: Optional[int] = Query(None, ge=0, le=100),
+    limit: int = Query(50, ge=1, le=500),
+    include_justification: bool = False,
+):
+    """
+    Get the stored candidate evaluations of a job, best score first.
+    
+    Filters run against typed, indexed columns: "Interview recommendations
+    scoring at least 80" is a database query, not a model call.
+    """
+    evaluations = agent_service.find_evaluations(
+        job_id,
+        recommendation=recommendation.value if recommendation else None,
+        min_score=min_score,
+        limit=limit,
+        include_justification=include_justification,
+    )
+    return {"job_id": job_id, "evaluations": evaluations}
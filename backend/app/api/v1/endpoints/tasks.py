@@ -0,0 +1,30 @@
+from fastapi import APIRouter, HTTPException, status
+
+from app.core.config import settings
+from app.schemas.agent import AgentTaskStatusBulkResponse, AgentTaskStatusQuery
+from app.services.agent_service import AgentService
+
+router = APIRouter()
+agent_service = AgentService()
+
+@router.post("/status:bulk", response_model=AgentTaskStatusBulkResponse)
+async def get_tasks_status_bulk(query: AgentTaskStatusQuery):
+    """
+    Get the status of many of an agent's tasks with one database query.
+    
+    IDs of other agents' tasks are reported as missing, as unknown IDs are.
+    
+    Results are left out unless include_results is set, so dashboards
+    tracking hundreds of tasks only transfer what they display.
+    """
+    # Keep the caller's order but look each ID up once
+    task_ids = list(dict.fromkeys(query.task_ids))
+    if len(task_ids) > settings.TASK_STATUS_BULK_MAX_IDS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"At most {settings.TASK_STATUS_BULK_MAX_IDS} task IDs can be queried at once"
+        )
+    
+    tasks = agent_service.get_tasks_status(query.agent_id, task_ids, include_results=query.include_results)
+    found = {task["task_id"] for task in tasks}
+    return {"tasks": tasks, "missing": [task_id for task_id in task_ids if task_id not in found]}
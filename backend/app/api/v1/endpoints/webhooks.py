@@ -0,0 +1,33 @@
+import hmac
+from typing import Optional
+
+from fastapi import APIRouter, Header, HTTPException, status
+
+from app.agents.matcher.match_store import tasks_for_change
+from app.core.config import settings
+from app.schemas.agent import MatchStoreChangeResponse, TableChange
+from app.worker import celery_app
+
+router = APIRouter()
+
+@router.post("/match-store", response_model=MatchStoreChangeResponse, status_code=status.HTTP_202_ACCEPTED)
+def match_store_change(change: TableChange, x_webhook_secret: Optional[str] = Header(None)):
+    """
+    Queue the match store update for a write to the candidates or jobs table.
+    
+    Candidates and jobs are written to Supabase directly, so a database
+    webhook on both tables calls this with MATCH_WEBHOOK_SECRET in the
+    X-Webhook-Secret header.
+    """
+    if not settings.MATCH_WEBHOOK_SECRET:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Match store webhook is not enabled")
+    if not x_webhook_secret or not hmac.compare_digest(
+        x_webhook_secret.encode("utf-8"), settings.MATCH_WEBHOOK_SECRET.encode("utf-8")
+    ):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid webhook secret")
+    
+    queued = []
+    for task_name, args in tasks_for_change(change.table, change.type.upper(), change.record, change.old_record):
+        celery_app.send_task(task_name, args=args)
+        queued.append(task_name)
+    return {"queued": queued}
@@ -0,0 +1,242 @@
+"""
+Sampled, batched export of Agents SDK traces.
+
+By default the SDK ships every span of every run to the OpenAI tracing
+backend. Here traces are buffered per run and a keep/drop decision is made
+when the run ends: a random AGENT_TRACE_SAMPLE_RATE share is kept, and so is
+every run that errored or took longer than AGENT_TRACE_SLOW_SECONDS. Kept
+traces go to the SDK's BatchTraceProcessor, which exports them from a
+background thread to a local JSONL file or, if asked for, the OpenAI backend.
+"""
+
+import os
+import json
+import time
+import random
+import logging
+import threading
+from typing import Any, Dict, List, Optional
+
+from agents.tracing import Span, Trace, TracingProcessor
+from agents.tracing.processor_interface import TracingExporter
+from agents.tracing.processors import BatchTraceProcessor, default_exporter
+
+from app.core import metrics
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Runs with more spans than this keep only the first ones; the decision still sees errors in the rest
+MAX_SPANS_PER_TRACE = 1000
+
+# Processor installed in this process by install_trace_processors
+_processor: Optional["SampledTraceProcessor"] = None
+
+
+class JsonlTraceExporter(TracingExporter):
+    """Appends exported traces and spans to a local JSONL file, one item per line."""
+
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+    def export(self, items: List[Any]) -> None:
+        lines = []
+        for item in items:
+            exported = item.export()
+            if exported:
+                lines.append(json.dumps(exported, default=str))
+        if lines:
+            with open(self.path, "a") as f:
+                f.write("\n".join(lines) + "\n")
+
+
+class _PendingTrace:
+    __slots__ = ("trace", "started", "spans", "error")
+
+    def __init__(self, trace: Trace):
+        self.trace = trace
+        self.started = time.monotonic()
+        self.spans: List[Span[Any]] = []
+        self.error = False
+
+
+class SampledTraceProcessor(TracingProcessor):
+    """
+    TracingProcessor that tail-samples whole traces before handing them to a batch processor.
+
+    Spans are only appended to an in-memory list on the run's hot path;
+    serialization and I/O happen on the batch processor's background thread.
+    """
+
+    def __init__(
+        self,
+        downstream: TracingProcessor,
+        sample_rate: float,
+        slow_seconds: float,
+        max_pending: int = 1024,
+    ):
+        self.downstream = downstream
+        self.sample_rate = sample_rate
+        self.slow_seconds = slow_seconds
+        self.max_pending = max_pending
+        self._pending: Dict[str, _PendingTrace] = {}
+        self._lock = threading.Lock()
+
+    def on_trace_start(self, trace: Trace) -> None:
+        with self._lock:
+            if len(self._pending) >= self.max_pending:
+                # Traces that never ended (e.g. cancelled runs) must not grow the buffer forever
+                oldest = next(iter(self._pending))
+                del self._pending[oldest]
+                metrics.AGENT_TRACES.labels("overflow").inc()
+            self._pending[trace.trace_id] = _PendingTrace(trace)
+
+    def on_span_start(self, span: Span[Any]) -> None:
+        pass
+
+    def on_span_end(self, span: Span[Any]) -> None:
+        with self._lock:
+            pending = self._pending.get(span.trace_id)
+        if pending is None:
+            return
+        if span.error:
+            pending.error = True
+        if len(pending.spans) < MAX_SPANS_PER_TRACE:
+            pending.spans.append(span)
+
+    def on_trace_end(self, trace: Trace) -> None:
+        with self._lock:
+            pending = self._pending.pop(trace.trace_id, None)
+        if pending is None:
+            return
+
+        decision = self._decide(pending, time.monotonic() - pending.started)
+        metrics.AGENT_TRACES.labels(decision).inc()
+        if decision == "dropped":
+            return
+
+        self.downstream.on_trace_start(pending.trace)
+        for span in pending.spans:
+            self.downstream.on_span_end(span)
+
+    def _decide(self, pending: _PendingTrace, duration: float) -> str:
+        if pending.error:
+            return "error"
+        if duration >= self.slow_seconds:
+            return "slow"
+        if random.random() < self.sample_rate:
+            return "sampled"
+        return "dropped"
+
+    def shutdown(self) -> None:
+        self.downstream.shutdown()
+
+    def force_flush(self) -> None:
+        self.downstream.force_flush()
+
+
+class PromptCacheUsageProcessor(TracingProcessor):
+    """
+    Records input tokens served from the provider's prompt cache.
+
+    The SDK's Usage only carries input, output and total tokens, so the cached
+    share is read from the full Response on each response span and credited
+    to the agent whose span encloses it. Needs the run's trace data
+    (trace_include_sensitive_data, on by default) so spans carry the Response.
+    """
+
+    def __init__(self):
+        self._agents: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def on_trace_start(self, trace: Trace) -> None:
+        pass
+
+    def on_trace_end(self, trace: Trace) -> None:
+        pass
+
+    def on_span_start(self, span: Span[Any]) -> None:
+        if span.span_data.type == "agent":
+            with self._lock:
+                self._agents[span.span_id] = span.span_data.name
+
+    def on_span_end(self, span: Span[Any]) -> None:
+        data = span.span_data
+        if data.type == "agent":
+            with self._lock:
+                self._agents.pop(span.span_id, None)
+            return
+        if data.type != "response" or data.response is None:
+            return
+
+        details = getattr(data.response.usage, "input_tokens_details", None)
+        cached = getattr(details, "cached_tokens", 0) or 0
+        if cached:
+            with self._lock:
+                agent = self._agents.get(span.parent_id, "unknown")
+            metrics.record_cached_input_tokens(agent, cached)
+
+    def shutdown(self) -> None:
+        pass
+
+    def force_flush(self) -> None:
+        pass
+
+
+def create_trace_processor() -> Optional[SampledTraceProcessor]:
+    """
+    Build the sampled processor for the configured sink.
+
+    Returns:
+        The processor, or None when AGENT_TRACE_SINK is "none"
+    """
+    sink = settings.AGENT_TRACE_SINK
+    if sink == "none":
+        return None
+    if sink == "openai":
+        exporter = default_exporter()
+    else:
+        exporter = JsonlTraceExporter(settings.AGENT_TRACE_FILE)
+
+    batch = BatchTraceProcessor(
+        exporter,
+        max_queue_size=settings.AGENT_TRACE_QUEUE_SIZE,
+        max_batch_size=settings.AGENT_TRACE_BATCH_SIZE,
+        schedule_delay=settings.AGENT_TRACE_FLUSH_INTERVAL,
+    )
+    return SampledTraceProcessor(batch, settings.AGENT_TRACE_SAMPLE_RATE, settings.AGENT_TRACE_SLOW_SECONDS)
+
+
+def install_trace_processors() -> None:
+    """
+    Replace the SDK's default export-everything processor for this process.
+
+    Call after fork (worker_process_init) since the batch processor owns a thread.
+    """
+    from agents import set_trace_processors, set_tracing_disabled
+
+    from app.core import tracing
+
+    global _processor
+
+    # Always on: it is the only source of cached-token counts
+    processors: List[TracingProcessor] = [PromptCacheUsageProcessor()]
+    _processor = create_trace_processor()
+    if _processor is not None:
+        processors.append(_processor)
+    if tracing.is_enabled():
+        processors.append(tracing.AgentsTracingBridge())
+
+    set_trace_processors(processors)
+    set_tracing_disabled(False)
+    logger.info(
+        f"Agents SDK tracing: sink={settings.AGENT_TRACE_SINK}, "
+        f"sample_rate={settings.AGENT_TRACE_SAMPLE_RATE}, slow>={settings.AGENT_TRACE_SLOW_SECONDS}s"
+    )
+
+
+def shutdown_trace_processors() -> None:
+    """Export whatever is still queued; call on process shutdown."""
+    if _processor is not None:
+        _processor.shutdown()
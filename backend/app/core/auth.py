@@ -146,6 +146,12 @@ async def get_optional_user(
         logger.debug(f"Optional auth failed: {str(e)}")
         return None
 
+def tenant_for(user: Optional[Dict[str, Any]]) -> Optional[str]:
+    """The tenant a user's cached data belongs to: their organization, else themselves."""
+    if not user:
+        return None
+    return (user.get("app_metadata") or {}).get("tenant_id") or user.get("sub")
+
 # Development-only: Bypass auth when in development mode with BYPASS_AUTH=true
 def dev_bypass_auth(request: Request) -> Optional[Dict[str, Any]]:
     """
@@ -0,0 +1,115 @@
+"""
+Per-batch task counts kept incrementally in Redis.
+
+Each batch has one hash, "task-batch:<batch_id>", holding the agent ID, the
+number of tasks, one counter per status and the last status recorded for
+each task. Every status change of a batch task moves one unit between two
+counters in a Lua script, so a progress read is a single HMGET of a handful
+of fields however large the batch is. Recording the same status twice is a
+no-op, so a retried update never double-counts.
+
+Counters are best-effort: when Redis is unreachable or the hash has
+expired, callers count the batch's rows in the database instead.
+"""
+
+import logging
+from typing import Dict, List, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "task-batch:"
+
+# KEYS[1]: batch hash; ARGV[1]: new status; ARGV[2..]: task IDs.
+# Tasks start out queued, so a task without a recorded status is queued.
+_TRANSITION_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    return 0
+end
+local moved = 0
+for i = 2, #ARGV do
+    local field = 'task:' .. ARGV[i]
+    local previous = redis.call('HGET', KEYS[1], field) or 'queued'
+    if previous ~= ARGV[1] then
+        redis.call('HINCRBY', KEYS[1], previous, -1)
+        redis.call('HINCRBY', KEYS[1], ARGV[1], 1)
+        redis.call('HSET', KEYS[1], field, ARGV[1])
+        moved = moved + 1
+    end
+end
+return moved
+"""
+
+_transition = None
+
+
+def key_for(batch_id: str) -> str:
+    return f"{KEY_PREFIX}{batch_id}"
+
+
+def init_batch(batch_id: str, agent_id: str, total: int) -> None:
+    """
+    Start a batch's counters with every task queued.
+
+    Args:
+        batch_id: The ID of the batch
+        agent_id: The ID of the agent that owns it
+        total: Number of tasks in the batch
+    """
+    try:
+        from app.core.redis_client import get_redis
+        pipeline = get_redis().pipeline()
+        pipeline.hset(key_for(batch_id), mapping={"agent_id": agent_id, "total": total, "queued": total})
+        pipeline.expire(key_for(batch_id), settings.TASK_BATCH_PROGRESS_TTL)
+        pipeline.execute()
+    except Exception as e:
+        logger.warning(f"Could not start progress counters of batch {batch_id}: {str(e)}")
+
+
+def record_transition(batch_id: str, task_ids: List[str], status: str) -> None:
+    """
+    Move tasks of a batch to a new status in the counters.
+
+    Args:
+        batch_id: The ID of the batch
+        task_ids: The tasks whose status changed
+        status: The new status value
+    """
+    global _transition
+    try:
+        from app.core.redis_client import get_redis
+        if _transition is None:
+            _transition = get_redis().register_script(_TRANSITION_SCRIPT)
+        _transition(keys=[key_for(batch_id)], args=[status, *task_ids], client=get_redis())
+    except Exception as e:
+        logger.debug(f"Could not update progress counters of batch {batch_id}: {str(e)}")
+
+
+def read_counts(batch_id: str, statuses: List[str]) -> Optional[Dict[str, object]]:
+    """
+    Read a batch's counters.
+
+    Args:
+        batch_id: The ID of the batch
+        statuses: The status values to return counts for
+
+    Returns:
+        dict: "agent_id", "total" and "counts" per status, or None if the
+            counters are unavailable
+    """
+    try:
+        from app.core.redis_client import get_redis
+        values = get_redis().hmget(key_for(batch_id), ["agent_id", "total", *statuses])
+    except Exception as e:
+        logger.debug(f"Could not read progress counters of batch {batch_id}: {str(e)}")
+        return None
+
+    agent_id, total, *counts = values
+    if agent_id is None or total is None:
+        return None
+    return {
+        "agent_id": agent_id.decode() if isinstance(agent_id, bytes) else agent_id,
+        "total": int(total),
+        "counts": {status: int(count or 0) for status, count in zip(statuses, counts)},
+    }
@@ -0,0 +1,98 @@
+"""
+Cooperative task cancellation.
+
+Cancelling a task sets a flag in Redis, "task-cancel:<task_id>", and
+revokes its Celery message. A worker that has not started the task yet
+discards the message. A worker already running it polls the flag while
+the task's coroutine runs and cancels the coroutine when the flag
+appears: asyncio cancellation reaches the awaiting Runner.run, which
+closes its in-flight model request instead of waiting for the reply.
+
+The flag is what workers trust; the revoke only saves them from
+dequeuing work that would be cancelled on arrival. Flags outlive the
+longest task, so a worker that missed the revoke broadcast (it
+restarted, say) still sees the flag before starting.
+"""
+
+import asyncio
+import logging
+from typing import Any, Awaitable, List
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "task-cancel:"
+
+
+class TaskCancelled(Exception):
+    """Raised inside a task whose cancellation was requested."""
+
+
+def key_for(task_id: str) -> str:
+    return f"{KEY_PREFIX}{task_id}"
+
+
+def request_cancel(task_ids: List[str]) -> None:
+    """
+    Flag tasks as cancelled and revoke their queued messages.
+
+    Args:
+        task_ids: The IDs of the tasks, which are also their Celery task IDs
+    """
+    if not task_ids:
+        return
+    try:
+        from app.core.redis_client import get_redis
+        pipeline = get_redis().pipeline(transaction=False)
+        for task_id in task_ids:
+            pipeline.set(key_for(task_id), 1, ex=settings.TASK_CANCEL_FLAG_TTL)
+        pipeline.execute()
+    except Exception as e:
+        logger.warning(f"Could not flag {len(task_ids)} tasks as cancelled: {str(e)}")
+
+    try:
+        from app.worker import celery_app
+        # One broadcast for the whole list; workers drop the messages on receipt
+        celery_app.control.revoke(task_ids)
+    except Exception as e:
+        logger.warning(f"Could not revoke {len(task_ids)} tasks: {str(e)}")
+
+
+def is_cancelled(task_id: str) -> bool:
+    """True if cancellation of the task was requested. Unreachable Redis means no."""
+    try:
+        from app.core.redis_client import get_redis
+        return bool(get_redis().exists(key_for(task_id)))
+    except Exception as e:
+        logger.debug(f"Could not read cancel flag of task {task_id}: {str(e)}")
+        return False
+
+
+async def run_cancellable(coroutine: Awaitable[Any], task_id: str) -> Any:
+    """
+    Run a coroutine until it finishes or the task's cancel flag appears.
+
+    Args:
+        coroutine: The task's work
+        task_id: The ID of the task whose flag is watched
+
+    Returns:
+        The coroutine's result
+
+    Raises:
+        TaskCancelled: If cancellation was requested before or during the run
+    """
+    if await asyncio.to_thread(is_cancelled, task_id):
+        coroutine.close()
+        raise TaskCancelled(f"Task {task_id} was cancelled")
+
+    work = asyncio.ensure_future(coroutine)
+    while True:
+        done, _ = await asyncio.wait({work}, timeout=settings.TASK_CANCEL_POLL_INTERVAL)
+        if done:
+            return work.result()
+        if await asyncio.to_thread(is_cancelled, task_id) and work.cancel():
+            # Let the run unwind its requests before reporting
+            await asyncio.gather(work, return_exceptions=True)
+            raise TaskCancelled(f"Task {task_id} was cancelled")
@@ -0,0 +1,132 @@
+"""
+Claim-check storage for large task payloads.
+
+Values above CLAIM_CHECK_THRESHOLD bytes are stored once under their SHA-256
+digest, in Redis or a local blob directory, and the Celery message carries
+only a small reference. Tasks resolve references when they read a value.
+"""
+
+import os
+import json
+import hashlib
+import logging
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from app.core import metrics
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+REFERENCE_KEY = "__claim_check__"
+REDIS_KEY_PREFIX = "claim-check:"
+
+# Small per-process cache so a batch of tasks sharing one payload fetches it once
+_CACHE_SIZE = 32
+_blob_cache: "OrderedDict[str, bytes]" = OrderedDict()
+
+
+def _serialize(value: Any) -> bytes:
+    return json.dumps(value, sort_keys=True, separators=(",", ":"), default=str).encode("utf-8")
+
+
+def _store(digest: str, data: bytes) -> None:
+    if settings.CLAIM_CHECK_BACKEND == "file":
+        path = os.path.join(settings.CLAIM_CHECK_DIR, digest[:2], digest)
+        if os.path.exists(path):
+            return
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write then rename so readers never see a partial blob
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+        return
+
+    from app.core.redis_client import get_redis
+
+    redis = get_redis()
+    key = REDIS_KEY_PREFIX + digest
+    # Content-addressed: an existing key already holds these bytes, just extend its TTL
+    if not redis.set(key, data, ex=settings.CLAIM_CHECK_TTL, nx=True):
+        redis.expire(key, settings.CLAIM_CHECK_TTL)
+
+
+def _fetch(digest: str) -> bytes:
+    if digest in _blob_cache:
+        _blob_cache.move_to_end(digest)
+        metrics.record_cache("claim_check", True)
+        return _blob_cache[digest]
+    metrics.record_cache("claim_check", False)
+
+    if settings.CLAIM_CHECK_BACKEND == "file":
+        path = os.path.join(settings.CLAIM_CHECK_DIR, digest[:2], digest)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            data = None
+    else:
+        from app.core.redis_client import get_redis
+        data = get_redis().get(REDIS_KEY_PREFIX + digest)
+
+    if data is None:
+        raise KeyError(f"Claim-check payload {digest} not found or expired")
+
+    _blob_cache[digest] = data
+    if len(_blob_cache) > _CACHE_SIZE:
+        _blob_cache.popitem(last=False)
+    return data
+
+
+def is_reference(value: Any) -> bool:
+    """Return True if the value is a claim-check reference."""
+    return isinstance(value, dict) and REFERENCE_KEY in value
+
+
+def check_in(value: Any, threshold: Optional[int] = None) -> Any:
+    """
+    Store a value and return a reference to it if it is larger than the threshold.
+
+    Args:
+        value: Any JSON-serializable value
+        threshold: Size in bytes above which to store the value; defaults to settings
+
+    Returns:
+        The value itself if small, otherwise a claim-check reference
+    """
+    if threshold is None:
+        threshold = settings.CLAIM_CHECK_THRESHOLD
+    if value is None or isinstance(value, (bool, int, float)) or is_reference(value):
+        return value
+
+    data = _serialize(value)
+    if len(data) <= threshold:
+        return value
+
+    digest = hashlib.sha256(data).hexdigest()
+    _store(digest, data)
+    logger.debug(f"Checked in {len(data)} byte payload as {digest}")
+    return {REFERENCE_KEY: digest, "size": len(data)}
+
+
+def resolve(value: Any) -> Any:
+    """
+    Return the stored value for a claim-check reference, or the value unchanged.
+
+    Raises:
+        KeyError: If the referenced payload has expired or was never stored
+    """
+    if not is_reference(value):
+        return value
+    return json.loads(_fetch(value[REFERENCE_KEY]))
+
+
+def check_in_values(values: Optional[Dict[str, Any]], threshold: Optional[int] = None) -> Dict[str, Any]:
+    """Apply check_in to each top-level value, e.g. the kwargs of a task message."""
+    return {key: check_in(value, threshold) for key, value in (values or {}).items()}
+
+
+def resolve_values(values: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Resolve every top-level value of a mapping."""
+    return {key: resolve(value) for key, value in (values or {}).items()}
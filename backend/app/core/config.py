@@ -53,14 +53,163 @@ class Settings(BaseSettings):
     def CELERY_RESULT_BACKEND(self) -> str:
         return self.REDIS_URL
     
+    # Celery message and result serialization ("pladder" = msgpack + compression, or "json")
+    CELERY_SERIALIZER: str = os.getenv("CELERY_SERIALIZER", "pladder")
+    CELERY_RESULT_SERIALIZER: str = os.getenv("CELERY_RESULT_SERIALIZER", "pladder")
+    CELERY_COMPRESSION: str = os.getenv("CELERY_COMPRESSION", "zstd")  # zstd, gzip or none
+    CELERY_COMPRESSION_THRESHOLD: int = int(os.getenv("CELERY_COMPRESSION_THRESHOLD", "1024"))
+    # Per-task overrides as comma-separated "task_name=serializer" pairs
+    CELERY_TASK_SERIALIZERS: str = os.getenv("CELERY_TASK_SERIALIZERS", "")
+    
+    # Claim-check storage for large task payloads ("redis" or "file")
+    CLAIM_CHECK_BACKEND: str = os.getenv("CLAIM_CHECK_BACKEND", "redis")
+    CLAIM_CHECK_THRESHOLD: int = int(os.getenv("CLAIM_CHECK_THRESHOLD", str(64 * 1024)))
+    CLAIM_CHECK_TTL: int = int(os.getenv("CLAIM_CHECK_TTL", str(24 * 3600)))
+    CLAIM_CHECK_DIR: str = os.getenv("CLAIM_CHECK_DIR", "/tmp/pladder-claim-check")
+
     # Supabase Configuration
     SUPABASE_URL: str = os.getenv("SUPABASE_URL", "")
     SUPABASE_KEY: str = os.getenv("SUPABASE_KEY", "")
     SUPABASE_JWT_SECRET: Optional[str] = None
+
+    # Shared Supabase HTTP session (one pooled client per process). Keep-alive
+    # covers FastAPI's 40 threadpool workers so busy threads rarely reconnect.
+    SUPABASE_MAX_CONNECTIONS: int = int(os.getenv("SUPABASE_MAX_CONNECTIONS", "50"))
+    SUPABASE_MAX_KEEPALIVE_CONNECTIONS: int = int(os.getenv("SUPABASE_MAX_KEEPALIVE_CONNECTIONS", "40"))
+    SUPABASE_KEEPALIVE_EXPIRY: float = float(os.getenv("SUPABASE_KEEPALIVE_EXPIRY", "60"))
+    SUPABASE_CONNECT_TIMEOUT: float = float(os.getenv("SUPABASE_CONNECT_TIMEOUT", "5"))
+    SUPABASE_READ_TIMEOUT: float = float(os.getenv("SUPABASE_READ_TIMEOUT", "30"))
+    SUPABASE_POOL_TIMEOUT: float = float(os.getenv("SUPABASE_POOL_TIMEOUT", "10"))
     
     # OpenAI Settings
     OPENAI_API_KEY: str = os.getenv("OPENAI_API_KEY", "")
+    OPENAI_BASE_URL: Optional[str] = os.getenv("OPENAI_BASE_URL") or None
+
+    # Shared OpenAI HTTP client (one pooled client per process)
+    OPENAI_MAX_CONNECTIONS: int = int(os.getenv("OPENAI_MAX_CONNECTIONS", "100"))
+    OPENAI_MAX_KEEPALIVE_CONNECTIONS: int = int(os.getenv("OPENAI_MAX_KEEPALIVE_CONNECTIONS", "20"))
+    OPENAI_KEEPALIVE_EXPIRY: float = float(os.getenv("OPENAI_KEEPALIVE_EXPIRY", "60"))
+    OPENAI_CONNECT_TIMEOUT: float = float(os.getenv("OPENAI_CONNECT_TIMEOUT", "5"))
+    OPENAI_READ_TIMEOUT: float = float(os.getenv("OPENAI_READ_TIMEOUT", "120"))
+    OPENAI_MAX_RETRIES: int = int(os.getenv("OPENAI_MAX_RETRIES", "2"))
+    OPENAI_HTTP2: bool = os.getenv("OPENAI_HTTP2", "true").lower() == "true"
+
+    # Deadlines and hedging for agent runs
+    API_REQUEST_TIMEOUT: float = float(os.getenv("API_REQUEST_TIMEOUT", "120"))
+    AGENT_RUN_TIMEOUT: float = float(os.getenv("AGENT_RUN_TIMEOUT", "90"))
+    AGENT_TASK_SOFT_TIME_LIMIT: int = int(os.getenv("AGENT_TASK_SOFT_TIME_LIMIT", "300"))
+    AGENT_TASK_TIME_LIMIT: int = int(os.getenv("AGENT_TASK_TIME_LIMIT", "330"))
+    AGENT_DEADLINE_MARGIN: float = float(os.getenv("AGENT_DEADLINE_MARGIN", "5"))
+    AGENT_HEDGING_ENABLED: bool = os.getenv("AGENT_HEDGING_ENABLED", "false").lower() == "true"
+    AGENT_HEDGE_PERCENTILE: float = float(os.getenv("AGENT_HEDGE_PERCENTILE", "95"))
+    AGENT_HEDGE_MIN_SAMPLES: int = int(os.getenv("AGENT_HEDGE_MIN_SAMPLES", "20"))
+    AGENT_LATENCY_WINDOW: int = int(os.getenv("AGENT_LATENCY_WINDOW", "200"))
+
+    # Scatter-gather candidate search
+    SEARCH_SHARD_COUNT: int = int(os.getenv("SEARCH_SHARD_COUNT", "4"))
+    SEARCH_TOP_K: int = int(os.getenv("SEARCH_TOP_K", "10"))
+    SEARCH_SHARD_TIMEOUT: int = int(os.getenv("SEARCH_SHARD_TIMEOUT", "10"))
+    # Seconds a shard may wait in its queue; the merge gives up on shards after that plus SEARCH_SHARD_TIMEOUT
+    SEARCH_SHARD_EXPIRES: int = int(os.getenv("SEARCH_SHARD_EXPIRES", "10"))
+    SEARCH_MERGE_POLL_INTERVAL: float = float(os.getenv("SEARCH_MERGE_POLL_INTERVAL", "0.25"))
+    SEARCH_SHARD_CACHE_TTL: float = float(os.getenv("SEARCH_SHARD_CACHE_TTL", "300"))
+    # When true, shard i is routed to queue "search-shard-i" so each worker owns its shards
+    SEARCH_SHARD_QUEUES: bool = os.getenv("SEARCH_SHARD_QUEUES", "false").lower() == "true"
+
+    # Materialized top-K matches per open job
+    MATCH_TOP_K: int = int(os.getenv("MATCH_TOP_K", "50"))
+    MATCH_INDEX_CACHE_TTL: float = float(os.getenv("MATCH_INDEX_CACHE_TTL", "300"))
+    # Shared secret of the Supabase webhook posting candidate and job changes; empty disables it
+    MATCH_WEBHOOK_SECRET: str = os.getenv("MATCH_WEBHOOK_SECRET", "")
+
+    # Semantic cache of natural-language candidate searches, per tenant
+    SEMANTIC_CACHE_ENABLED: bool = os.getenv("SEMANTIC_CACHE_ENABLED", "true").lower() == "true"
+    # Tuned for the local embeddings; re-tune when switching to a model
+    SEMANTIC_CACHE_THRESHOLD: float = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.95"))
+    SEMANTIC_CACHE_TTL: int = int(os.getenv("SEMANTIC_CACHE_TTL", "3600"))
+    SEMANTIC_CACHE_MAX_ENTRIES: int = int(os.getenv("SEMANTIC_CACHE_MAX_ENTRIES", "500"))
+    # Empty uses local hashed n-gram embeddings; otherwise an OpenAI embedding model
+    SEMANTIC_CACHE_EMBEDDING_MODEL: str = os.getenv("SEMANTIC_CACHE_EMBEDDING_MODEL", "")
+
+    # Packed batch screening: several compact candidate profiles per model call
+    SCREENING_PACK_MAX_CANDIDATES: int = int(os.getenv("SCREENING_PACK_MAX_CANDIDATES", "10"))
+    SCREENING_PACK_INPUT_TOKENS: int = int(os.getenv("SCREENING_PACK_INPUT_TOKENS", "8000"))
+    SCREENING_PACK_MAX_OUTPUT_TOKENS: int = int(os.getenv("SCREENING_PACK_MAX_OUTPUT_TOKENS", "4096"))
+    SCREENING_OUTPUT_TOKENS_PER_CANDIDATE: int = int(os.getenv("SCREENING_OUTPUT_TOKENS_PER_CANDIDATE", "350"))
+    SCREENING_PROFILE_MAX_CHARS: int = int(os.getenv("SCREENING_PROFILE_MAX_CHARS", "1200"))
+    SCREENING_PACK_CONCURRENCY: int = int(os.getenv("SCREENING_PACK_CONCURRENCY", "4"))
+
+    # Metrics
+    WORKER_METRICS_PORT: int = int(os.getenv("WORKER_METRICS_PORT", "9808"))
+
+    # Distributed tracing (OpenTelemetry); traces go to a local JSONL file without an OTLP endpoint
+    TRACING_ENABLED: bool = os.getenv("TRACING_ENABLED", "false").lower() == "true"
+    TRACING_SAMPLE_RATIO: float = float(os.getenv("TRACING_SAMPLE_RATIO", "0.1"))
+    OTEL_EXPORTER_OTLP_ENDPOINT: str = os.getenv("OTEL_EXPORTER_OTLP_ENDPOINT", "")
+    TRACING_FILE: str = os.getenv("TRACING_FILE", "/tmp/pladder-traces.jsonl")
     
+    # Agents SDK trace export: "jsonl" (local file), "openai" (upstream backend) or "none"
+    AGENT_TRACE_SINK: str = os.getenv("AGENT_TRACE_SINK", "jsonl")
+    AGENT_TRACE_FILE: str = os.getenv("AGENT_TRACE_FILE", "/tmp/pladder-agent-traces.jsonl")
+    AGENT_TRACE_SAMPLE_RATE: float = float(os.getenv("AGENT_TRACE_SAMPLE_RATE", "0.05"))
+    AGENT_TRACE_SLOW_SECONDS: float = float(os.getenv("AGENT_TRACE_SLOW_SECONDS", "30"))
+    AGENT_TRACE_BATCH_SIZE: int = int(os.getenv("AGENT_TRACE_BATCH_SIZE", "256"))
+    AGENT_TRACE_FLUSH_INTERVAL: float = float(os.getenv("AGENT_TRACE_FLUSH_INTERVAL", "5"))
+    AGENT_TRACE_QUEUE_SIZE: int = int(os.getenv("AGENT_TRACE_QUEUE_SIZE", "8192"))
+
+    # On-demand profiling; requests need X-Profile-Token to match PROFILING_TOKEN, empty disables it
+    PROFILING_TOKEN: str = os.getenv("PROFILING_TOKEN", "")
+    PROFILING_DIR: str = os.getenv("PROFILING_DIR", "/tmp/pladder-profiles")
+    PROFILING_INTERVAL: float = float(os.getenv("PROFILING_INTERVAL", "0.005"))
+    PROFILING_TRACEMALLOC_FRAMES: int = int(os.getenv("PROFILING_TRACEMALLOC_FRAMES", "25"))
+    # Keep tracemalloc running after the first memory profile, to report growth between profiles
+    PROFILING_TRACEMALLOC_CONTINUOUS: bool = os.getenv("PROFILING_TRACEMALLOC_CONTINUOUS", "false").lower() == "true"
+    PROFILING_MEMORY_TOP: int = int(os.getenv("PROFILING_MEMORY_TOP", "25"))
+    
+    # SQL database for the worker task modules: SQLite locally, Postgres in production.
+    # Prefork children run one task at a time, so a small pool per process is enough;
+    # raise it to the thread count for the threads pool.
+    DATABASE_URL: str = os.getenv("DATABASE_URL", "sqlite:///./pladder.db")
+    DATABASE_POOL_SIZE: int = int(os.getenv("DATABASE_POOL_SIZE", "2"))
+    DATABASE_MAX_OVERFLOW: int = int(os.getenv("DATABASE_MAX_OVERFLOW", "3"))
+    DATABASE_POOL_TIMEOUT: float = float(os.getenv("DATABASE_POOL_TIMEOUT", "10"))
+    DATABASE_POOL_RECYCLE: int = int(os.getenv("DATABASE_POOL_RECYCLE", "1800"))
+    DATABASE_ECHO: bool = os.getenv("DATABASE_ECHO", "false").lower() == "true"
+    
+    # API startup: bound on the Supabase probe, and whether to load the Agents SDK in the background
+    STARTUP_PROBE_TIMEOUT: float = float(os.getenv("STARTUP_PROBE_TIMEOUT", "5"))
+    AGENTS_SDK_WARMUP: bool = os.getenv("AGENTS_SDK_WARMUP", "true").lower() == "true"
+    
+    # HTTP caching (Cache-Control max-age, seconds) for agents and finished tasks
+    HTTP_CACHE_AGENT_MAX_AGE: int = int(os.getenv("HTTP_CACHE_AGENT_MAX_AGE", "10"))
+    HTTP_CACHE_FINISHED_TASK_MAX_AGE: int = int(os.getenv("HTTP_CACHE_FINISHED_TASK_MAX_AGE", "86400"))
+
+    # Largest batch POST .../tasks:batch accepts
+    TASK_BATCH_MAX_SIZE: int = int(os.getenv("TASK_BATCH_MAX_SIZE", "1000"))
+    # Seconds a batch's progress counters live in Redis, and the most IDs one bulk status query takes
+    TASK_BATCH_PROGRESS_TTL: int = int(os.getenv("TASK_BATCH_PROGRESS_TTL", "604800"))
+    TASK_STATUS_BULK_MAX_IDS: int = int(os.getenv("TASK_STATUS_BULK_MAX_IDS", "500"))
+    
+    # Upper bound for GET .../tasks/{task_id}?wait= long polls, seconds
+    TASK_LONG_POLL_MAX_WAIT: float = float(os.getenv("TASK_LONG_POLL_MAX_WAIT", "60"))
+    
+    # Cancellation: how often running tasks check their cancel flag, and how long flags are kept (seconds)
+    TASK_CANCEL_POLL_INTERVAL: float = float(os.getenv("TASK_CANCEL_POLL_INTERVAL", "1"))
+    TASK_CANCEL_FLAG_TTL: int = int(os.getenv("TASK_CANCEL_FLAG_TTL", "86400"))
+    
+    # Seconds a queued task may wait before workers drop it as expired: single tasks are
+    # interactive, batches are not. TASK_TTL_BY_ACTION overrides both ("action=seconds,...").
+    TASK_TTL_INTERACTIVE: int = int(os.getenv("TASK_TTL_INTERACTIVE", "300"))
+    TASK_TTL_BATCH: int = int(os.getenv("TASK_TTL_BATCH", "86400"))
+    TASK_TTL_BY_ACTION: str = os.getenv("TASK_TTL_BY_ACTION", "")
+
+    # Readiness: background dependency probes served from cache by /ready
+    READINESS_PROBE_INTERVAL: float = float(os.getenv("READINESS_PROBE_INTERVAL", "10"))
+    READINESS_PROBE_TIMEOUT: float = float(os.getenv("READINESS_PROBE_TIMEOUT", "3"))
+    READINESS_STALE_AFTER: float = float(os.getenv("READINESS_STALE_AFTER", "3"))  # in intervals
+    # Probes that take the replica out of rotation; the others are only reported
+    READINESS_REQUIRED: str = os.getenv("READINESS_REQUIRED", "redis_broker,result_backend,supabase")
+
     # Server config
     PORT: int = int(os.getenv("PORT", "8000"))
     HOST: str = "0.0.0.0"  # Allow external connections
@@ -0,0 +1,170 @@
+"""
+SQLAlchemy engine, sessions and task-status writes for the worker task modules.
+
+Each process owns one pooled engine, created on first use and recreated
+after fork, so prefork children never share sockets with their parent.
+SQLite is used locally (DATABASE_URL=sqlite:///...) and Postgres in
+production; pool sizing only applies to Postgres.
+"""
+
+import os
+import logging
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, Iterator, Optional
+
+from sqlalchemy import create_engine, event, update
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, declarative_base, sessionmaker
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+Base = declarative_base()
+
+# Sessions are bound to this process's engine when they are opened
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False)
+
+_engine: Optional[Engine] = None
+_engine_pid: Optional[int] = None
+
+
+def _is_sqlite(url: str) -> bool:
+    return url.startswith("sqlite")
+
+
+def create_db_engine(url: Optional[str] = None) -> Engine:
+    """
+    Build an engine for the configured database.
+
+    Args:
+        url: Database URL; defaults to DATABASE_URL
+
+    Returns:
+        Engine: A pooled engine (Postgres) or a WAL-mode SQLite engine
+    """
+    url = url or settings.DATABASE_URL
+
+    if _is_sqlite(url):
+        engine = create_engine(
+            url,
+            echo=settings.DATABASE_ECHO,
+            connect_args={"check_same_thread": False, "timeout": settings.DATABASE_POOL_TIMEOUT},
+        )
+
+        @event.listens_for(engine, "connect")
+        def _sqlite_pragmas(dbapi_connection, connection_record):
+            # Let several worker processes write without "database is locked" errors
+            cursor = dbapi_connection.cursor()
+            cursor.execute("PRAGMA journal_mode=WAL")
+            cursor.execute("PRAGMA synchronous=NORMAL")
+            cursor.close()
+
+        return engine
+
+    engine = create_engine(
+        url,
+        echo=settings.DATABASE_ECHO,
+        pool_size=settings.DATABASE_POOL_SIZE,
+        max_overflow=settings.DATABASE_MAX_OVERFLOW,
+        pool_timeout=settings.DATABASE_POOL_TIMEOUT,
+        pool_recycle=settings.DATABASE_POOL_RECYCLE,
+        pool_pre_ping=True,
+    )
+    logger.info(
+        f"Created database engine (pool_size={settings.DATABASE_POOL_SIZE}, "
+        f"max_overflow={settings.DATABASE_MAX_OVERFLOW})"
+    )
+    return engine
+
+
+def get_engine() -> Engine:
+    """Returns the engine for this process, creating it on first use."""
+    global _engine, _engine_pid
+
+    if _engine is None or _engine_pid != os.getpid():
+        _engine = create_db_engine()
+        _engine_pid = os.getpid()
+    return _engine
+
+
+def dispose_engine() -> None:
+    """Close this process's pooled connections."""
+    global _engine, _engine_pid
+
+    if _engine is not None and _engine_pid == os.getpid():
+        _engine.dispose()
+    _engine = None
+    _engine_pid = None
+
+
+def init_db() -> None:
+    """Create any missing tables. Meant for local SQLite; production schemas are migrated."""
+    import app.models.agent  # noqa: F401 - registers the models on Base
+
+    Base.metadata.create_all(bind=get_engine())
+
+
+def get_db() -> Iterator[Session]:
+    """
+    Yield a session and close it afterwards, returning its connection to the pool.
+
+    Meant as a FastAPI dependency; tasks use session_scope or update_task_status.
+    """
+    db = SessionLocal(bind=get_engine())
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+@contextmanager
+def session_scope() -> Iterator[Session]:
+    """Run a unit of work in one transaction: commit on success, roll back on error."""
+    db = SessionLocal(bind=get_engine())
+    try:
+        yield db
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+def update_task_status(
+    task_id: str,
+    status: Any,
+    result: Optional[Dict[str, Any]] = None,
+    error: Optional[str] = None,
+) -> bool:
+    """
+    Set a task's status, result, error and timestamps in a single UPDATE.
+
+    Args:
+        task_id: The ID of the task
+        status: The new TaskStatus
+        result: Result to store, if any
+        error: Error message to store, if any
+
+    Returns:
+        bool: True if the task exists
+    """
+    from app.models.agent import AgentTaskModel
+    from app.schemas.agent import TaskStatus
+
+    now = datetime.utcnow()
+    values: Dict[str, Any] = {"status": status, "updated_at": now}
+    if result is not None:
+        values["result"] = result
+    if error is not None:
+        values["error"] = error
+    if status == TaskStatus.RUNNING:
+        values["started_at"] = now
+    if status in (TaskStatus.COMPLETED, TaskStatus.FAILED):
+        values["completed_at"] = now
+
+    statement = update(AgentTaskModel).where(AgentTaskModel.id == task_id).values(**values)
+    with get_engine().begin() as connection:
+        return connection.execute(statement).rowcount > 0
@@ -0,0 +1,65 @@
+import time
+import contextvars
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+# Absolute deadline (time.monotonic) for the current request or task. Asyncio
+# tasks copy the context on creation, so a deadline set around an HTTP request
+# or a Celery task reaches every Runner.run it starts.
+_deadline: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar("deadline", default=None)
+
+
+class DeadlineExceeded(Exception):
+    """Raised when work does not finish before its deadline."""
+
+
+@contextmanager
+def deadline_scope(seconds: Optional[float]) -> Iterator[None]:
+    """
+    Bound everything run inside the block by a deadline `seconds` from now.
+
+    A scope can only tighten an enclosing deadline, never extend it.
+
+    Args:
+        seconds: Time budget in seconds, or None to leave the current deadline unchanged
+    """
+    if seconds is None:
+        yield
+        return
+
+    deadline = time.monotonic() + max(seconds, 0.0)
+    current = _deadline.get()
+    if current is not None:
+        deadline = min(deadline, current)
+
+    token = _deadline.set(deadline)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining() -> Optional[float]:
+    """Return the seconds left before the current deadline, or None if unbounded."""
+    deadline = _deadline.get()
+    if deadline is None:
+        return None
+    return max(deadline - time.monotonic(), 0.0)
+
+
+def timeout_for(per_call: Optional[float]) -> Optional[float]:
+    """
+    Combine a per-call timeout with the current deadline.
+
+    Args:
+        per_call: Timeout for a single call in seconds, or None
+
+    Returns:
+        The tighter of the two bounds, or None if neither is set
+    """
+    left = remaining()
+    if left is None:
+        return per_call
+    if per_call is None:
+        return left
+    return min(per_call, left)
@@ -0,0 +1,121 @@
+import math
+import asyncio
+import logging
+import threading
+from collections import deque
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class LatencyWindow:
+    """Rolling window of recent call latencies used to pick hedge delays."""
+
+    def __init__(self, size: int = 200):
+        self._samples = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def percentile(self, pct: float) -> Optional[float]:
+        """Return the `pct` percentile of the window, or None if it is empty."""
+        with self._lock:
+            ordered = sorted(self._samples)
+        if not ordered:
+            return None
+        # Nearest-rank percentile
+        rank = math.ceil(pct / 100 * len(ordered))
+        return ordered[min(max(rank, 1), len(ordered)) - 1]
+
+
+class RunStats:
+    """Latency, timeout and hedging counters for one kind of call."""
+
+    def __init__(self, window_size: int = 200):
+        self.latency = LatencyWindow(window_size)
+        self.calls = 0
+        self.timeouts = 0
+        self.errors = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return the current counters and tail latencies as a dict."""
+        return {
+            "calls": self.calls,
+            "timeouts": self.timeouts,
+            "errors": self.errors,
+            "hedges": self.hedges,
+            "hedge_wins": self.hedge_wins,
+            "hedge_rate": self.hedges / self.calls if self.calls else 0.0,
+            "p50_seconds": self.latency.percentile(50),
+            "p95_seconds": self.latency.percentile(95),
+            "p99_seconds": self.latency.percentile(99),
+        }
+
+
+async def _cancel(task: asyncio.Task) -> None:
+    """Cancel a task and wait until it has actually finished unwinding."""
+    if task.done():
+        return
+    task.cancel()
+    try:
+        await task
+    except BaseException:
+        pass
+
+
+async def hedged_call(
+    call: Callable[[], Awaitable[Any]],
+    hedge_after: Optional[float],
+    stats: Optional[RunStats] = None,
+) -> Any:
+    """
+    Run `call`, firing a duplicate if it has not finished after `hedge_after` seconds.
+
+    The first attempt to succeed wins and the other one is cancelled. If the
+    first attempt to finish fails, the remaining attempt is still awaited.
+
+    Args:
+        call: Zero-argument factory returning a fresh awaitable per attempt
+        hedge_after: Delay before hedging in seconds, or None to never hedge
+        stats: Optional counters to record hedges and hedge wins in
+
+    Returns:
+        The result of the winning attempt
+    """
+    primary = asyncio.ensure_future(call())
+    if hedge_after is None:
+        return await primary
+
+    try:
+        done, _ = await asyncio.wait({primary}, timeout=hedge_after)
+        if done:
+            return primary.result()
+
+        if stats is not None:
+            stats.hedges += 1
+        logger.info(f"Hedging call still running after {hedge_after:.2f}s")
+        hedge = asyncio.ensure_future(call())
+        pending = {primary, hedge}
+
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for finished in done:
+                    if finished.exception() is None:
+                        if finished is hedge and stats is not None:
+                            stats.hedge_wins += 1
+                        return finished.result()
+            # Both attempts failed; surface the primary's error
+            return primary.result()
+        finally:
+            for task in (primary, hedge):
+                await _cancel(task)
+    finally:
+        await _cancel(primary)
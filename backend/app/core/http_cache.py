@@ -0,0 +1,120 @@
+"""
+Conditional GET helpers: ETag/Last-Modified validators and Cache-Control.
+
+Validators are derived from rows' updated_at rather than from response
+bodies, so a revalidation only needs the (id, updated_at) columns. The
+ETags are weak because they identify a version of the resource, not the
+exact bytes of one encoding of it.
+"""
+
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from fastapi import Request, Response
+
+
+def has_validators(request: Request) -> bool:
+    """True if the client sent If-None-Match or If-Modified-Since."""
+    return "if-none-match" in request.headers or "if-modified-since" in request.headers
+
+
+def parse_timestamp(value: Any) -> Optional[datetime]:
+    """Parse a database timestamp (ISO string or datetime) as an aware UTC datetime."""
+    if value is None:
+        return None
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value.replace('Z', '+00:00'))
+        except ValueError:
+            return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def make_etag(*parts: Any) -> str:
+    """
+    Build a weak ETag from the values that identify a resource version.
+
+    Timestamps are normalized first, so a raw row and its parsed response
+    model produce the same tag.
+    """
+    normalized = []
+    for part in parts:
+        timestamp = parse_timestamp(part) if isinstance(part, (str, datetime)) else None
+        normalized.append(timestamp.isoformat() if timestamp else str(part))
+    digest = hashlib.sha1("|".join(normalized).encode()).hexdigest()[:20]
+    return f'W/"{digest}"'
+
+
+def collection_version(versions: Iterable[Tuple[Any, Any]]) -> Tuple[str, Optional[datetime]]:
+    """
+    Summarize the versions of a listing's rows.
+
+    Args:
+        versions: (id, updated_at) of every row in the listing
+
+    Returns:
+        tuple: An ETag covering every row, so additions and deletions change
+            it too, and the newest updated_at
+    """
+    entries = sorted((str(row_id), parse_timestamp(updated_at)) for row_id, updated_at in versions)
+    etag = make_etag("collection", len(entries), *(f"{row_id}@{ts.isoformat() if ts else ''}" for row_id, ts in entries))
+    return etag, max((ts for _, ts in entries if ts is not None), default=None)
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    # Weak comparison (RFC 9110 13.1.2): the W/ prefix is ignored
+    if header.strip() == "*":
+        return True
+    bare = etag[2:] if etag.startswith("W/") else etag
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == bare:
+            return True
+    return False
+
+
+def is_not_modified(request: Request, etag: str, last_modified: Optional[datetime]) -> bool:
+    """
+    Evaluate If-None-Match, or If-Modified-Since when no ETag was sent.
+
+    Args:
+        request: The incoming request
+        etag: Current ETag of the resource
+        last_modified: Current modification time of the resource
+
+    Returns:
+        bool: True if the client's copy is current and a 304 can be sent
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        return _etag_matches(if_none_match, etag)
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        # HTTP dates have one-second resolution
+        return last_modified.replace(microsecond=0) <= since
+    return False
+
+
+def cache_headers(etag: str, last_modified: Optional[datetime], cache_control: str) -> Dict[str, str]:
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if last_modified is not None:
+        headers["Last-Modified"] = format_datetime(last_modified, usegmt=True)
+    return headers
+
+
+def not_modified(headers: Dict[str, str]) -> Response:
+    """A 304 carrying the validators and caching headers of the current version."""
+    return Response(status_code=304, headers=headers)
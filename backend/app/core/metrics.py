@@ -0,0 +1,328 @@
+"""
+Prometheus metrics for the API, Celery workers and agent runs.
+
+Labels are limited to route templates, task names, agent names and small
+fixed sets of outcomes so series counts stay bounded. When
+PROMETHEUS_MULTIPROC_DIR is set (gunicorn or Celery prefork), values from
+every process are aggregated at scrape time.
+"""
+
+import os
+import time
+import logging
+import contextvars
+from typing import Dict, Iterable, Optional
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    CollectorRegistry,
+    Counter,
+    Histogram,
+    REGISTRY,
+    generate_latest,
+    start_http_server,
+)
+from prometheus_client.core import GaugeMetricFamily
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Agent runs take seconds to minutes, so extend the default buckets upwards
+LLM_BUCKETS = (0.25, 0.5, 1, 2, 5, 10, 20, 30, 60, 120, 300)
+
+HTTP_REQUEST_DURATION = Histogram(
+    "pladder_http_request_duration_seconds",
+    "HTTP request latency by route template",
+    ["method", "route", "status"],
+)
+CELERY_TASK_QUEUE_WAIT = Histogram(
+    "pladder_celery_task_queue_wait_seconds",
+    "Time from enqueue to task start",
+    ["task"],
+    buckets=(0.01, 0.05, 0.1, 0.5, 1, 5, 10, 30, 60, 300, 900),
+)
+CELERY_TASK_RUNTIME = Histogram(
+    "pladder_celery_task_runtime_seconds",
+    "Celery task run time",
+    ["task", "state"],
+    buckets=LLM_BUCKETS,
+)
+AGENT_RUN_DURATION = Histogram(
+    "pladder_agent_run_duration_seconds",
+    "Runner.run latency per agent",
+    ["agent"],
+    buckets=LLM_BUCKETS,
+)
+AGENT_TOKENS = Counter(
+    "pladder_agent_tokens_total",
+    "LLM tokens used per agent",
+    ["agent", "kind"],
+)
+TASK_TOKENS = Counter(
+    "pladder_task_tokens_total",
+    "LLM tokens used by successful Celery tasks, with the input served from the provider's prompt cache",
+    ["task", "kind"],
+)
+AGENT_RUN_ERRORS = Counter(
+    "pladder_agent_run_errors_total",
+    "Failed agent runs per agent",
+    ["agent", "reason"],
+)
+AGENT_HEDGES = Counter(
+    "pladder_agent_hedges_total",
+    "Hedged duplicate runs fired per agent",
+    ["agent"],
+)
+AGENT_TRACES = Counter(
+    "pladder_agent_traces_total",
+    "Agents SDK traces by sampling decision",
+    ["decision"],
+)
+TASKS_CANCELLED = Counter(
+    "pladder_tasks_cancelled_total",
+    "Cancelled tasks by the stage they had reached",
+    ["task", "stage"],
+)
+TASKS_EXPIRED = Counter(
+    "pladder_tasks_expired_total",
+    "Tasks dropped unrun because they waited in the queue past their TTL",
+    ["task"],
+)
+CANCEL_SAVED_WORKER_SECONDS = Counter(
+    "pladder_cancel_saved_worker_seconds_total",
+    "Estimated worker time freed by cancelling tasks",
+    ["task"],
+)
+CANCEL_SAVED_TOKENS = Counter(
+    "pladder_cancel_saved_tokens_total",
+    "Estimated LLM tokens not spent because tasks were cancelled",
+    ["task"],
+)
+CACHE_REQUESTS = Counter(
+    "pladder_cache_requests_total",
+    "Cache lookups by cache and result",
+    ["cache", "result"],
+)
+
+SEMANTIC_CACHE_TOKENS = Counter(
+    "pladder_semantic_cache_tokens_total",
+    "LLM tokens of semantically cached searches, saved on hits or spent on misses",
+    ["result"],
+)
+
+
+def record_cache(cache: str, hit: bool) -> None:
+    """Count one cache lookup as a hit or a miss."""
+    CACHE_REQUESTS.labels(cache, "hit" if hit else "miss").inc()
+
+
+# Per-task token counts, by kind
+TOKEN_KINDS = ("input_tokens", "cached_input_tokens", "output_tokens")
+
+# Tokens used by the Celery task running in this context; asyncio tasks
+# share the dict, so runs in the task's event loop add to it
+_task_tokens: contextvars.ContextVar[Optional[Dict[str, int]]] = contextvars.ContextVar("task_tokens", default=None)
+
+
+def record_agent_run(agent: str, seconds: float, input_tokens: int, output_tokens: int) -> None:
+    """Record the latency and token usage of one successful agent run."""
+    AGENT_RUN_DURATION.labels(agent).observe(seconds)
+    usage = _task_tokens.get()
+    if usage is not None:
+        usage["tokens"] += input_tokens + output_tokens
+        usage["input_tokens"] = usage.get("input_tokens", 0) + input_tokens
+        usage["output_tokens"] = usage.get("output_tokens", 0) + output_tokens
+    if input_tokens:
+        AGENT_TOKENS.labels(agent, "input").inc(input_tokens)
+    if output_tokens:
+        AGENT_TOKENS.labels(agent, "output").inc(output_tokens)
+
+
+def record_cached_input_tokens(agent: str, tokens: int) -> None:
+    """
+    Record input tokens the provider served from its prompt cache.
+
+    They are part of the input tokens of the run's record_agent_run; the
+    count comes from app.core.agent_tracing.PromptCacheUsageProcessor.
+    """
+    AGENT_TOKENS.labels(agent, "cached_input").inc(tokens)
+    usage = _task_tokens.get()
+    if usage is not None:
+        usage["cached_input_tokens"] = usage.get("cached_input_tokens", 0) + tokens
+
+
+def task_usage() -> Optional[Dict[str, int]]:
+    """Tokens used so far by the Celery task running in this context, or None outside a task."""
+    usage = _task_tokens.get()
+    if usage is None:
+        return None
+    return {kind: usage.get(kind, 0) for kind in TOKEN_KINDS}
+
+
+class QueueDepthCollector:
+    """Reports Celery queue lengths from Redis, read only when scraped."""
+
+    def __init__(self, queues: Iterable[str]):
+        self.queues = list(queues)
+
+    def collect(self):
+        gauge = GaugeMetricFamily("pladder_celery_queue_depth", "Messages waiting per Celery queue", labels=["queue"])
+        try:
+            from app.core.redis_client import get_redis
+
+            pipe = get_redis().pipeline()
+            for queue in self.queues:
+                pipe.llen(queue)
+            for queue, depth in zip(self.queues, pipe.execute()):
+                gauge.add_metric([queue], depth)
+        except Exception as e:
+            logger.debug(f"Could not read queue depth: {str(e)}")
+        yield gauge
+
+
+def _queues() -> list:
+    queues = ["celery"]
+    if settings.SEARCH_SHARD_QUEUES:
+        queues += [f"search-shard-{i}" for i in range(settings.SEARCH_SHARD_COUNT)]
+    return queues
+
+
+_queue_collector_registered = False
+
+
+def _scrape_registry() -> CollectorRegistry:
+    """Build the registry to expose, merging processes in multiprocess mode."""
+    global _queue_collector_registered
+
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        registry.register(QueueDepthCollector(_queues()))
+        return registry
+
+    if not _queue_collector_registered:
+        REGISTRY.register(QueueDepthCollector(_queues()))
+        _queue_collector_registered = True
+    return REGISTRY
+
+
+def render_latest():
+    """Return (body, content_type) for a /metrics response."""
+    return generate_latest(_scrape_registry()), CONTENT_TYPE_LATEST
+
+
+def start_worker_exporter(process_index: Optional[int] = None) -> None:
+    """
+    Start the worker-side metrics HTTP server.
+
+    In multiprocess mode one server in the parent process serves every child;
+    otherwise each child serves its own metrics on WORKER_METRICS_PORT + 1 + index.
+    """
+    port = settings.WORKER_METRICS_PORT
+    if process_index is not None:
+        port += 1 + process_index
+    try:
+        start_http_server(port, registry=_scrape_registry())
+        logger.info(f"Worker metrics exporter listening on port {port}")
+    except OSError as e:
+        logger.error(f"Could not start worker metrics exporter on port {port}: {str(e)}")
+
+
+# Celery task timings, keyed by task id while the task runs
+_task_started: Dict[str, float] = {}
+
+
+class TaskCost:
+    """Moving averages of a task's run time and token use over its successful runs."""
+
+    def __init__(self, alpha: float = 0.1):
+        self.alpha = alpha
+        self.seconds: Optional[float] = None
+        self.tokens: Optional[float] = None
+
+    def record(self, seconds: float, tokens: int) -> None:
+        if self.seconds is None:
+            self.seconds, self.tokens = seconds, float(tokens)
+        else:
+            self.seconds += self.alpha * (seconds - self.seconds)
+            self.tokens += self.alpha * (tokens - self.tokens)
+
+
+# Per task name; the basis for estimating what a cancellation saved
+_task_costs: Dict[str, TaskCost] = {}
+
+
+def record_task_cancelled(task_id: str, task_name: str, stage: str) -> None:
+    """
+    Count a cancellation and estimate the worker time and tokens it saved.
+
+    The estimate is this process's average cost of a successful run of the
+    task minus what the cancelled run had already used.
+
+    Args:
+        task_id: The Celery ID of the cancelled task
+        task_name: The Celery task name
+        stage: "queued" if the task never started, otherwise "running"
+    """
+    TASKS_CANCELLED.labels(task_name, stage).inc()
+    cost = _task_costs.get(task_name)
+    if cost is None or cost.seconds is None:
+        return
+
+    started = _task_started.get(task_id)
+    elapsed = time.monotonic() - started if started is not None else 0.0
+    usage = _task_tokens.get() if stage == "running" else None
+    used_tokens = usage["tokens"] if usage else 0
+    CANCEL_SAVED_WORKER_SECONDS.labels(task_name).inc(max(cost.seconds - elapsed, 0.0))
+    CANCEL_SAVED_TOKENS.labels(task_name).inc(max(cost.tokens - used_tokens, 0.0))
+
+
+def on_task_publish(headers: Optional[dict] = None, **kwargs) -> None:
+    if headers is not None:
+        headers.setdefault("enqueued_at", time.time())
+
+
+def on_task_prerun(task_id: str = None, task=None, **kwargs) -> None:
+    now = time.time()
+    _task_started[task_id] = time.monotonic()
+    _task_tokens.set({"tokens": 0, **{kind: 0 for kind in TOKEN_KINDS}})
+    enqueued_at = task.request.get("enqueued_at") if task is not None else None
+    if enqueued_at:
+        CELERY_TASK_QUEUE_WAIT.labels(task.name).observe(max(now - float(enqueued_at), 0.0))
+
+
+def on_task_postrun(task_id: str = None, task=None, state: str = None, **kwargs) -> None:
+    started = _task_started.pop(task_id, None)
+    usage = _task_tokens.get()
+    _task_tokens.set(None)
+    if started is not None and task is not None:
+        runtime = time.monotonic() - started
+        CELERY_TASK_RUNTIME.labels(task.name, state or "UNKNOWN").observe(runtime)
+        if state == "SUCCESS":
+            _task_costs.setdefault(task.name, TaskCost()).record(runtime, usage["tokens"] if usage else 0)
+            for kind in TOKEN_KINDS:
+                if usage and usage.get(kind):
+                    TASK_TOKENS.labels(task.name, kind).inc(usage[kind])
+
+
+def on_task_revoked(sender=None, request=None, terminated: bool = False, expired: bool = False, **kwargs) -> None:
+    # A revoked or expired message is dropped when dequeued, before the task starts
+    if sender is None:
+        return
+    if expired:
+        TASKS_EXPIRED.labels(sender.name).inc()
+    elif not terminated:
+        record_task_cancelled(getattr(request, "id", None), sender.name, "queued")
+
+
+def connect_celery_signals() -> None:
+    """Hook task timing metrics into Celery's publish and execution signals."""
+    from celery.signals import before_task_publish, task_postrun, task_prerun, task_revoked
+
+    before_task_publish.connect(on_task_publish, weak=False)
+    task_prerun.connect(on_task_prerun, weak=False)
+    task_postrun.connect(on_task_postrun, weak=False)
+    task_revoked.connect(on_task_revoked, weak=False)
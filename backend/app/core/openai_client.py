@@ -0,0 +1,128 @@
+import os
+import asyncio
+import logging
+import threading
+import weakref
+from typing import Optional
+
+import httpx
+from openai import AsyncOpenAI
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# One client per event loop. Pooled connections are bound to the loop that
+# opened them, so threads running their own loops (eager tasks in the API
+# threadpool, thread-pool workers) each get their own pool. The PID is tracked
+# so clients inherited across a fork (Celery prefork workers) are never reused
+# by the child.
+_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, AsyncOpenAI]" = weakref.WeakKeyDictionary()
+_clients_pid: Optional[int] = None
+_clients_lock = threading.Lock()
+
+
+def _http2_available() -> bool:
+    """Return True if the optional `h2` package needed for HTTP/2 is installed."""
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def create_openai_client() -> AsyncOpenAI:
+    """
+    Build an AsyncOpenAI client backed by a tuned, keep-alive connection pool.
+
+    Returns:
+        AsyncOpenAI: A new client using the pool limits and timeouts from settings
+    """
+    http2 = settings.OPENAI_HTTP2 and _http2_available()
+    http_client = httpx.AsyncClient(
+        http2=http2,
+        limits=httpx.Limits(
+            max_connections=settings.OPENAI_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.OPENAI_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.OPENAI_KEEPALIVE_EXPIRY,
+        ),
+        timeout=httpx.Timeout(
+            settings.OPENAI_READ_TIMEOUT,
+            connect=settings.OPENAI_CONNECT_TIMEOUT,
+        ),
+    )
+
+    logger.info(
+        f"Created pooled OpenAI client (http2={http2}, "
+        f"max_connections={settings.OPENAI_MAX_CONNECTIONS}, "
+        f"keepalive={settings.OPENAI_MAX_KEEPALIVE_CONNECTIONS})"
+    )
+    return AsyncOpenAI(
+        api_key=settings.OPENAI_API_KEY or os.getenv("OPENAI_API_KEY"),
+        base_url=settings.OPENAI_BASE_URL,
+        max_retries=settings.OPENAI_MAX_RETRIES,
+        http_client=http_client,
+    )
+
+
+def get_openai_client(loop: Optional[asyncio.AbstractEventLoop] = None) -> AsyncOpenAI:
+    """
+    Returns the shared OpenAI client of an event loop, creating it on first use.
+
+    Args:
+        loop: The loop the client will be used from; defaults to the running loop
+
+    Raises:
+        RuntimeError: If no loop is given and none is running
+    """
+    global _clients, _clients_pid
+
+    if loop is None:
+        loop = asyncio.get_running_loop()
+    with _clients_lock:
+        if _clients_pid != os.getpid():
+            _clients = weakref.WeakKeyDictionary()
+            _clients_pid = os.getpid()
+        client = _clients.get(loop)
+        if client is None:
+            client = _clients[loop] = create_openai_client()
+    return client
+
+
+class LoopOpenAIClient:
+    """
+    Stands in for AsyncOpenAI as the Agents SDK default client.
+
+    The SDK keeps one default client for the whole process; this one forwards
+    every use to the shared client of the event loop it is used from.
+    """
+
+    def __init__(self):
+        # Read by the SDK when it is installed, outside any loop
+        self.api_key = settings.OPENAI_API_KEY or os.getenv("OPENAI_API_KEY")
+
+    def __getattr__(self, name):
+        return getattr(get_openai_client(), name)
+
+
+def install_default_openai_client() -> LoopOpenAIClient:
+    """
+    Install the shared clients as the Agents SDK default for every Runner.run.
+
+    Returns:
+        LoopOpenAIClient: The installed client, resolving to the running loop's client
+    """
+    from agents import set_default_openai_client
+
+    client = LoopOpenAIClient()
+    set_default_openai_client(client)
+    return client
+
+
+async def close_openai_client() -> None:
+    """Close the running loop's client's connection pool, if one was created in this process."""
+    loop = asyncio.get_running_loop()
+    with _clients_lock:
+        client = _clients.pop(loop, None) if _clients_pid == os.getpid() else None
+    if client is not None:
+        await client.close()
@@ -0,0 +1,245 @@
+"""
+On-demand CPU and memory profiling of single requests and Celery tasks.
+
+A sampling profiler thread walks the stack of the profiled thread (or of
+every thread) at PROFILING_INTERVAL and writes collapsed stacks, one
+"frame;frame;frame count" line per unique stack, which flamegraph.pl and
+speedscope read directly. Memory profiles dump a tracemalloc snapshot and
+the top allocation growth during the profiled unit of work; tracemalloc
+runs only while the profile does. With PROFILING_TRACEMALLOC_CONTINUOUS,
+the first memory profile leaves it running and later ones also report the
+growth since the previous memory profile in the same process, at a memory
+and CPU cost in that process from then on.
+
+Nothing is started unless a request or task asks for it, so the cost when
+idle is one header or kwarg lookup.
+"""
+
+import os
+import re
+import sys
+import time
+import hmac
+import logging
+import threading
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = "X-Profile-Token"
+PROFILE_MODE_HEADER = "X-Profile-Mode"
+TASK_PROFILE_KWARG = "_profile"
+
+MODES = ("cpu", "memory")
+
+# Mode of the profiled request currently being handled, forwarded to the tasks it enqueues
+_request_mode: ContextVar[Optional[str]] = ContextVar("profile_mode", default=None)
+
+# Last tracemalloc snapshot per process, to report growth between memory profiles
+_last_snapshot: Optional[tracemalloc.Snapshot] = None
+
+
+class SamplingProfiler:
+    """
+    Wall-clock sampling profiler that aggregates collapsed stacks.
+
+    Args:
+        thread_id: Thread to sample; None samples every thread except the sampler
+        interval: Seconds between samples
+    """
+
+    def __init__(self, thread_id: Optional[int] = None, interval: float = 0.005):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @staticmethod
+    def _collapse(frame) -> str:
+        stack = []
+        while frame is not None:
+            code = frame.f_code
+            stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+            frame = frame.f_back
+        return ";".join(reversed(stack))
+
+    def _sample(self) -> None:
+        own_id = threading.get_ident()
+        names = {}
+        while not self._stop.wait(self.interval):
+            frames = sys._current_frames()
+            if self.thread_id is not None:
+                frame = frames.get(self.thread_id)
+                if frame is not None:
+                    self.stacks[self._collapse(frame)] += 1
+            else:
+                if len(names) != len(frames):
+                    names = {thread.ident: thread.name for thread in threading.enumerate()}
+                for thread_id, frame in frames.items():
+                    if thread_id != own_id:
+                        self.stacks[f"{names.get(thread_id, thread_id)};{self._collapse(frame)}"] += 1
+            self.samples += 1
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._sample, name="pladder-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def write(self, path: str) -> None:
+        """Write the collected stacks in collapsed (folded) format."""
+        with open(path, "w") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+def _profile_path(name: str, extension: str) -> str:
+    os.makedirs(settings.PROFILING_DIR, exist_ok=True)
+    safe_name = re.sub(r"[^A-Za-z0-9_.-]+", "_", name).strip("_")[:80]
+    stamp = time.strftime("%Y%m%dT%H%M%S")
+    return os.path.join(settings.PROFILING_DIR, f"{safe_name}-{stamp}-{os.getpid()}.{extension}")
+
+
+def _write_memory_report(path: str, snapshot: tracemalloc.Snapshot, start: tracemalloc.Snapshot) -> None:
+    global _last_snapshot
+
+    limit = settings.PROFILING_MEMORY_TOP
+    with open(path, "w") as f:
+        f.write(f"# Allocation growth during this unit of work (top {limit})\n")
+        for stat in snapshot.compare_to(start, "lineno")[:limit]:
+            f.write(f"{stat}\n")
+        if _last_snapshot is not None:
+            f.write(f"\n# Allocation growth since the previous memory profile in this process (top {limit})\n")
+            for stat in snapshot.compare_to(_last_snapshot, "lineno")[:limit]:
+                f.write(f"{stat}\n")
+        f.write(f"\n# Largest live allocations (top {limit})\n")
+        for stat in snapshot.statistics("lineno")[:limit]:
+            f.write(f"{stat}\n")
+    # Only comparable with the next profile if nothing allocated in between goes untraced
+    _last_snapshot = snapshot if settings.PROFILING_TRACEMALLOC_CONTINUOUS else None
+
+
+@contextmanager
+def profile(name: str, mode: str = "cpu", all_threads: bool = False) -> Iterator[Dict[str, str]]:
+    """
+    Profile the enclosed block and write the results to PROFILING_DIR.
+
+    Args:
+        name: Label used in the output file names, e.g. the route or task name
+        mode: "cpu" for a sampled flamegraph, "memory" for that plus tracemalloc snapshots
+        all_threads: Sample every thread instead of only the calling one
+
+    Yields:
+        Dict that is filled with the paths of the written files when the block exits
+    """
+    paths: Dict[str, str] = {}
+    profiler = SamplingProfiler(None if all_threads else threading.get_ident(), settings.PROFILING_INTERVAL)
+
+    stop_tracemalloc = False
+    start_snapshot = None
+    if mode == "memory":
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(settings.PROFILING_TRACEMALLOC_FRAMES)
+            stop_tracemalloc = not settings.PROFILING_TRACEMALLOC_CONTINUOUS
+        start_snapshot = tracemalloc.take_snapshot()
+
+    profiler.start()
+    start = time.perf_counter()
+    try:
+        yield paths
+    finally:
+        profiler.stop()
+        elapsed = time.perf_counter() - start
+        try:
+            paths["cpu"] = _profile_path(name, "folded")
+            profiler.write(paths["cpu"])
+
+            if start_snapshot is not None:
+                snapshot = tracemalloc.take_snapshot()
+                paths["snapshot"] = _profile_path(name, "tracemalloc")
+                snapshot.dump(paths["snapshot"])
+                paths["memory"] = _profile_path(name, "memory.txt")
+                _write_memory_report(paths["memory"], snapshot, start_snapshot)
+
+            logger.info(f"Profiled {name} for {elapsed:.3f}s ({profiler.samples} samples): {paths}")
+        except Exception as e:
+            logger.error(f"Error writing profile for {name}: {str(e)}")
+        finally:
+            if stop_tracemalloc:
+                tracemalloc.stop()
+
+
+def requested_mode(token: Optional[str], mode: Optional[str]) -> Optional[str]:
+    """
+    Return the profiling mode a request asked for, if it is allowed to.
+
+    Args:
+        token: Value of the X-Profile-Token header
+        mode: Value of the X-Profile-Mode header, defaulting to "cpu"
+
+    Returns:
+        "cpu" or "memory", or None if profiling is off or the token does not match
+    """
+    if not token or not settings.PROFILING_TOKEN:
+        return None
+    if not hmac.compare_digest(token.encode("utf-8"), settings.PROFILING_TOKEN.encode("utf-8")):
+        return None
+    return mode if mode in MODES else "cpu"
+
+
+@contextmanager
+def request_scope(mode: str) -> Iterator[None]:
+    """Mark the current request as profiled so the tasks it enqueues are profiled too."""
+    token = _request_mode.set(mode)
+    try:
+        yield
+    finally:
+        _request_mode.reset(token)
+
+
+def current_request_mode() -> Optional[str]:
+    """Return the profiling mode of the request being handled, or None."""
+    return _request_mode.get()
+
+
+# Active task profiles, keyed by task id while the task runs
+_task_profiles: Dict[str, object] = {}
+
+
+def on_task_prerun(task_id: str = None, task=None, kwargs: dict = None, **extra) -> None:
+    """Start profiling a task that was enqueued with the _profile kwarg."""
+    if not kwargs or TASK_PROFILE_KWARG not in kwargs:
+        return
+    # Always strip the flag so task functions never see it
+    mode = kwargs.pop(TASK_PROFILE_KWARG)
+    if mode not in MODES:
+        return
+
+    scope = profile(f"task-{task.name if task is not None else 'unknown'}", mode)
+    scope.__enter__()
+    _task_profiles[task_id] = scope
+
+
+def on_task_postrun(task_id: str = None, **kwargs) -> None:
+    scope = _task_profiles.pop(task_id, None)
+    if scope is not None:
+        scope.__exit__(None, None, None)
+
+
+def connect_celery_signals() -> None:
+    """Hook on-demand task profiling into Celery's execution signals."""
+    from celery.signals import task_postrun, task_prerun
+
+    task_prerun.connect(on_task_prerun, weak=False)
+    task_postrun.connect(on_task_postrun, weak=False)
@@ -0,0 +1,191 @@
+"""
+Readiness probes for the API's dependencies.
+
+Each dependency (Redis broker, result backend, Supabase, model provider) is
+checked by a background task on a fixed interval and the outcome is cached,
+so /ready only reads a dict: it never blocks and never adds load to the
+dependencies however often the orchestrator polls it. A result older than
+READINESS_STALE_AFTER intervals counts as failing, so a wedged probe cannot
+keep a replica in rotation.
+"""
+
+import time
+import asyncio
+import logging
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class DependencyProbe:
+    """
+    A named, blocking reachability check with its last cached result.
+
+    Args:
+        name: Dependency name reported by /ready
+        check: Callable that raises if the dependency is unreachable
+        critical: Whether a failure makes the replica not ready
+    """
+
+    def __init__(self, name: str, check: Callable[[], Any], critical: bool = True):
+        self.name = name
+        self.check = check
+        self.critical = critical
+        self.result: Optional[Dict[str, Any]] = None
+        self.checked_at: Optional[float] = None
+
+    async def run(self, timeout: float) -> None:
+        start = time.perf_counter()
+        try:
+            await asyncio.wait_for(asyncio.to_thread(self.check), timeout=timeout)
+            result = {"ok": True}
+        except asyncio.TimeoutError:
+            result = {"ok": False, "error": f"timed out after {timeout}s"}
+        except Exception as e:
+            result = {"ok": False, "error": str(e) or type(e).__name__}
+
+        if not result["ok"] and (self.result is None or self.result["ok"]):
+            logger.warning(f"Readiness probe {self.name} failing: {result['error']}")
+        elif result["ok"] and self.result is not None and not self.result["ok"]:
+            logger.info(f"Readiness probe {self.name} recovered")
+
+        result["latency_ms"] = round((time.perf_counter() - start) * 1000, 1)
+        result["checked_at"] = datetime.utcnow().isoformat()
+        self.result = result
+        self.checked_at = time.monotonic()
+
+
+class ReadinessMonitor:
+    """Runs every probe in the background and serves the cached results."""
+
+    def __init__(self, probes: List[DependencyProbe], interval: float, timeout: float, stale_after: float):
+        self.probes = probes
+        self.interval = interval
+        self.timeout = timeout
+        self.stale_after = stale_after
+        self._tasks: List[asyncio.Task] = []
+
+    async def _loop(self, probe: DependencyProbe) -> None:
+        while True:
+            await probe.run(self.timeout)
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        """Start one probe loop per dependency on the running event loop."""
+        if not self._tasks:
+            self._tasks = [asyncio.create_task(self._loop(probe)) for probe in self.probes]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def status(self) -> Dict[str, Any]:
+        """
+        Summarize the cached probe results without running any probe.
+
+        Returns:
+            dict: "ready" plus one entry per dependency
+        """
+        now = time.monotonic()
+        ready = True
+        checks = {}
+        for probe in self.probes:
+            if probe.result is None:
+                check = {"ok": False, "error": "not checked yet"}
+            elif now - probe.checked_at > self.stale_after:
+                check = {**probe.result, "ok": False, "error": "result is stale"}
+            else:
+                check = dict(probe.result)
+            check["critical"] = probe.critical
+            checks[probe.name] = check
+            if probe.critical and not check["ok"]:
+                ready = False
+        return {"ready": ready, "checks": checks}
+
+
+def _redis_check(url: str) -> Callable[[], Any]:
+    # A dedicated client, so a probe never waits behind the app's pool
+    client = None
+
+    def check():
+        nonlocal client
+        if client is None:
+            import redis
+            client = redis.Redis.from_url(
+                url,
+                socket_connect_timeout=settings.READINESS_PROBE_TIMEOUT,
+                socket_timeout=settings.READINESS_PROBE_TIMEOUT,
+            )
+        client.ping()
+
+    return check
+
+
+def _supabase_check() -> None:
+    from app.core.supabase_client import get_supabase
+    get_supabase().table('agents').select('id').limit(1).execute()
+
+
+def _model_provider_check() -> Callable[[], Any]:
+    http_client = None
+
+    def check():
+        nonlocal http_client
+        if http_client is None:
+            import httpx
+            http_client = httpx.Client(timeout=settings.READINESS_PROBE_TIMEOUT)
+        base_url = (settings.OPENAI_BASE_URL or "https://api.openai.com/v1").rstrip("/")
+        response = http_client.get(
+            f"{base_url}/models",
+            headers={"Authorization": f"Bearer {settings.OPENAI_API_KEY}"},
+        )
+        # Any answer other than a server error means the provider is reachable
+        if response.status_code >= 500:
+            raise Exception(f"HTTP {response.status_code}")
+
+    return check
+
+
+def default_probes() -> List[DependencyProbe]:
+    """The API's dependencies; which ones gate readiness is set by READINESS_REQUIRED."""
+    required = {name.strip() for name in settings.READINESS_REQUIRED.split(",") if name.strip()}
+    probes = [
+        DependencyProbe("redis_broker", _redis_check(settings.CELERY_BROKER_URL)),
+        DependencyProbe("result_backend", _redis_check(settings.CELERY_RESULT_BACKEND)),
+        DependencyProbe("supabase", _supabase_check),
+    ]
+    if settings.OPENAI_API_KEY:
+        probes.append(DependencyProbe("model_provider", _model_provider_check()))
+    for probe in probes:
+        probe.critical = probe.name in required
+    return probes
+
+
+_monitor: Optional[ReadinessMonitor] = None
+
+
+def get_monitor() -> ReadinessMonitor:
+    """Returns this process's readiness monitor, creating it on first use."""
+    global _monitor
+    if _monitor is None:
+        _monitor = ReadinessMonitor(
+            default_probes(),
+            interval=settings.READINESS_PROBE_INTERVAL,
+            timeout=settings.READINESS_PROBE_TIMEOUT,
+            stale_after=settings.READINESS_PROBE_INTERVAL * settings.READINESS_STALE_AFTER,
+        )
+    return _monitor
+
+
+def start_readiness_probes() -> None:
+    get_monitor().start()
+
+
+async def stop_readiness_probes() -> None:
+    if _monitor is not None:
+        await _monitor.stop()
@@ -0,0 +1,25 @@
+import os
+import logging
+from typing import Optional
+
+import redis
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# One connection pool per process; a pool inherited across fork is discarded
+_client: Optional[redis.Redis] = None
+_client_pid: Optional[int] = None
+
+
+def get_redis() -> redis.Redis:
+    """
+    Returns the shared Redis client for this process, creating it on first use.
+    """
+    global _client, _client_pid
+
+    if _client is None or _client_pid != os.getpid():
+        _client = redis.Redis.from_url(settings.REDIS_URL)
+        _client_pid = os.getpid()
+    return _client
@@ -0,0 +1,326 @@
+"""
+Semantic cache for natural-language search queries.
+
+Paraphrased searches ("senior python backend SF", "Sr. Python backend
+engineer San Francisco") miss an exact-hash cache. Here a query is
+normalized, with abbreviations expanded and filler words dropped, and then
+embedded. A lookup returns the stored result of the most similar earlier
+query when their cosine similarity reaches SEMANTIC_CACHE_THRESHOLD.
+
+Entries are kept per tenant and per set of filters, in two Redis hashes:
+"semcache:<tenant>:<filters>:vectors" (entry -> embedding, expiry and the
+tokens the original run used) and ":results" (entry -> result). Filters
+are part of the key and are never matched approximately: a search in
+"San Francisco" must not be served to one in "New York". Entries expire
+after SEMANTIC_CACHE_TTL.
+
+Embeddings are local hashed word and character n-grams by default, which
+costs no request. When SEMANTIC_CACHE_EMBEDDING_MODEL is set, the query is
+embedded with that OpenAI model instead.
+
+The cache is best-effort: if Redis is unreachable, every lookup misses.
+"""
+
+import json
+import math
+import time
+import uuid
+import asyncio
+import hashlib
+import logging
+import re
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+from app.core import metrics
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "semcache:"
+
+# Local embedding dimensions; features are hashed into this many buckets
+DIMENSIONS = 1024
+
+ABBREVIATIONS = {
+    "sr": "senior",
+    "snr": "senior",
+    "jr": "junior",
+    "mid": "intermediate",
+    "sf": "san francisco",
+    "sfo": "san francisco",
+    "nyc": "new york",
+    "ny": "new york",
+    "la": "los angeles",
+    "uk": "united kingdom",
+    "us": "united states",
+    "usa": "united states",
+    "ml": "machine learning",
+    "ai": "artificial intelligence",
+    "js": "javascript",
+    "ts": "typescript",
+    "k8s": "kubernetes",
+    "yrs": "years",
+    "yoe": "years",
+    "exp": "experience",
+    "mgr": "manager",
+    "fe": "frontend",
+}
+
+# Words that say nothing about who is searched for
+FILLER_WORDS = {
+    "a", "an", "the", "and", "or", "with", "in", "at", "for", "of", "to", "who", "that",
+    "find", "search", "looking", "need", "want", "me", "some", "any",
+    "candidate", "candidates", "engineer", "engineers", "developer", "developers",
+    "dev", "devs", "eng", "role", "position", "someone", "people", "person",
+}
+
+
+def normalize_query(text: str) -> str:
+    """
+    Reduce a query to its meaningful words.
+
+    Lowercases, splits on anything but letters, digits, "+" and "#" (for
+    "c++" and "c#"), expands abbreviations and drops filler words.
+    """
+    words = []
+    for word in re.findall(r"[a-z0-9+#]+", text.lower()):
+        word = ABBREVIATIONS.get(word, word)
+        words.extend(part for part in word.split() if part not in FILLER_WORDS)
+    return " ".join(words)
+
+
+def query_text(value: Any) -> str:
+    """Flatten search requirements (text, lists or dicts) into one string."""
+    if isinstance(value, dict):
+        return " ".join(query_text(value[key]) for key in sorted(value))
+    if isinstance(value, (list, tuple, set)):
+        return " ".join(query_text(item) for item in value)
+    return "" if value is None else str(value)
+
+
+def filters_key(filters: Optional[Dict[str, Any]]) -> str:
+    """A short digest of filters that equal filters, however written, share."""
+    def canonical(value):
+        if isinstance(value, dict):
+            return {str(key).lower(): canonical(item) for key, item in value.items() if item not in (None, "", [], {})}
+        if isinstance(value, (list, tuple, set)):
+            return sorted(canonical(item) for item in value)
+        if isinstance(value, str):
+            return normalize_query(value)
+        return value
+
+    encoded = json.dumps(canonical(filters or {}), sort_keys=True, default=str)
+    return hashlib.sha1(encoded.encode()).hexdigest()[:16]
+
+
+def _bucket(feature: str) -> Tuple[int, float]:
+    digest = hashlib.md5(feature.encode()).digest()
+    return int.from_bytes(digest[:4], "little") % DIMENSIONS, 1.0 if digest[4] & 1 else -1.0
+
+
+def local_embedding(text: str) -> Dict[int, float]:
+    """
+    Embed normalized text as a sparse, unit-length vector of hashed features.
+
+    Whole words carry most of the weight, and character trigrams make small
+    spelling differences ("postgres", "postgresql") count as near matches.
+    """
+    vector: Dict[int, float] = {}
+    for word in text.split():
+        features = [(f"w:{word}", 1.0)]
+        padded = f" {word} "
+        trigrams = [padded[i:i + 3] for i in range(len(padded) - 2)]
+        features.extend((f"c:{trigram}", 0.5 / math.sqrt(len(trigrams))) for trigram in trigrams)
+        for feature, weight in features:
+            index, sign = _bucket(feature)
+            vector[index] = vector.get(index, 0.0) + sign * weight
+    norm = math.sqrt(sum(value * value for value in vector.values()))
+    return {index: value / norm for index, value in vector.items()} if norm else {}
+
+
+async def embed(text: str) -> Dict[int, float]:
+    """Embed normalized query text with the configured model."""
+    if not settings.SEMANTIC_CACHE_EMBEDDING_MODEL:
+        return local_embedding(text)
+
+    from app.core.openai_client import get_openai_client
+
+    response = await get_openai_client().embeddings.create(model=settings.SEMANTIC_CACHE_EMBEDDING_MODEL, input=text)
+    dense = response.data[0].embedding
+    norm = math.sqrt(sum(value * value for value in dense)) or 1.0
+    return {index: value / norm for index, value in enumerate(dense)}
+
+
+def similarity(a: Dict[int, float], b: Dict[int, float]) -> float:
+    """Cosine similarity of two unit-length sparse vectors."""
+    if len(a) > len(b):
+        a, b = b, a
+    return sum(value * b.get(index, 0.0) for index, value in a.items())
+
+
+class CacheStats:
+    """Lookups and LLM tokens saved or spent by one process's cache."""
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.tokens_saved = 0
+        self.tokens_spent = 0
+        self._lock = threading.Lock()
+
+    def record_hit(self, tokens: int) -> None:
+        with self._lock:
+            self.hits += 1
+            self.tokens_saved += tokens
+        metrics.record_cache("semantic_search", True)
+        metrics.SEMANTIC_CACHE_TOKENS.labels("saved").inc(tokens)
+
+    def record_miss(self, tokens: int) -> None:
+        with self._lock:
+            self.misses += 1
+            self.tokens_spent += tokens
+        metrics.record_cache("semantic_search", False)
+        metrics.SEMANTIC_CACHE_TOKENS.labels("spent").inc(tokens)
+
+    def snapshot(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        budget = self.tokens_saved + self.tokens_spent
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "tokens_saved": self.tokens_saved,
+            "tokens_spent": self.tokens_spent,
+            # Share of the tokens these searches would have cost without the cache
+            "budget_saved": self.tokens_saved / budget if budget else 0.0,
+        }
+
+
+class SemanticCache:
+    """
+    Stores search results under the embedding of their query.
+
+    Args:
+        redis: Redis client; defaults to the process's shared client
+        threshold: Minimum cosine similarity for a hit
+        ttl: Seconds an entry is served
+        max_entries: Entries kept per tenant and filters; the soonest to expire go first
+    """
+
+    def __init__(self, redis=None, threshold: float = None, ttl: int = None, max_entries: int = None):
+        self._redis = redis
+        self.threshold = settings.SEMANTIC_CACHE_THRESHOLD if threshold is None else threshold
+        self.ttl = ttl or settings.SEMANTIC_CACHE_TTL
+        self.max_entries = max_entries or settings.SEMANTIC_CACHE_MAX_ENTRIES
+        self.stats = CacheStats()
+
+    @property
+    def redis(self):
+        if self._redis is None:
+            from app.core.redis_client import get_redis
+            self._redis = get_redis()
+        return self._redis
+
+    def key_for(self, tenant_id: str, filters: Optional[Dict[str, Any]]) -> str:
+        return f"{KEY_PREFIX}{tenant_id}:{filters_key(filters)}"
+
+    def nearest(self, key: str, vector: Dict[int, float]) -> Optional[Tuple[float, str, int]]:
+        """
+        Find the most similar live entry under a key.
+
+        Returns:
+            tuple: (similarity, entry ID, tokens the entry's run used), or None
+        """
+        now = time.time()
+        best = None
+        expired = []
+        for entry_id, raw in self.redis.hgetall(f"{key}:vectors").items():
+            entry = json.loads(raw)
+            if entry["expires_at"] <= now:
+                expired.append(entry_id)
+                continue
+            score = similarity(vector, {int(index): value for index, value in entry["vector"].items()})
+            if best is None or score > best[0]:
+                best = (score, entry_id.decode() if isinstance(entry_id, bytes) else entry_id, entry["tokens"])
+        if expired:
+            pipeline = self.redis.pipeline(transaction=False)
+            pipeline.hdel(f"{key}:vectors", *expired)
+            pipeline.hdel(f"{key}:results", *expired)
+            pipeline.execute()
+        return best
+
+    def lookup(self, key: str, vector: Dict[int, float]) -> Optional[Tuple[Any, int]]:
+        """
+        Return the stored result of the nearest earlier query above the threshold.
+
+        Returns:
+            tuple: (result, tokens saved), or None on a miss
+        """
+        nearest = self.nearest(key, vector)
+        if nearest is None or nearest[0] < self.threshold:
+            return None
+        raw = self.redis.hget(f"{key}:results", nearest[1])
+        return (json.loads(raw), nearest[2]) if raw is not None else None
+
+    def store(self, key: str, vector: Dict[int, float], result: Any, tokens: int) -> None:
+        """Store a result under a query's embedding."""
+        entry_id = uuid.uuid4().hex
+        entry = {"vector": vector, "expires_at": time.time() + self.ttl, "tokens": tokens}
+        pipeline = self.redis.pipeline()
+        pipeline.hset(f"{key}:vectors", entry_id, json.dumps(entry))
+        pipeline.hset(f"{key}:results", entry_id, json.dumps(result, default=str))
+        pipeline.expire(f"{key}:vectors", self.ttl)
+        pipeline.expire(f"{key}:results", self.ttl)
+        pipeline.hlen(f"{key}:vectors")
+        *_, size = pipeline.execute()
+        if size > self.max_entries:
+            self._evict(key, size - self.max_entries)
+
+    def _evict(self, key: str, count: int) -> None:
+        entries = self.redis.hgetall(f"{key}:vectors")
+        oldest = sorted(entries, key=lambda entry_id: json.loads(entries[entry_id])["expires_at"])[:count]
+        pipeline = self.redis.pipeline(transaction=False)
+        pipeline.hdel(f"{key}:vectors", *oldest)
+        pipeline.hdel(f"{key}:results", *oldest)
+        pipeline.execute()
+
+    async def get_or_run(self, tenant_id: Optional[str], query: str, filters: Optional[Dict[str, Any]], run) -> Tuple[Any, bool]:
+        """
+        Serve a search from the cache, or run it and cache its result.
+
+        Args:
+            tenant_id: Whose cache to use; without one the search always runs
+            query: The search's natural-language text
+            filters: The search's filters, matched exactly
+            run: Coroutine function returning (result, tokens used)
+
+        Returns:
+            tuple: The result and whether it came from the cache
+        """
+        if not tenant_id or not settings.SEMANTIC_CACHE_ENABLED:
+            result, _ = await run()
+            return result, False
+
+        key = self.key_for(tenant_id, filters)
+        vector = None
+        try:
+            vector = await embed(normalize_query(query))
+            cached = await asyncio.to_thread(self.lookup, key, vector)
+        except Exception as e:
+            logger.warning(f"Semantic cache lookup failed: {str(e)}")
+            cached = None
+
+        if cached is not None:
+            result, tokens = cached
+            self.stats.record_hit(tokens)
+            return result, True
+
+        result, tokens = await run()
+        self.stats.record_miss(tokens)
+        if vector is not None:
+            try:
+                await asyncio.to_thread(self.store, key, vector, result, tokens)
+            except Exception as e:
+                logger.warning(f"Could not cache search result: {str(e)}")
+        return result, False
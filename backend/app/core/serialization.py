@@ -0,0 +1,131 @@
+"""
+Compact binary serialization for Celery messages and results.
+
+The "pladder" serializer encodes with msgpack and compresses bodies above
+CELERY_COMPRESSION_THRESHOLD bytes with zstd (or gzip when zstandard is not
+installed). The first byte of every body names the codec, so compressed and
+uncompressed bodies can be mixed freely and decoded without configuration.
+"""
+
+import gzip
+import enum
+import logging
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Dict
+from uuid import UUID
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+SERIALIZER_NAME = "pladder"
+CONTENT_TYPE = "application/x-pladder-msgpack"
+
+_RAW = b"\x00"
+_GZIP = b"\x01"
+_ZSTD = b"\x02"
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - optional dependency
+    msgpack = None
+
+try:
+    import zstandard
+    _zstd_compressor = zstandard.ZstdCompressor(level=3)
+    _zstd_decompressor = zstandard.ZstdDecompressor()
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
+
+
+def _default(value: Any) -> Any:
+    """Convert types msgpack does not know the same way the JSON serializer would."""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, (UUID, Decimal)):
+        return str(value)
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    if hasattr(value, "model_dump"):
+        return value.model_dump(mode="json")
+    raise TypeError(f"Cannot serialize object of type {type(value).__name__}")
+
+
+def _compression() -> str:
+    compression = settings.CELERY_COMPRESSION
+    if compression == "zstd" and zstandard is None:
+        return "gzip"
+    return compression
+
+
+def dumps(value: Any) -> bytes:
+    """Encode a value with msgpack, compressing it if it is above the threshold."""
+    body = msgpack.packb(value, default=_default, use_bin_type=True)
+    if len(body) < settings.CELERY_COMPRESSION_THRESHOLD:
+        return _RAW + body
+
+    compression = _compression()
+    if compression == "zstd":
+        return _ZSTD + _zstd_compressor.compress(body)
+    if compression == "gzip":
+        return _GZIP + gzip.compress(body, compresslevel=6)
+    return _RAW + body
+
+
+def loads(data: bytes) -> Any:
+    """Decode a body produced by dumps."""
+    if isinstance(data, str):
+        data = data.encode("latin-1")
+    codec, body = data[:1], data[1:]
+    if codec == _ZSTD:
+        body = _zstd_decompressor.decompress(body)
+    elif codec == _GZIP:
+        body = gzip.decompress(body)
+    return msgpack.unpackb(body, raw=False, strict_map_key=False)
+
+
+def register_serializers() -> bool:
+    """
+    Register the pladder serializer with kombu.
+
+    Returns:
+        bool: True if registered, False if msgpack is not installed
+    """
+    if msgpack is None:
+        logger.warning("msgpack not installed, Celery will keep using JSON")
+        return False
+
+    from kombu.serialization import register
+
+    register(SERIALIZER_NAME, dumps, loads, content_type=CONTENT_TYPE, content_encoding="binary")
+    return True
+
+
+def task_serializers() -> Dict[str, str]:
+    """
+    Parse per-task serializer overrides from CELERY_TASK_SERIALIZERS.
+
+    The setting is a comma-separated list of `task_name=serializer` pairs, e.g.
+    "app.agents.celery_tasks.process_task=json".
+    """
+    overrides = {}
+    for pair in settings.CELERY_TASK_SERIALIZERS.split(","):
+        if "=" in pair:
+            task_name, serializer = pair.split("=", 1)
+            overrides[task_name.strip()] = serializer.strip()
+    return overrides
+
+
+def available_serializer(serializer: str) -> str:
+    """Return the serializer, falling back to JSON if it needs msgpack and msgpack is missing."""
+    if serializer == SERIALIZER_NAME and msgpack is None:
+        return "json"
+    return serializer
+
+
+def serializer_for(task_name: str) -> str:
+    """Return the serializer to send a task's messages with."""
+    return available_serializer(task_serializers().get(task_name, settings.CELERY_SERIALIZER))
@@ -1,16 +1,15 @@
-import os
-from supabase import create_client, Client
+from typing import TYPE_CHECKING
 
-# Get Supabase credentials from environment variables
-SUPABASE_URL = os.environ.get("SUPABASE_URL", "")
-SUPABASE_KEY = os.environ.get("SUPABASE_KEY", "")
+from app.core.supabase_client import get_supabase
 
-# Create a Supabase client
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
+if TYPE_CHECKING:
+    from supabase import Client
 
-def get_supabase_client() -> Client:
+
+def get_supabase_client() -> "Client":
     """
     Returns a Supabase client instance.
     This function allows us to access the Supabase client throughout the application.
+    The client is shared with app.core.supabase_client and created on first use.
     """
-    return supabase 
\ No newline at end of file
+    return get_supabase()
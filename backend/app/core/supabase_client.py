@@ -1,25 +1,115 @@
+"""
+The per-process Supabase client.
+
+Every query goes through one PostgREST HTTP session whose connection pool,
+keep-alive and timeouts come from settings, so repeated queries reuse warm
+TLS connections instead of handshaking again. The client is created in the
+API lifespan and in Celery's worker_process_init (or on first use, for
+one-off commands) and recreated after fork, like the OpenAI client.
+"""
+
 import os
 import logging
-from supabase import create_client, Client
+from typing import TYPE_CHECKING, Optional
+
+import httpx
 
 from app.core.config import settings
 
+if TYPE_CHECKING:
+    from supabase import Client
+
 logger = logging.getLogger(__name__)
 
-# Create a Supabase client
-try:
-    supabase: Client = create_client(settings.SUPABASE_URL, settings.SUPABASE_KEY)
-    logger.info(f"Supabase client created with URL: {settings.SUPABASE_URL}")
-except Exception as e:
-    logger.error(f"Error creating Supabase client: {str(e)}")
-    # Create a placeholder client for error handling
-    supabase = None
+# Created on first use: the supabase package is slow to import and most
+# processes (workers, one-off commands) never need it
+supabase: Optional["Client"] = None
+_supabase_pid: Optional[int] = None
+
+
+def supabase_limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=settings.SUPABASE_MAX_CONNECTIONS,
+        max_keepalive_connections=settings.SUPABASE_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=settings.SUPABASE_KEEPALIVE_EXPIRY,
+    )
+
+
+def supabase_timeout() -> httpx.Timeout:
+    return httpx.Timeout(
+        settings.SUPABASE_READ_TIMEOUT,
+        connect=settings.SUPABASE_CONNECT_TIMEOUT,
+        pool=settings.SUPABASE_POOL_TIMEOUT,
+    )
+
+
+def create_supabase_client() -> "Client":
+    """
+    Build a Supabase client whose PostgREST session uses the configured pool.
+
+    supabase-py 1.0 does not accept an HTTP client, so the session it builds
+    is replaced with one carrying the same base URL and headers.
+
+    Returns:
+        Client: A new Supabase client
+    """
+    from postgrest.utils import SyncClient
+    from supabase import create_client
+
+    client = create_client(settings.SUPABASE_URL, settings.SUPABASE_KEY)
+    default_session = client.postgrest.session
+    client.postgrest.session = SyncClient(
+        base_url=default_session.base_url,
+        headers=default_session.headers,
+        limits=supabase_limits(),
+        timeout=supabase_timeout(),
+    )
+    default_session.close()
+
+    logger.info(
+        f"Supabase client created with URL: {settings.SUPABASE_URL} "
+        f"(max_connections={settings.SUPABASE_MAX_CONNECTIONS}, "
+        f"keepalive={settings.SUPABASE_MAX_KEEPALIVE_CONNECTIONS})"
+    )
+    return client
+
+
+def init_supabase() -> "Client":
+    """
+    Create this process's Supabase client if it does not exist yet.
+
+    Returns:
+        Client: The shared client
+    """
+    global supabase, _supabase_pid
+
+    if supabase is None or _supabase_pid != os.getpid():
+        try:
+            supabase = create_supabase_client()
+            _supabase_pid = os.getpid()
+        except Exception as e:
+            logger.error(f"Error creating Supabase client: {str(e)}")
+            raise Exception("Supabase client not initialized") from e
+    return supabase
 
-def get_supabase() -> Client:
+
+def get_supabase() -> "Client":
     """
     Returns a Supabase client instance.
     This function is used as a dependency to ensure consistent client access.
     """
-    if supabase is None:
-        raise Exception("Supabase client not initialized")
-    return supabase 
\ No newline at end of file
+    if supabase is not None and _supabase_pid in (None, os.getpid()):
+        return supabase
+    return init_supabase()
+
+
+def close_supabase() -> None:
+    """Close this process's pooled Supabase connections."""
+    global supabase, _supabase_pid
+
+    if supabase is not None and _supabase_pid == os.getpid():
+        session = getattr(getattr(supabase, "postgrest", None), "session", None)
+        if session is not None:
+            session.close()
+    supabase = None
+    _supabase_pid = None
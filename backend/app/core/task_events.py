@@ -0,0 +1,175 @@
+"""
+Task status notifications over Redis pub/sub, for long-polling clients.
+
+Whoever updates a task's status publishes its new status on
+"task-status:<task_id>". Each API process keeps one pub/sub connection
+(TaskEventHub) shared by every waiting request. A channel is subscribed
+while at least one request waits on it, and a reader task wakes the
+waiters' asyncio events. A waiting request therefore holds no threadpool
+thread and issues no database queries until it wakes.
+
+Notifications are best-effort: if Redis is unreachable, publishers carry
+on and waiters are released to re-read the database, so a long poll
+degrades to an ordinary poll and never outlives its timeout.
+"""
+
+import asyncio
+import logging
+from typing import Dict, List, Optional, Set
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+CHANNEL_PREFIX = "task-status:"
+
+
+def channel_for(task_id: str) -> str:
+    return f"{CHANNEL_PREFIX}{task_id}"
+
+
+def publish_task_update(task_id: str, status: str) -> None:
+    """
+    Notify long-polling clients that a task's status changed.
+
+    Args:
+        task_id: The ID of the task
+        status: The new status value
+    """
+    try:
+        from app.core.redis_client import get_redis
+        get_redis().publish(channel_for(task_id), status)
+    except Exception as e:
+        logger.debug(f"Could not publish status of task {task_id}: {str(e)}")
+
+
+def publish_task_updates(task_ids: List[str], status: str) -> None:
+    """Notify long-polling clients of many tasks in one pipelined round trip."""
+    try:
+        from app.core.redis_client import get_redis
+        pipeline = get_redis().pipeline(transaction=False)
+        for task_id in task_ids:
+            pipeline.publish(channel_for(task_id), status)
+        pipeline.execute()
+    except Exception as e:
+        logger.debug(f"Could not publish status of {len(task_ids)} tasks: {str(e)}")
+
+
+class TaskEventHub:
+    """Fans one Redis pub/sub connection out to the requests waiting on tasks."""
+
+    def __init__(self, redis_url: Optional[str] = None):
+        self.redis_url = redis_url or settings.REDIS_URL
+        self._redis = None
+        self._pubsub = None
+        self._reader: Optional[asyncio.Task] = None
+        self._waiters: Dict[str, Set[asyncio.Event]] = {}
+        self._lock = asyncio.Lock()
+
+    async def _ensure_connected(self):
+        if self._pubsub is None:
+            import redis.asyncio as aioredis
+            self._redis = aioredis.Redis.from_url(self.redis_url)
+            self._pubsub = self._redis.pubsub(ignore_subscribe_messages=True)
+        return self._pubsub
+
+    async def _read(self) -> None:
+        try:
+            while True:
+                message = await self._pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                if message and message.get("type") == "message":
+                    channel = message["channel"]
+                    if isinstance(channel, bytes):
+                        channel = channel.decode()
+                    self._wake(channel)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"Task event reader stopped: {str(e)}")
+            await self._release_all()
+
+    def _wake(self, channel: str) -> None:
+        for event in self._waiters.get(channel, ()):
+            event.set()
+
+    async def _release_all(self) -> None:
+        # Everyone falls back to the database; the next subscribe reconnects
+        for channel in list(self._waiters):
+            self._wake(channel)
+        await self._reset()
+
+    async def _reset(self) -> None:
+        pubsub, client = self._pubsub, self._redis
+        self._pubsub = self._redis = self._reader = None
+        self._waiters.clear()
+        try:
+            if pubsub is not None:
+                await pubsub.close()
+            if client is not None:
+                await client.close()
+        except Exception:
+            pass
+
+    async def subscribe(self, task_id: str) -> asyncio.Event:
+        """
+        Start listening for a task's next status change.
+
+        Subscribe before reading the task's current state, so a change that
+        lands in between is not missed.
+
+        Returns:
+            asyncio.Event: Set when the task's status changes
+        """
+        channel = channel_for(task_id)
+        event = asyncio.Event()
+        async with self._lock:
+            try:
+                pubsub = await self._ensure_connected()
+                if channel not in self._waiters:
+                    await pubsub.subscribe(channel)
+                    self._waiters[channel] = set()
+            except Exception:
+                await self._release_all()
+                raise
+            self._waiters[channel].add(event)
+            if self._reader is None or self._reader.done():
+                self._reader = asyncio.create_task(self._read())
+        return event
+
+    async def unsubscribe(self, task_id: str, event: asyncio.Event) -> None:
+        channel = channel_for(task_id)
+        async with self._lock:
+            waiters = self._waiters.get(channel)
+            if waiters is None:
+                return
+            waiters.discard(event)
+            if not waiters:
+                del self._waiters[channel]
+                try:
+                    await self._pubsub.unsubscribe(channel)
+                except Exception as e:
+                    logger.debug(f"Could not unsubscribe from {channel}: {str(e)}")
+
+    async def close(self) -> None:
+        if self._reader is not None:
+            self._reader.cancel()
+            await asyncio.gather(self._reader, return_exceptions=True)
+        await self._reset()
+
+
+_hub: Optional[TaskEventHub] = None
+
+
+def get_event_hub() -> TaskEventHub:
+    """Returns this process's event hub, creating it on first use."""
+    global _hub
+    if _hub is None:
+        _hub = TaskEventHub()
+    return _hub
+
+
+async def close_event_hub() -> None:
+    global _hub
+    if _hub is not None:
+        await _hub.close()
+        _hub = None
@@ -0,0 +1,240 @@
+"""
+Distributed tracing with OpenTelemetry, from the HTTP request through the
+Celery message to every Runner.run and handoff.
+
+Trace context travels as W3C `traceparent` headers: HTTP request headers into
+the API, Celery message headers into the worker. Spans are head-sampled with
+a parent-based ratio sampler and exported in batches to an OTLP collector, or
+to a local JSONL file when no collector is configured. Without the
+opentelemetry SDK installed, or with TRACING_ENABLED unset, every helper here
+is a no-op.
+"""
+
+import os
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+try:
+    from opentelemetry import context as otel_context
+    from opentelemetry import propagate, trace
+    from opentelemetry.sdk.resources import Resource
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import BatchSpanProcessor, SpanExporter, SpanExportResult
+    from opentelemetry.sdk.trace.sampling import ParentBased, TraceIdRatioBased
+    from opentelemetry.trace import SpanKind, Status, StatusCode
+except ImportError:  # pragma: no cover - optional dependency
+    trace = None
+
+_tracer = None
+_tracer_pid: Optional[int] = None
+
+
+if trace is not None:
+
+    class JsonlFileSpanExporter(SpanExporter):
+        """Appends finished spans to a local JSONL file, one span per line."""
+
+        def __init__(self, path: str):
+            self.path = path
+            self._lock = threading.Lock()
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+        def export(self, spans) -> "SpanExportResult":
+            lines = "".join(span.to_json(indent=None) + "\n" for span in spans)
+            with self._lock, open(self.path, "a") as f:
+                f.write(lines)
+            return SpanExportResult.SUCCESS
+
+        def shutdown(self) -> None:
+            pass
+
+
+def _create_exporter():
+    if settings.OTEL_EXPORTER_OTLP_ENDPOINT:
+        try:
+            from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+            return OTLPSpanExporter(endpoint=settings.OTEL_EXPORTER_OTLP_ENDPOINT)
+        except ImportError:
+            logger.warning("OTLP exporter not installed, writing traces to a local file instead")
+    return JsonlFileSpanExporter(settings.TRACING_FILE)
+
+
+def init_tracing(service_name: str) -> bool:
+    """
+    Configure the tracer provider for this process.
+
+    Args:
+        service_name: Reported as service.name, e.g. "pladder-api" or "pladder-worker"
+
+    Returns:
+        bool: True if tracing is active in this process
+    """
+    global _tracer, _tracer_pid
+
+    if trace is None or not settings.TRACING_ENABLED:
+        return False
+    if _tracer is not None and _tracer_pid == os.getpid():
+        return True
+
+    provider = TracerProvider(
+        resource=Resource.create({"service.name": service_name}),
+        sampler=ParentBased(TraceIdRatioBased(settings.TRACING_SAMPLE_RATIO)),
+    )
+    provider.add_span_processor(BatchSpanProcessor(_create_exporter()))
+    trace.set_tracer_provider(provider)
+
+    _tracer = provider.get_tracer("pladder")
+    _tracer_pid = os.getpid()
+    logger.info(f"Tracing enabled for {service_name} (sample ratio {settings.TRACING_SAMPLE_RATIO})")
+    return True
+
+
+def is_enabled() -> bool:
+    return _tracer is not None and _tracer_pid == os.getpid()
+
+
+@contextmanager
+def span(name: str, attributes: Optional[Dict[str, Any]] = None, kind=None) -> Iterator[Any]:
+    """
+    Run the block inside a span that is a child of the current span.
+
+    Yields the span, or None when tracing is disabled.
+    """
+    if not is_enabled():
+        yield None
+        return
+
+    with _tracer.start_as_current_span(name, kind=kind or SpanKind.INTERNAL, attributes=attributes) as current:
+        yield current
+
+
+def inject_headers() -> Dict[str, str]:
+    """Return trace-context headers for an outgoing message, or {} when disabled."""
+    if not is_enabled():
+        return {}
+    carrier: Dict[str, str] = {}
+    propagate.inject(carrier)
+    return carrier
+
+
+@contextmanager
+def server_span(name: str, carrier: Any, attributes: Optional[Dict[str, Any]] = None) -> Iterator[Any]:
+    """Start a SERVER span continuing the trace found in incoming headers."""
+    if not is_enabled():
+        yield None
+        return
+
+    token = otel_context.attach(propagate.extract(carrier))
+    try:
+        with _tracer.start_as_current_span(name, kind=SpanKind.SERVER, attributes=attributes) as current:
+            yield current
+    finally:
+        otel_context.detach(token)
+
+
+# Celery task spans, keyed by task id while the task runs
+_task_spans: Dict[str, Any] = {}
+
+
+def on_task_prerun(task_id: str = None, task=None, **kwargs) -> None:
+    """Continue the publisher's trace in the worker and record broker wait."""
+    if not is_enabled() or task is None:
+        return
+
+    carrier = {"traceparent": task.request.get("traceparent")}
+    if task.request.get("tracestate"):
+        carrier["tracestate"] = task.request.get("tracestate")
+    parent = propagate.extract(carrier)
+
+    enqueued_at = task.request.get("enqueued_at")
+    if enqueued_at:
+        wait = _tracer.start_span(
+            "celery.broker_wait", context=parent, kind=SpanKind.CONSUMER,
+            start_time=int(float(enqueued_at) * 1e9), attributes={"celery.task": task.name},
+        )
+        wait.end()
+
+    task_span = _tracer.start_span(
+        f"celery.task {task.name}", context=parent, kind=SpanKind.CONSUMER,
+        attributes={"celery.task": task.name, "celery.task_id": task_id},
+    )
+    token = otel_context.attach(trace.set_span_in_context(task_span))
+    _task_spans[task_id] = (task_span, token)
+
+
+def on_task_postrun(task_id: str = None, state: str = None, **kwargs) -> None:
+    entry = _task_spans.pop(task_id, None)
+    if entry is None:
+        return
+    task_span, token = entry
+    task_span.set_attribute("celery.state", state or "UNKNOWN")
+    if state == "FAILURE":
+        task_span.set_status(Status(StatusCode.ERROR))
+    task_span.end()
+    otel_context.detach(token)
+
+
+def connect_celery_signals() -> None:
+    """Hook task spans into Celery's execution signals."""
+    from celery.signals import task_postrun, task_prerun
+
+    task_prerun.connect(on_task_prerun, weak=False)
+    task_postrun.connect(on_task_postrun, weak=False)
+
+
+class AgentsTracingBridge:
+    """
+    Agents SDK TracingProcessor that re-emits SDK spans (agent turns, LLM
+    generations, handoffs, tools) as OpenTelemetry spans.
+
+    Installed by app.core.agent_tracing.install_trace_processors.
+    """
+
+    def __init__(self):
+        self._spans: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def on_trace_start(self, sdk_trace) -> None:
+        pass
+
+    def on_trace_end(self, sdk_trace) -> None:
+        pass
+
+    def on_span_start(self, sdk_span) -> None:
+        if not is_enabled():
+            return
+        with self._lock:
+            parent = self._spans.get(sdk_span.parent_id)
+        # SDK spans without a mirrored parent hang off the current span, e.g. agent.run
+        context = trace.set_span_in_context(parent) if parent is not None else None
+
+        data = sdk_span.span_data
+        attributes = {
+            f"agents.{key}": value
+            for key, value in data.export().items()
+            if isinstance(value, (str, int, float, bool))
+        }
+        otel_span = _tracer.start_span(f"agents.{data.type}", context=context, attributes=attributes)
+        with self._lock:
+            self._spans[sdk_span.span_id] = otel_span
+
+    def on_span_end(self, sdk_span) -> None:
+        with self._lock:
+            otel_span = self._spans.pop(sdk_span.span_id, None)
+        if otel_span is None:
+            return
+        if sdk_span.error:
+            otel_span.set_status(Status(StatusCode.ERROR, sdk_span.error.get("message")))
+        otel_span.end()
+
+    def shutdown(self) -> None:
+        pass
+
+    def force_flush(self) -> None:
+        pass
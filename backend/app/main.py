@@ -1,6 +1,10 @@
 import logging
 import os
+import sys
+import asyncio
 import datetime
+import time
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request, Response, HTTPException, Depends
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
@@ -9,19 +13,68 @@ import pathlib
 from starlette.middleware.base import BaseHTTPMiddleware
 
 from app.core.config import settings
-from app.core.supabase_client import get_supabase
+from app.core.supabase_client import close_supabase, init_supabase
 from app.core.auth import get_token_from_request, decode_jwt
+from app.core.deadlines import deadline_scope
+from app.core import metrics, profiling, readiness, task_events, tracing
 from app.api import api_router
-from agents import set_tracing_disabled, enable_verbose_stdout_logging, set_default_openai_key
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Check if we're in a production environment
+is_production = os.environ.get("RAILWAY_ENVIRONMENT") or os.environ.get("PRODUCTION")
+
+def probe_supabase() -> bool:
+    """Create the process's Supabase client and check the agents table with one tiny query."""
+    init_supabase().table('agents').select('id').limit(1).execute()
+    return True
+
+def warm_up_agents_sdk():
+    """Import and configure the Agents SDK ahead of the first agent request."""
+    from app.api.v1.endpoints.agents_sdk import get_agent_sdk_service
+    get_agent_sdk_service()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start quickly: one bounded connectivity probe, heavy imports in the background."""
+    tracing.init_tracing("pladder-api")
+    
+    try:
+        logger.info("Checking Supabase connection...")
+        await asyncio.wait_for(asyncio.to_thread(probe_supabase), timeout=settings.STARTUP_PROBE_TIMEOUT)
+        logger.info("Supabase connection successful")
+    except Exception as e:
+        logger.error(f"Error initializing Supabase: {str(e) or type(e).__name__}")
+        logger.warning("Continuing startup despite Supabase error.")
+    
+    # Dependency probes run in the background; /ready serves their cached results
+    readiness.start_readiness_probes()
+    
+    # The Agents SDK takes about a second to import; load it without delaying startup
+    if settings.AGENTS_SDK_WARMUP:
+        asyncio.get_running_loop().run_in_executor(None, warm_up_agents_sdk)
+    
+    yield
+    
+    await readiness.stop_readiness_probes()
+    await task_events.close_event_hub()
+    close_supabase()
+    
+    # Only release what was actually created during this run
+    if "app.core.openai_client" in sys.modules:
+        from app.core.openai_client import close_openai_client
+        await close_openai_client()
+    if "app.core.agent_tracing" in sys.modules:
+        from app.core.agent_tracing import shutdown_trace_processors
+        shutdown_trace_processors()
+
 app = FastAPI(
     title=settings.PROJECT_NAME,
     description="Purple Ladder AI Agents Platform API",
     version="0.1.0",
     openapi_url=f"{settings.API_V1_STR}/openapi.json",
+    lifespan=lifespan,
 )
 
 # Define all allowed origins
@@ -68,12 +121,17 @@ def health_check():
     """Health check endpoint that returns JSON."""
     return {"status": "healthy", "timestamp": str(datetime.datetime.now())}
 
-# Check if we're in a production environment
-is_production = os.environ.get("RAILWAY_ENVIRONMENT") or os.environ.get("PRODUCTION")
+@app.get("/ready")
+async def readiness_check():
+    """Readiness endpoint: 503 unless every required dependency answered its last probe."""
+    status = readiness.get_monitor().status()
+    return JSONResponse(status_code=200 if status["ready"] else 503, content=status)
 
 # Define public paths that don't require authentication
 PUBLIC_PATHS = {
     "/api/health",
+    "/ready",
+    "/metrics",
     "/api/docs",
     "/api/openapi.json",
     "/api/v1/auth"
@@ -103,87 +161,87 @@ class AuthMiddleware(BaseHTTPMiddleware):
 # Add auth middleware
 app.add_middleware(AuthMiddleware)
 
-@app.on_event("startup")
-async def startup_event():
-    """Initialize services on application startup."""
-    try:
-        # Initialize Supabase connection
-        logger.info("Checking Supabase connection...")
-        sb = get_supabase()
-        if sb:
-            # Check connection to Supabase
-            user_count = sb.table('agents').select('id').execute()
-            logger.info(f"Supabase connection successful")
-            
-            # Initialize sample data if needed
-            logger.info("Checking for existing agents in Supabase...")
-            agents_data = sb.table('agents').select('*').execute()
-            if not agents_data.data:
-                logger.info("No agents found. Creating sample agents...")
-                # Create sample agents in Supabase
-                sample_agents = [
-                    {
-                        "name": "Recruiter Agent",
-                        "type": "recruiter",
-                        "description": "AI agent for candidate sourcing and evaluation",
-                        "status": "active",
-                        "parameters": {
-                            "matching_threshold": 0.7,
-                            "max_candidates": 10
-                        }
-                    },
-                    {
-                        "name": "Application Processor",
-                        "type": "processor",
-                        "description": "AI agent for processing job applications",
-                        "status": "active",
-                        "parameters": {
-                            "auto_reject_threshold": 0.3,
-                            "auto_advance_threshold": 0.8
-                        }
-                    },
-                    {
-                        "name": "Job Matcher",
-                        "type": "matcher",
-                        "description": "AI agent for matching candidates to jobs",
-                        "status": "active",
-                        "parameters": {
-                            "similarity_algorithm": "cosine",
-                            "minimum_score": 0.6
-                        }
-                    }
-                ]
-                
-                for agent in sample_agents:
-                    sb.table('agents').insert(agent).execute()
-                
-                logger.info(f"Created {len(sample_agents)} sample agents")
-            else:
-                logger.info(f"Found {len(agents_data.data)} existing agents in Supabase")
-            
-        logger.info("Supabase initialization complete.")
-    except Exception as e:
-        logger.error(f"Error initializing Supabase: {str(e)}")
-        logger.warning("Continuing startup despite Supabase error.")
-    
-    # Initialize Agents SDK
-    try:
-        logger.info("Setting up OpenAI Agents SDK...")
-        # Configure agents SDK only if API key is set
-        if os.getenv("OPENAI_API_KEY"):
-            # Set API key
-            set_default_openai_key(os.getenv("OPENAI_API_KEY"))
-            # Enable tracing
-            set_tracing_disabled(False)
-            # Enable verbose logging for development
-            if not is_production:
-                enable_verbose_stdout_logging()
-            logger.info("Agents SDK initialized successfully")
-        else:
-            logger.warning("OPENAI_API_KEY not set, Agents SDK may not work correctly")
-    except Exception as e:
-        logger.error(f"Error setting up Agents SDK: {str(e)}")
-        logger.warning("Continuing startup despite Agents SDK error.")
+class DeadlineMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request: Request, call_next):
+        """Bound each request by a deadline that reaches every agent run it starts."""
+        timeout = settings.API_REQUEST_TIMEOUT
+        
+        # Clients may ask for a tighter (never a looser) budget
+        requested = request.headers.get("X-Request-Timeout")
+        if requested:
+            try:
+                timeout = min(timeout, float(requested))
+            except ValueError:
+                pass
+        
+        with deadline_scope(timeout):
+            return await call_next(request)
+
+# Add deadline middleware
+app.add_middleware(DeadlineMiddleware)
+
+class MetricsMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request: Request, call_next):
+        """Record request latency labelled by route template, not raw path."""
+        start = time.perf_counter()
+        status_code = 500
+        try:
+            response = await call_next(request)
+            status_code = response.status_code
+            return response
+        finally:
+            route = request.scope.get("route")
+            metrics.HTTP_REQUEST_DURATION.labels(
+                request.method,
+                route.path if route is not None else "unmatched",
+                f"{status_code // 100}xx",
+            ).observe(time.perf_counter() - start)
+
+class ProfilingMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request: Request, call_next):
+        """Profile a single request when it carries a valid X-Profile-Token header."""
+        mode = profiling.requested_mode(
+            request.headers.get(profiling.PROFILE_HEADER),
+            request.headers.get(profiling.PROFILE_MODE_HEADER),
+        )
+        if mode is None:
+            return await call_next(request)
+        
+        # Sync endpoints and background tasks run in the threadpool, so sample every thread
+        with profiling.request_scope(mode), profiling.profile(f"{request.method}-{request.url.path}", mode, all_threads=True) as paths:
+            response = await call_next(request)
+        response.headers["X-Profile"] = paths.get("cpu", "")
+        return response
+
+# Only installed when a profiling token is configured
+if settings.PROFILING_TOKEN:
+    app.add_middleware(ProfilingMiddleware)
+
+# Add metrics middleware
+app.add_middleware(MetricsMiddleware)
+
+class TracingMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request: Request, call_next):
+        """Continue or start a trace for each request; downstream spans nest under it."""
+        if not tracing.is_enabled():
+            return await call_next(request)
+        
+        with tracing.server_span(f"HTTP {request.method}", request.headers, {"http.method": request.method}) as span:
+            response = await call_next(request)
+            route = request.scope.get("route")
+            if span is not None:
+                span.update_name(f"{request.method} {route.path if route is not None else 'unmatched'}")
+                span.set_attribute("http.status_code", response.status_code)
+            return response
+
+# Add tracing middleware
+app.add_middleware(TracingMiddleware)
+
+@app.get("/metrics", include_in_schema=False)
+def metrics_endpoint():
+    """Prometheus scrape endpoint."""
+    body, content_type = metrics.render_latest()
+    return Response(content=body, headers={"Content-Type": content_type})
 
 if __name__ == "__main__":
     import uvicorn
@@ -18,6 +18,12 @@ class AgentStatus(str, Enum):
     ERROR = "error"
 
 
+class Recommendation(str, Enum):
+    INTERVIEW = "Interview"
+    CONSIDER = "Consider"
+    REJECT = "Reject"
+
+
 class AgentCreate(BaseModel):
     name: str = Field(..., description="Name of the agent")
     type: AgentType = Field(..., description="Type of agent")
@@ -46,6 +52,9 @@ class AgentTask(BaseModel):
         default={}, description="Parameters for the task"
     )
     priority: int = Field(default=0, description="Priority of the task (higher number = higher priority)")
+    ttl: Optional[int] = Field(
+        None, ge=1, description="Seconds the task may wait in the queue before it is dropped (defaults per action)"
+    )
 
 
 class TaskStatus(str, Enum):
@@ -53,6 +62,8 @@ class TaskStatus(str, Enum):
     RUNNING = "running"
     COMPLETED = "completed"
     FAILED = "failed"
+    CANCELLED = "cancelled"
+    EXPIRED = "expired"
 
 
 class AgentTaskResponse(BaseModel):
@@ -62,4 +73,81 @@ class AgentTaskResponse(BaseModel):
     error: Optional[str] = Field(None, description="Error message if task failed")
     created_at: Optional[datetime] = Field(None, description="Time when the task was created")
     started_at: Optional[datetime] = Field(None, description="Time when the task execution started")
-    completed_at: Optional[datetime] = Field(None, description="Time when the task execution completed") 
\ No newline at end of file
+    completed_at: Optional[datetime] = Field(None, description="Time when the task execution completed") 
+
+
+class AgentTaskBatch(BaseModel):
+    tasks: List[AgentTask] = Field(..., min_length=1, description="Tasks to create, in one request")
+
+
+class AgentTaskBatchResponse(BaseModel):
+    batch_id: str = Field(..., description="Unique identifier of the batch")
+    task_ids: List[str] = Field(..., description="IDs of the created tasks, in request order")
+    status: TaskStatus = Field(..., description="Status of the batch when it was accepted")
+    status_url: str = Field(..., description="Where to follow the batch's progress")
+
+
+class AgentTaskBatchProgress(BaseModel):
+    batch_id: str = Field(..., description="Unique identifier of the batch")
+    total: int = Field(..., description="Number of tasks in the batch")
+    counts: Dict[TaskStatus, int] = Field(..., description="Number of tasks per status")
+    finished: bool = Field(..., description="Whether every task has completed, failed, been cancelled or expired")
+
+
+class AgentTaskStatusQuery(BaseModel):
+    agent_id: str = Field(..., description="ID of the agent whose tasks to look up")
+    task_ids: List[str] = Field(..., min_length=1, description="IDs of the tasks to look up")
+    include_results: bool = Field(default=False, description="Whether to return each task's result as well")
+
+
+class AgentTaskStatusItem(AgentTaskResponse):
+    agent_id: str = Field(..., description="ID of the agent running the task")
+    updated_at: Optional[datetime] = Field(None, description="Time when the task was last updated")
+
+
+class AgentTaskStatusBulkResponse(BaseModel):
+    tasks: List[AgentTaskStatusItem] = Field(..., description="Tasks found, in request order")
+    missing: List[str] = Field(default=[], description="Requested IDs that match no task")
+
+
+class AgentTaskBatchCancelResponse(BaseModel):
+    batch_id: str = Field(..., description="Unique identifier of the batch")
+    cancelled: int = Field(..., description="Number of queued or running tasks that were cancelled")
+
+
+class JobMatch(BaseModel):
+    candidate_id: str = Field(..., description="Unique identifier of the candidate")
+    match_score: float = Field(..., description="How well the candidate matches the job, from 0 to 1")
+
+
+class JobMatchesResponse(BaseModel):
+    job_id: str = Field(..., description="Unique identifier of the job")
+    matches: List[JobMatch] = Field(..., description="Best candidates for the job, best first")
+
+
+class CandidateEvaluationRecord(BaseModel):
+    task_id: str = Field(..., description="ID of the task that produced the evaluation")
+    job_id: Optional[str] = Field(None, description="ID of the job the candidate was evaluated for")
+    candidate_id: str = Field(..., description="Unique identifier of the candidate")
+    score: int = Field(..., description="Overall score, from 0 to 100")
+    recommendation: Recommendation = Field(..., description="Interview, Consider or Reject")
+    strengths: List[str] = Field(default=[], description="Key strengths of the candidate")
+    areas_for_improvement: List[str] = Field(default=[], description="Gaps or concerns")
+    justification: Optional[str] = Field(None, description="Reasoning behind the recommendation, if requested")
+    created_at: Optional[datetime] = Field(None, description="Time when the evaluation was stored")
+
+
+class JobEvaluationsResponse(BaseModel):
+    job_id: str = Field(..., description="Unique identifier of the job")
+    evaluations: List[CandidateEvaluationRecord] = Field(..., description="Evaluations, best score first")
+
+
+class TableChange(BaseModel):
+    type: str = Field(..., description="INSERT, UPDATE or DELETE")
+    table: str = Field(..., description="Table the changed row belongs to")
+    record: Optional[Dict[str, Any]] = Field(None, description="The row after the change; None for deletes")
+    old_record: Optional[Dict[str, Any]] = Field(None, description="The row before the change; None for inserts")
+
+
+class MatchStoreChangeResponse(BaseModel):
+    queued: List[str] = Field(..., description="Names of the match store tasks queued for the change")
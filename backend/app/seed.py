@@ -0,0 +1,79 @@
+"""
+Seed Supabase with the sample agents.
+
+Run once per environment, not on every API start:
+
+    python -m app.seed
+"""
+
+import sys
+import logging
+
+from app.core.supabase_client import get_supabase
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+SAMPLE_AGENTS = [
+    {
+        "name": "Recruiter Agent",
+        "type": "recruiter",
+        "description": "AI agent for candidate sourcing and evaluation",
+        "status": "active",
+        "parameters": {
+            "matching_threshold": 0.7,
+            "max_candidates": 10
+        }
+    },
+    {
+        "name": "Application Processor",
+        "type": "processor",
+        "description": "AI agent for processing job applications",
+        "status": "active",
+        "parameters": {
+            "auto_reject_threshold": 0.3,
+            "auto_advance_threshold": 0.8
+        }
+    },
+    {
+        "name": "Job Matcher",
+        "type": "matcher",
+        "description": "AI agent for matching candidates to jobs",
+        "status": "active",
+        "parameters": {
+            "similarity_algorithm": "cosine",
+            "minimum_score": 0.6
+        }
+    }
+]
+
+
+def seed_agents() -> int:
+    """
+    Insert the sample agents if the agents table is empty.
+
+    Returns:
+        int: The number of agents created
+    """
+    sb = get_supabase()
+    existing = sb.table('agents').select('id').limit(1).execute()
+    if existing.data:
+        logger.info("Agents already exist; nothing to seed")
+        return 0
+
+    sb.table('agents').insert(SAMPLE_AGENTS).execute()
+    logger.info(f"Created {len(SAMPLE_AGENTS)} sample agents")
+    return len(SAMPLE_AGENTS)
+
+
+def main() -> int:
+    try:
+        seed_agents()
+    except Exception as e:
+        logger.error(f"Error seeding agents: {str(e)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,19 +1,115 @@
 import uuid
+import logging
 from typing import List, Optional, Dict, Any
 from datetime import datetime
 
+from celery.exceptions import TaskRevokedError
 from fastapi import BackgroundTasks, Depends
 
+from app.core import batch_progress, cancellation, claim_check, profiling, task_events, tracing
+from app.core.config import settings
+from app.core.serialization import serializer_for
 from app.core.supabase_client import get_supabase
 from app.schemas.agent import AgentCreate, AgentResponse, AgentType, AgentStatus, AgentTask, TaskStatus
 from app.worker import celery_app
 
+logger = logging.getLogger(__name__)
+
+# Actions with a dedicated unified task; the rest go through process_task
+TASK_MAPPING = {
+    "process_candidate": "app.agents.celery_tasks.process_candidate",
+    "search_candidates": "app.agents.celery_tasks.search_candidates",
+    "screen_candidates": "app.agents.celery_tasks.screen_candidates",
+    # Add any other action mappings here
+}
+GENERIC_TASK = "app.agents.celery_tasks.process_task"
+# Kwarg carrying whose semantic search cache a search_candidates task uses
+SEARCH_TENANT_KWARG = "tenant_id"
+
+# Statuses a task can still change from; finished tasks never change again
+ACTIVE_TASK_STATUSES = [TaskStatus.QUEUED.value, TaskStatus.RUNNING.value]
+FINISHED_TASK_STATUSES = [TaskStatus.COMPLETED, TaskStatus.FAILED, TaskStatus.CANCELLED, TaskStatus.EXPIRED]
+
+
+# Compact columns of candidate_evaluations; justification is the optional prose
+EVALUATION_COLUMNS = "task_id,job_id,candidate_id,score,recommendation,strengths,areas_for_improvement,created_at"
+
+
+def evaluation_rows(task_id: str, task_result: Any) -> List[Dict[str, Any]]:
+    """
+    Extract typed candidate evaluations from a finished task's result.
+    
+    Args:
+        task_id: The ID of the task
+        task_result: The task's result: a process_candidate, screen_candidates
+            or process_task (job matcher) result, or the worker's envelope around one
+    
+    Returns:
+        list: candidate_evaluations rows, empty if the result holds no
+            evaluation of an identified candidate
+    """
+    if not isinstance(task_result, dict):
+        return []
+    result = task_result.get("result", task_result)
+    # process_task wraps the output of the agent the task was handed off to
+    if isinstance(result, dict) and "action" in result:
+        result = result.get("result")
+    if not isinstance(result, dict):
+        return []
+    
+    if isinstance(result.get("evaluations"), list):
+        entries = result["evaluations"]
+    elif isinstance(result.get("evaluation"), dict):
+        entries = [result]
+    else:
+        return []
+    
+    rows = []
+    for entry in entries:
+        # screen_candidates and process_candidate nest the evaluation; the matcher's output is flat
+        evaluation = entry.get("evaluation", entry)
+        if not isinstance(evaluation, dict) or "overall_score" not in evaluation or entry.get("candidate_id") is None:
+            continue
+        rows.append({
+            "task_id": task_id,
+            "job_id": result.get("job_id"),
+            "candidate_id": str(entry["candidate_id"]),
+            "score": max(0, min(100, int(evaluation["overall_score"]))),
+            "recommendation": evaluation["recommendation"],
+            "strengths": evaluation.get("strengths", []),
+            "areas_for_improvement": evaluation.get("areas_for_improvement", []),
+            "justification": evaluation.get("justification"),
+        })
+    return rows
+
+
+def task_ttl(task_data: AgentTask, default: int) -> int:
+    """
+    Seconds a task may wait in the queue before workers drop it.
+    
+    Args:
+        task_data: The task, whose own ttl wins
+        default: TTL for the kind of request, interactive or batch
+    
+    Returns:
+        int: The request's ttl, else the action's TASK_TTL_BY_ACTION entry, else default
+    """
+    if task_data.ttl:
+        return task_data.ttl
+    for entry in settings.TASK_TTL_BY_ACTION.split(","):
+        action, _, seconds = entry.partition("=")
+        if action.strip() == task_data.action and seconds.strip():
+            return int(seconds)
+    return default
+
 
 class AgentService:
     """Service for managing agents and their tasks using Supabase."""
     
-    def __init__(self):
-        self.supabase = get_supabase()
+    @property
+    def supabase(self):
+        """The process-wide Supabase client, created on first use rather than at import."""
+        return get_supabase()
     
     def create_agent(self, agent_data: AgentCreate) -> AgentResponse:
         """Create a new agent."""
@@ -63,8 +159,24 @@ class AgentService:
             return None
         return self._dict_to_agent_response(result.data[0])
     
-    def create_task(self, agent_id: str, task_data: AgentTask, background_tasks: BackgroundTasks = None) -> str:
-        """Create a new task for an agent."""
+    def get_agent_version(self, agent_id: str) -> Optional[Dict[str, Any]]:
+        """Get only the columns that identify an agent's version, for conditional GETs."""
+        result = self.supabase.table('agents').select('id,created_at,updated_at').eq('id', agent_id).execute()
+        return result.data[0] if result.data else None
+    
+    def get_agents_versions(self) -> List[Dict[str, Any]]:
+        """Get the id and timestamps of every agent, for conditional GETs of the listing."""
+        result = self.supabase.table('agents').select('id,created_at,updated_at').execute()
+        return result.data
+    
+    def create_task(
+        self,
+        agent_id: str,
+        task_data: AgentTask,
+        background_tasks: BackgroundTasks = None,
+        tenant_id: Optional[str] = None,
+    ) -> str:
+        """Create a new task for an agent, on behalf of the caller's tenant if known."""
         task_id = str(uuid.uuid4())
         
         # Create task in Supabase
@@ -80,46 +192,132 @@ class AgentService:
         }
         
         # Insert into Supabase
-        self.supabase.table('agent_tasks').insert(task_dict).execute()
+        with tracing.span("db.write", {"db.table": "agent_tasks", "db.operation": "insert"}):
+            self.supabase.table('agent_tasks').insert(task_dict).execute()
         
-        # Map action to the appropriate unified task
-        task_mapping = {
-            "process_candidate": "app.agents.celery_tasks.process_candidate",
-            "search_candidates": "app.agents.celery_tasks.search_candidates",
-            # Add any other action mappings here
-        }
+        # Captured now so background sends still join this request's trace
+        trace_headers = tracing.inject_headers()
+        
+        parameters = self._prepare_parameters(task_data.action, task_data.parameters, tenant_id)
+        # Someone is waiting on a single task, so it is not worth running late
+        expires = task_ttl(task_data, settings.TASK_TTL_INTERACTIVE)
         
         # Get the task name from mapping or use the process_task fallback
-        if task_data.action in task_mapping:
-            task_name = task_mapping[task_data.action]
+        if task_data.action in TASK_MAPPING:
+            task_name = TASK_MAPPING[task_data.action]
             # Queue task in Celery
             if background_tasks:
-                background_tasks.add_task(self._run_task, task_name, task_id, task_data.parameters)
+                background_tasks.add_task(self._run_task, task_name, task_id, parameters, trace_headers, expires)
             else:
-                celery_app.send_task(
-                    task_name,
-                    args=[task_id],
-                    kwargs=task_data.parameters
-                )
+                self._send_task(task_name, [task_id], parameters, trace_headers, expires)
         else:
             # Use the generic process_task for other actions
-            task_name = "app.agents.celery_tasks.process_task"
+            task_name = GENERIC_TASK
             if background_tasks:
                 background_tasks.add_task(
                     self._run_task, 
                     task_name, 
                     task_id, 
-                    {"action": task_data.action, **task_data.parameters}
+                    {"action": task_data.action, **parameters},
+                    trace_headers,
+                    expires
                 )
             else:
-                celery_app.send_task(
-                    task_name,
-                    args=[task_id, task_data.action],
-                    kwargs=task_data.parameters
-                )
+                self._send_task(task_name, [task_id, task_data.action], parameters, trace_headers, expires)
         
         return task_id
     
+    def create_task_batch(
+        self,
+        agent_id: str,
+        tasks: List[AgentTask],
+        background_tasks: BackgroundTasks = None,
+        tenant_id: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        Create many tasks for an agent with one insert and queue them as one Celery group.
+        
+        Args:
+            agent_id: The ID of the agent, already validated by the caller
+            tasks: The tasks to create
+            background_tasks: Where to dispatch and follow the group; sent inline if None
+            tenant_id: The caller's tenant, whose semantic cache searches may use
+        
+        Returns:
+            dict: "batch_id" and the "task_ids" in request order
+        """
+        batch_id = str(uuid.uuid4())
+        now = datetime.utcnow().isoformat()
+        rows = []
+        calls = []
+        for task_data in tasks:
+            task_id = str(uuid.uuid4())
+            rows.append({
+                "id": task_id,
+                "agent_id": agent_id,
+                "batch_id": batch_id,
+                "action": task_data.action,
+                "parameters": task_data.parameters,
+                "priority": task_data.priority,
+                "status": TaskStatus.QUEUED.value,
+                "created_at": now,
+                "updated_at": now
+            })
+            calls.append(self._task_call(
+                task_id,
+                task_data.action,
+                self._prepare_parameters(task_data.action, task_data.parameters, tenant_id),
+                task_ttl(task_data, settings.TASK_TTL_BATCH),
+            ))
+        
+        # One round trip for the whole batch
+        with tracing.span("db.write", {"db.table": "agent_tasks", "db.operation": "insert", "db.rows": len(rows)}):
+            self.supabase.table('agent_tasks').insert(rows).execute()
+        batch_progress.init_batch(batch_id, agent_id, len(rows))
+        
+        trace_headers = tracing.inject_headers()
+        if background_tasks:
+            background_tasks.add_task(self._run_batch, batch_id, calls, trace_headers)
+        else:
+            self._send_batch(calls, trace_headers)
+        
+        return {"batch_id": batch_id, "task_ids": [row["id"] for row in rows]}
+    
+    def get_batch_progress(self, agent_id: str, batch_id: str) -> Optional[Dict[str, Any]]:
+        """Count a batch's tasks by status, from the Redis counters when they are available."""
+        progress = batch_progress.read_counts(batch_id, [status.value for status in TaskStatus])
+        if progress is not None:
+            if progress["agent_id"] != agent_id:
+                return None
+            total = progress["total"]
+            counts = {TaskStatus(status): count for status, count in progress["counts"].items()}
+        else:
+            result = self.supabase.table('agent_tasks').select('status').eq('batch_id', batch_id).eq('agent_id', agent_id).execute()
+            if not result.data:
+                return None
+            total = len(result.data)
+            counts = {status: 0 for status in TaskStatus}
+            for row in result.data:
+                counts[TaskStatus(row["status"])] += 1
+        
+        return {
+            "batch_id": batch_id,
+            "total": total,
+            "counts": counts,
+            "finished": sum(counts[status] for status in FINISHED_TASK_STATUSES) == total,
+        }
+    
+    def get_task_version(self, agent_id: str, task_id: str) -> Optional[Dict[str, Any]]:
+        """Get a task's status and updated_at without its result, for conditional GETs."""
+        result = (
+            self.supabase.table('agent_tasks')
+            .select('id,status,created_at,updated_at')
+            .eq('id', task_id)
+            .eq('agent_id', agent_id)
+            .execute()
+        )
+        return result.data[0] if result.data else None
+    
     def get_task_status(self, agent_id: str, task_id: str) -> Optional[Dict[str, Any]]:
         """Get the status of a task."""
         result = self.supabase.table('agent_tasks').select('*').eq('id', task_id).eq('agent_id', agent_id).execute()
@@ -136,10 +334,46 @@ class AgentService:
             "error": task.get("error", None),
             "created_at": task.get("created_at", None),
             "started_at": task.get("started_at", None),
-            "completed_at": task.get("completed_at", None)
+            "completed_at": task.get("completed_at", None),
+            "updated_at": task.get("updated_at", None)
         }
     
-    def update_task_status(self, task_id: str, status: TaskStatus, result: Dict[str, Any] = None, error: str = None) -> bool:
+    def get_tasks_status(self, agent_id: str, task_ids: List[str], include_results: bool = False) -> List[Dict[str, Any]]:
+        """
+        Get the status of many of an agent's tasks with one query.
+        
+        Args:
+            agent_id: The ID of the agent the tasks must belong to
+            task_ids: The IDs of the tasks
+            include_results: Whether to read the (possibly large) result column too
+        
+        Returns:
+            list: One status dict per task found, in the order of task_ids
+        """
+        columns = "id,agent_id,status,error,created_at,started_at,completed_at,updated_at"
+        if include_results:
+            columns += ",result"
+        result = self.supabase.table('agent_tasks').select(columns).in_('id', task_ids).eq('agent_id', agent_id).execute()
+        
+        found = {task["id"]: task for task in result.data}
+        return [
+            {
+                "task_id": task["id"],
+                "agent_id": task["agent_id"],
+                "status": task["status"],
+                "result": task.get("result", None),
+                "error": task.get("error", None),
+                "created_at": task.get("created_at", None),
+                "started_at": task.get("started_at", None),
+                "completed_at": task.get("completed_at", None),
+                "updated_at": task.get("updated_at", None)
+            }
+            for task in (found[task_id] for task_id in task_ids if task_id in found)
+        ]
+    
+    def update_task_status(
+        self, task_id: str, status: TaskStatus, result: Dict[str, Any] = None, error: str = None, batch_id: str = None
+    ) -> bool:
         """Update the status of a task."""
         update_dict = {
             "status": status.value,
@@ -155,12 +389,158 @@ class AgentService:
         if status == TaskStatus.RUNNING:
             update_dict["started_at"] = datetime.utcnow().isoformat()
             
-        if status in [TaskStatus.COMPLETED, TaskStatus.FAILED]:
+        if status in FINISHED_TASK_STATUSES:
             update_dict["completed_at"] = datetime.utcnow().isoformat()
         
+        # Evaluations are stored before the task reports them as completed, so a
+        # completed task never lacks its rows; if they cannot be stored, the task fails
+        evaluations = evaluation_rows(task_id, result) if status == TaskStatus.COMPLETED else []
+        if evaluations:
+            try:
+                self.record_evaluations(evaluations)
+            except Exception as e:
+                logger.error(f"Could not store {len(evaluations)} evaluations of task {task_id}: {str(e)}")
+                return self.update_task_status(
+                    task_id, TaskStatus.FAILED, result=result,
+                    error=f"Could not store evaluations: {str(e)}", batch_id=batch_id
+                )
+        
         # Update in Supabase
-        result = self.supabase.table('agent_tasks').update(update_dict).eq('id', task_id).execute()
-        return len(result.data) > 0
+        with tracing.span("db.write", {"db.table": "agent_tasks", "db.operation": "update", "task.status": status.value}):
+            # Finished tasks are left alone, so cancellation, expiry and late results cannot overwrite each other
+            result = self.supabase.table('agent_tasks').update(update_dict).eq('id', task_id).in_('status', ACTIVE_TASK_STATUSES).execute()
+        if not result.data:
+            if evaluations:
+                self._discard_evaluations(task_id)
+            return False
+        
+        # Wake any clients long-polling this task
+        task_events.publish_task_update(task_id, status.value)
+        batch_id = batch_id or result.data[0].get("batch_id")
+        if batch_id:
+            batch_progress.record_transition(batch_id, [task_id], status.value)
+        return True
+    
+    def update_tasks_status(self, task_ids: List[str], status: TaskStatus, error: str = None, batch_id: str = None) -> int:
+        """Set the same status on many tasks with one update."""
+        now = datetime.utcnow().isoformat()
+        update_dict = {"status": status.value, "updated_at": now}
+        if error:
+            update_dict["error"] = error
+        if status in FINISHED_TASK_STATUSES:
+            update_dict["completed_at"] = now
+        
+        with tracing.span("db.write", {"db.table": "agent_tasks", "db.operation": "update", "task.status": status.value}):
+            result = self.supabase.table('agent_tasks').update(update_dict).in_('id', task_ids).in_('status', ACTIVE_TASK_STATUSES).execute()
+        
+        updated = [row["id"] for row in result.data]
+        if updated:
+            task_events.publish_task_updates(updated, status.value)
+            if batch_id:
+                batch_progress.record_transition(batch_id, updated, status.value)
+        return len(updated)
+    
+    def record_evaluations(self, rows: List[Dict[str, Any]]) -> None:
+        """
+        Store candidate evaluations in their typed columns, in one upsert.
+        
+        Rows are unique per (task_id, candidate_id) and existing ones are kept,
+        so storing a task's evaluations again changes nothing.
+        """
+        with tracing.span("db.write", {"db.table": "candidate_evaluations", "db.operation": "upsert", "db.rows": len(rows)}):
+            (
+                self.supabase.table('candidate_evaluations')
+                .upsert(rows, on_conflict='task_id,candidate_id', ignore_duplicates=True)
+                .execute()
+            )
+    
+    def _discard_evaluations(self, task_id: str) -> None:
+        """Remove evaluations stored for a result that lost to the task finishing otherwise."""
+        task = self.supabase.table('agent_tasks').select('status').eq('id', task_id).execute()
+        if task.data and task.data[0]["status"] == TaskStatus.COMPLETED.value:
+            # Its first completion stored these same evaluations
+            return
+        with tracing.span("db.write", {"db.table": "candidate_evaluations", "db.operation": "delete"}):
+            self.supabase.table('candidate_evaluations').delete().eq('task_id', task_id).execute()
+    
+    def find_evaluations(
+        self,
+        job_id: str,
+        recommendation: Optional[str] = None,
+        min_score: Optional[int] = None,
+        limit: int = 50,
+        include_justification: bool = False,
+    ) -> List[Dict[str, Any]]:
+        """
+        Find a job's candidate evaluations, best score first.
+        
+        Served by the (job_id, recommendation, score) index, so no evaluation
+        is re-parsed or re-prompted.
+        
+        Args:
+            job_id: The ID of the job
+            recommendation: Only evaluations with this recommendation
+            min_score: Only evaluations scoring at least this
+            limit: Maximum number of evaluations
+            include_justification: Whether to read the prose justification too
+        
+        Returns:
+            list: Evaluation rows
+        """
+        columns = EVALUATION_COLUMNS + (",justification" if include_justification else "")
+        query = self.supabase.table('candidate_evaluations').select(columns).eq('job_id', job_id)
+        if recommendation:
+            query = query.eq('recommendation', recommendation)
+        if min_score is not None:
+            query = query.gte('score', min_score)
+        return query.order('score', desc=True).limit(limit).execute().data
+    
+    def cancel_task(self, agent_id: str, task_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Cancel a queued or running task.
+        
+        Args:
+            agent_id: The ID of the agent
+            task_id: The ID of the task
+        
+        Returns:
+            dict: "task_id", the task's "status" afterwards and whether it was
+                "cancelled" by this call, or None if the task does not exist
+        """
+        result = self.supabase.table('agent_tasks').select('id,status,batch_id').eq('id', task_id).eq('agent_id', agent_id).execute()
+        if not result.data:
+            return None
+        
+        task = result.data[0]
+        if task["status"] not in ACTIVE_TASK_STATUSES:
+            return {"task_id": task_id, "status": task["status"], "cancelled": False}
+        
+        cancellation.request_cancel([task_id])
+        if self.update_task_status(task_id, TaskStatus.CANCELLED, batch_id=task.get("batch_id")):
+            return {"task_id": task_id, "status": TaskStatus.CANCELLED.value, "cancelled": True}
+        # It finished while the flag was being set
+        return {"task_id": task_id, "status": self.get_task_version(agent_id, task_id)["status"], "cancelled": False}
+    
+    def cancel_batch(self, agent_id: str, batch_id: str) -> Optional[int]:
+        """
+        Cancel every queued or running task of a batch.
+        
+        Args:
+            agent_id: The ID of the agent
+            batch_id: The ID of the batch
+        
+        Returns:
+            int: Number of tasks cancelled, or None if the batch does not exist
+        """
+        result = self.supabase.table('agent_tasks').select('id,status').eq('batch_id', batch_id).eq('agent_id', agent_id).execute()
+        if not result.data:
+            return None
+        
+        active = [row["id"] for row in result.data if row["status"] in ACTIVE_TASK_STATUSES]
+        if not active:
+            return 0
+        cancellation.request_cancel(active)
+        return self.update_tasks_status(active, TaskStatus.CANCELLED, batch_id=batch_id)
     
     def _dict_to_agent_response(self, agent_dict: Dict[str, Any]) -> AgentResponse:
         """Convert an agent dictionary to a response schema."""
@@ -206,25 +586,154 @@ class AgentService:
                 updated_at=datetime.utcnow() if agent_dict.get("updated_at") is None else agent_dict.get("updated_at"),
             )
     
-    def _run_task(self, task_name: str, task_id: str, parameters: Dict[str, Any]):
+    def _prepare_parameters(self, action: str, parameters: Dict[str, Any], tenant_id: Optional[str] = None) -> Dict[str, Any]:
+        """Turn request parameters into task kwargs."""
+        # Large parameters travel through the broker as claim-check references
+        parameters = claim_check.check_in_values(parameters)
+        
+        # Searches share a semantic cache per caller's tenant, and skip it without one;
+        # never trust a tenant from parameters
+        if action == "search_candidates":
+            parameters.pop(SEARCH_TENANT_KWARG, None)
+            if tenant_id:
+                parameters[SEARCH_TENANT_KWARG] = tenant_id
+        
+        # Only a profiled request may ask workers to profile; never trust the flag from parameters
+        parameters.pop(profiling.TASK_PROFILE_KWARG, None)
+        profile_mode = profiling.current_request_mode()
+        if profile_mode:
+            parameters[profiling.TASK_PROFILE_KWARG] = profile_mode
+        return parameters
+    
+    def _task_call(self, task_id: str, action: str, parameters: Dict[str, Any], expires: Optional[int] = None):
+        """Returns (task_name, args, kwargs, expires) of the Celery task that runs an action."""
+        if action in TASK_MAPPING:
+            return TASK_MAPPING[action], [task_id], parameters, expires
+        return GENERIC_TASK, [task_id, action], parameters, expires
+    
+    def _send_batch(self, calls: List[Any], headers: Optional[Dict[str, str]] = None):
+        """Queue (task_name, args, kwargs, expires) calls as one Celery group over one producer connection."""
+        from celery import group
+        
+        # Celery task IDs are the task IDs, so results map straight back to rows
+        signatures = [
+            celery_app.signature(
+                task_name,
+                args=args,
+                kwargs=kwargs,
+                task_id=args[0],
+                serializer=serializer_for(task_name),
+                headers=headers,
+                expires=expires,
+            )
+            for task_name, args, kwargs, expires in calls
+        ]
+        return group(signatures).apply_async()
+    
+    def _run_batch(self, batch_id: str, calls: List[Any], trace_headers: Optional[Dict[str, str]] = None):
+        """Queue a batch and record each task's status as its result arrives."""
+        pending = {call[1][0] for call in calls}
+        try:
+            group_result = self._send_batch(calls, trace_headers)
+        except Exception as e:
+            self.update_tasks_status(list(pending), TaskStatus.FAILED, error=str(e), batch_id=batch_id)
+            return
+        
+        def on_message(meta):
+            # Workers report "running" through update_state when they pick a task up
+            if meta.get("status") == TaskStatus.RUNNING.value and meta.get("task_id") in pending:
+                self.update_task_status(meta["task_id"], TaskStatus.RUNNING, batch_id=batch_id)
+        
+        def on_result(task_id, value):
+            pending.discard(task_id)
+            if isinstance(value, TaskRevokedError):
+                # Cancelled or expired; whoever revoked it recorded the status
+                return
+            if isinstance(value, BaseException):
+                self.update_task_status(task_id, TaskStatus.FAILED, error=str(value), batch_id=batch_id)
+                return
+            if isinstance(value, dict):
+                value = claim_check.resolve_values(value)
+            self.update_task_status(task_id, TaskStatus.COMPLETED, result=value, batch_id=batch_id)
+        
+        try:
+            if celery_app.conf.task_always_eager:
+                for result in group_result.results:
+                    on_result(result.id, result.result)
+            else:
+                # One thread follows the whole batch, in completion order, for as long as any
+                # of its tasks may still leave the queue and run
+                group_result.join_native(
+                    timeout=max((expires or 0) for *_, expires in calls) + settings.AGENT_TASK_TIME_LIMIT,
+                    propagate=False,
+                    callback=on_result,
+                    on_message=on_message,
+                )
+        except Exception as e:
+            if pending:
+                # Nobody records the results of tasks still queued or running, so stop them first
+                cancellation.request_cancel(list(pending))
+                self.update_tasks_status(
+                    list(pending), TaskStatus.FAILED, error=str(e) or type(e).__name__, batch_id=batch_id
+                )
+    
+    def _send_task(
+        self,
+        task_name: str,
+        args: List[Any],
+        kwargs: Dict[str, Any],
+        headers: Optional[Dict[str, str]] = None,
+        expires: Optional[int] = None,
+    ):
+        """Queue a task for the workers, or run it in-process when Celery is in eager mode."""
+        if celery_app.conf.task_always_eager:
+            # send_task ignores task_always_eager, so go through the registered task
+            return celery_app.tasks[task_name].apply_async(args=args, kwargs=kwargs, headers=headers, task_id=args[0])
+        # The Celery task ID is the task ID, so a cancellation can revoke it
+        return celery_app.send_task(
+            task_name,
+            args=args,
+            kwargs=kwargs,
+            serializer=serializer_for(task_name),
+            headers=headers,
+            task_id=args[0],
+            expires=expires,
+        )
+    
+    def _run_task(
+        self,
+        task_name: str,
+        task_id: str,
+        parameters: Dict[str, Any],
+        trace_headers: Optional[Dict[str, str]] = None,
+        expires: Optional[int] = None,
+    ):
         """Run a task in the background."""
         try:
-            # Update task to running state
-            self.update_task_status(task_id, TaskStatus.RUNNING)
+            # Update task to running state, unless it was cancelled before being sent
+            if not self.update_task_status(task_id, TaskStatus.RUNNING):
+                return
             
             # Run the task
             if task_name == "app.agents.celery_tasks.process_task" and "action" in parameters:
                 # Handle process_task differently since it needs action as a positional argument
                 action = parameters.pop("action")
-                result = celery_app.send_task(task_name, args=[task_id, action], kwargs=parameters)
+                result = self._send_task(task_name, [task_id, action], parameters, trace_headers, expires)
             else:
                 # Standard task
-                result = celery_app.send_task(task_name, args=[task_id], kwargs=parameters)
+                result = self._send_task(task_name, [task_id], parameters, trace_headers, expires)
                 
-            task_result = result.get()  # This will wait for the task to complete
+            # Wait for the task to leave the queue and run, but never longer than its limits allow
+            task_result = result.get(timeout=(expires or 0) + settings.AGENT_TASK_TIME_LIMIT)
+            if isinstance(task_result, dict):
+                task_result = claim_check.resolve_values(task_result)
             
             # Update task with result
             self.update_task_status(task_id, TaskStatus.COMPLETED, result=task_result)
+        
+        except TaskRevokedError:
+            # Cancelled or expired; whoever revoked it recorded the status
+            return
                 
         except Exception as e:
             # Update task with error
@@ -1,28 +1,273 @@
 import os
+import json
+import time
 import logging
 import asyncio
-from typing import Dict, Any, List, Optional, Tuple
+from typing import Dict, Any, List, Literal, Optional, Tuple
 
-from agents import Agent, Runner, function_tool, ModelSettings
+from agents import Agent, Runner, RunConfig, RunResult, function_tool, ModelSettings, enable_verbose_stdout_logging
 from pydantic import BaseModel
 
+from app.core import metrics, tracing
 from app.core.config import settings
+from app.core.deadlines import DeadlineExceeded, timeout_for
+from app.core.hedging import RunStats, hedged_call
+from app.core.semantic_cache import SemanticCache, query_text
 
 logger = logging.getLogger(__name__)
 
+def configure_agents_sdk() -> bool:
+    """
+    Install the pooled OpenAI client and sampled trace export for this process.
+    
+    Returns:
+        bool: False if OPENAI_API_KEY is not set and the SDK was left unconfigured
+    """
+    if not os.getenv("OPENAI_API_KEY"):
+        logger.warning("OPENAI_API_KEY not set, Agents SDK may not work correctly")
+        return False
+    
+    from app.core.agent_tracing import install_trace_processors
+    from app.core.openai_client import install_default_openai_client
+    
+    # Install the shared, pooled OpenAI client as the SDK default
+    install_default_openai_client()
+    # Sample agent traces and export them off the request path
+    install_trace_processors()
+    # Enable verbose logging for development
+    if not (os.environ.get("RAILWAY_ENVIRONMENT") or os.environ.get("PRODUCTION")):
+        enable_verbose_stdout_logging()
+    logger.info("Agents SDK initialized successfully")
+    return True
+
+# Prompts put what is shared across a batch first and per-item data last, so
+# consecutive prompts share a long prefix the provider's prompt cache can
+# serve. Shared parts are fixed text or canonical JSON, never a dict's repr.
+CANDIDATE_ASSESSMENT_PROMPT = """Assess the candidate below against the job, if one is given.
+
+Provide:
+- overall_score: 0 to 100
+- strengths: at least 3 key strengths
+- areas_for_improvement: at least 2
+- recommendation: Interview, Consider, or Reject
+- justification: the reasons for your recommendation"""
+
+CANDIDATE_SEARCH_PROMPT = """Find candidates matching the job requirements below, applying any filters given.
+
+For each matching candidate, provide:
+1. Match score (0-100)
+2. Key matching skills and qualifications
+3. Potential fit assessment
+
+Return the top 5 candidates ordered by match score."""
+
+TASK_PROMPT = "Process the task below according to its action type."
+
+def _canonical(data: Any) -> str:
+    """Serialize prompt data identically however its keys were ordered."""
+    return json.dumps(data, sort_keys=True, default=str, ensure_ascii=False)
+
+def _prompt(instructions: str, *sections: Tuple[str, Any]) -> str:
+    """Build a prompt from fixed instructions and (label, data) sections, in order."""
+    parts = [instructions]
+    for label, data in sections:
+        if data:
+            parts.append(f"{label}:\n{data if isinstance(data, str) else _canonical(data)}")
+    return "\n\n".join(parts)
+
+def _run_tokens(result: RunResult) -> int:
+    """Input and output tokens of every model response in a run."""
+    return sum(response.usage.input_tokens + response.usage.output_tokens for response in result.raw_responses)
+
+PACKED_SCREENING_PROMPT = """Assess each candidate below against the job.
+
+Return exactly one evaluation per candidate, with that candidate's "id" as candidate_id:
+- overall_score: 0 to 100
+- strengths: at least 3 key strengths
+- areas_for_improvement: at least 2
+- recommendation: Interview, Consider, or Reject
+- justification: one or two sentences
+
+Assess every candidate independently of the others."""
+
+# Profile fields a screening needs; long text is cut to SCREENING_PROFILE_MAX_CHARS
+COMPACT_PROFILE_FIELDS = (
+    "name", "title", "skills", "years_experience", "location",
+    "education", "experience", "certifications", "summary",
+)
+COMPACT_LIST_ITEMS = 10
+
+def compact_profile(candidate: Dict[str, Any]) -> Dict[str, Any]:
+    """Keep the fields of a candidate that matter to screening, trimmed to size."""
+    max_chars = settings.SCREENING_PROFILE_MAX_CHARS
+
+    def trim(value):
+        if isinstance(value, str):
+            return value if len(value) <= max_chars else value[:max_chars] + "..."
+        if isinstance(value, list):
+            return [trim(item) for item in value[:COMPACT_LIST_ITEMS]]
+        if isinstance(value, dict):
+            return {key: trim(item) for key, item in value.items() if item not in (None, "", [], {})}
+        return value
+
+    return {key: trim(candidate[key]) for key in COMPACT_PROFILE_FIELDS if candidate.get(key) not in (None, "", [], {})}
+
+class TokenEstimator:
+    """Estimates prompt tokens from characters, calibrated by the usage of past runs."""
+    
+    def __init__(self, chars_per_token: float = 4.0, alpha: float = 0.2):
+        self.chars_per_token = chars_per_token
+        self.alpha = alpha
+    
+    def estimate(self, text: str) -> int:
+        return int(len(text) / self.chars_per_token) + 1
+    
+    def observe(self, chars: int, tokens: int) -> None:
+        if chars and tokens:
+            self.chars_per_token += self.alpha * (chars / tokens - self.chars_per_token)
+
+def plan_packs(profiles: List[Dict[str, Any]], estimator: TokenEstimator) -> List[List[Dict[str, Any]]]:
+    """
+    Split candidate profiles into packs, each small enough for one call.
+    
+    A pack grows while its profiles fit SCREENING_PACK_INPUT_TOKENS and their
+    evaluations fit SCREENING_PACK_MAX_OUTPUT_TOKENS, up to
+    SCREENING_PACK_MAX_CANDIDATES. A profile too large to share a call gets
+    a pack of its own.
+    
+    Returns:
+        list: Packs of profiles, in input order
+    """
+    max_size = max(1, min(
+        settings.SCREENING_PACK_MAX_CANDIDATES,
+        settings.SCREENING_PACK_MAX_OUTPUT_TOKENS // settings.SCREENING_OUTPUT_TOKENS_PER_CANDIDATE,
+    ))
+    packs: List[List[Dict[str, Any]]] = []
+    pack: List[Dict[str, Any]] = []
+    pack_tokens = 0
+    for profile in profiles:
+        tokens = estimator.estimate(_canonical(profile))
+        if pack and (len(pack) >= max_size or pack_tokens + tokens > settings.SCREENING_PACK_INPUT_TOKENS):
+            packs.append(pack)
+            pack, pack_tokens = [], 0
+        pack.append(profile)
+        pack_tokens += tokens
+    if pack:
+        packs.append(pack)
+    return packs
+
 class CandidateEvaluation(BaseModel):
     """Model for candidate evaluation output."""
     overall_score: int
     strengths: List[str]
     areas_for_improvement: List[str]
-    recommendation: str
+    recommendation: Literal["Interview", "Consider", "Reject"]
     justification: str
 
+def _output_data(output: Any) -> Any:
+    """A run's final output as plain data; structured outputs become dicts."""
+    return output.model_dump() if isinstance(output, BaseModel) else output
+
+def _assessment_text(evaluation: CandidateEvaluation) -> str:
+    """An evaluation written out as the prose assessment the recruiter used to return."""
+    def numbered(items: List[str]) -> str:
+        return "\n".join(f"{i}. {item}" for i, item in enumerate(items, 1))
+    return (
+        f"Overall assessment: {evaluation.overall_score}/100.\n\n"
+        f"Key strengths:\n{numbered(evaluation.strengths)}\n\n"
+        f"Areas for improvement:\n{numbered(evaluation.areas_for_improvement)}\n\n"
+        f"Recommendation: {evaluation.recommendation}.\n\n"
+        f"Justification: {evaluation.justification}"
+    )
+
+class PackedCandidateEvaluation(CandidateEvaluation):
+    """One candidate's evaluation among several in one output."""
+    candidate_id: str
+
+class PackedEvaluations(BaseModel):
+    """Output of one packed screening call."""
+    evaluations: List[PackedCandidateEvaluation]
+
+class JobMatches(BaseModel):
+    """Output of the job matcher: an evaluation of every candidate matched to a job."""
+    job_id: Optional[str]
+    evaluations: List[PackedCandidateEvaluation]
+
 class AgentSDKService:
     """Service for managing AI agents using OpenAI Agents SDK."""
     
-    def __init__(self):
+    def __init__(self, run_config: Optional[RunConfig] = None):
         self.agents = {}
+        self.run_stats: Dict[str, RunStats] = {}
+        # Passed to every Runner.run; lets benchmarks swap in a fake model provider
+        self.run_config = run_config
+        self.search_cache = SemanticCache()
+        self.token_estimator = TokenEstimator()
+    
+    def _stats_for(self, agent_name: str) -> RunStats:
+        """Get the run statistics for an agent, creating them on first use."""
+        if agent_name not in self.run_stats:
+            self.run_stats[agent_name] = RunStats(settings.AGENT_LATENCY_WINDOW)
+        return self.run_stats[agent_name]
+    
+    def get_run_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Return latency, timeout and hedging statistics per agent."""
+        return {name: stats.snapshot() for name, stats in self.run_stats.items()}
+    
+    async def _run(self, agent: Agent, query: str) -> RunResult:
+        """
+        Run an agent under the current deadline, hedging slow calls if enabled.
+        
+        Args:
+            agent: The agent to run
+            query: The input for the agent
+            
+        Returns:
+            RunResult: The result of the winning run
+            
+        Raises:
+            DeadlineExceeded: If the run does not finish within its time budget
+        """
+        stats = self._stats_for(agent.name)
+        timeout = timeout_for(settings.AGENT_RUN_TIMEOUT)
+        
+        hedge_after = None
+        if settings.AGENT_HEDGING_ENABLED and len(stats.latency) >= settings.AGENT_HEDGE_MIN_SAMPLES:
+            hedge_after = stats.latency.percentile(settings.AGENT_HEDGE_PERCENTILE)
+        
+        stats.calls += 1
+        hedges_before = stats.hedges
+        start = time.monotonic()
+        try:
+            with tracing.span("agent.run", {"agent.name": agent.name, "agent.timeout": timeout}) as run_span:
+                result = await asyncio.wait_for(
+                    hedged_call(lambda: Runner.run(agent, input=query, run_config=self.run_config), hedge_after, stats),
+                    timeout=timeout
+                )
+                if run_span is not None:
+                    run_span.set_attribute("agent.hedged", stats.hedges > hedges_before)
+        except asyncio.TimeoutError:
+            stats.timeouts += 1
+            metrics.AGENT_RUN_ERRORS.labels(agent.name, "timeout").inc()
+            logger.warning(f"{agent.name} run exceeded its deadline of {timeout:.1f}s")
+            raise DeadlineExceeded(f"{agent.name} run exceeded its deadline of {timeout:.1f}s")
+        except Exception:
+            stats.errors += 1
+            metrics.AGENT_RUN_ERRORS.labels(agent.name, "error").inc()
+            raise
+        finally:
+            if stats.hedges > hedges_before:
+                metrics.AGENT_HEDGES.labels(agent.name).inc()
+        
+        elapsed = time.monotonic() - start
+        stats.latency.record(elapsed)
+        metrics.record_agent_run(
+            agent.name,
+            elapsed,
+            sum(response.usage.input_tokens for response in result.raw_responses),
+            sum(response.usage.output_tokens for response in result.raw_responses),
+        )
+        return result
         
     def create_recruiter_agent(self) -> Agent:
         """Create a recruiter agent."""
@@ -37,7 +282,6 @@ class AgentSDKService:
         2. Identifying top talent based on job requirements
         3. Providing insights on candidate strengths and weaknesses
         4. Making interview recommendations
-        5. Searching for candidates matching specific job requirements
         
         When evaluating candidates:
         - Focus on both technical skills and cultural fit
@@ -46,12 +290,6 @@ class AgentSDKService:
         - Highlight areas for growth or potential concerns
         - Provide a clear recommendation (Interview, Consider, or Reject)
         
-        When searching for candidates:
-        - Match technical skills to job requirements
-        - Consider experience level and seniority needs
-        - Look for relevant industry experience
-        - Calculate a match score based on alignment with requirements
-        
         Always provide specific, data-driven recommendations and insights.
         """
         
@@ -59,6 +297,7 @@ class AgentSDKService:
             name="AI Recruiter",
             instructions=instructions,
             model="gpt-4o",
+            output_type=CandidateEvaluation,
             model_settings=ModelSettings(
                 temperature=0.2
             )
@@ -67,6 +306,38 @@ class AgentSDKService:
         self.agents["recruiter"] = agent
         return agent
     
+    def create_screening_agent(self) -> Agent:
+        """Create an agent that evaluates several candidates per call, with structured output."""
+        if "screening" in self.agents:
+            return self.agents["screening"]
+        
+        instructions = """
+        You are an AI Recruiter screening candidates for tech companies.
+        
+        When evaluating candidates:
+        - Focus on both technical skills and cultural fit
+        - Consider experience, education, and portfolio
+        - Identify specific strengths that match job requirements
+        - Highlight areas for growth or potential concerns
+        - Provide a clear recommendation (Interview, Consider, or Reject)
+        
+        Always provide specific, data-driven recommendations and insights.
+        """
+        
+        agent = Agent(
+            name="AI Screener",
+            instructions=instructions,
+            model="gpt-4o",
+            output_type=PackedEvaluations,
+            model_settings=ModelSettings(
+                temperature=0.2,
+                max_tokens=settings.SCREENING_PACK_MAX_OUTPUT_TOKENS
+            )
+        )
+        
+        self.agents["screening"] = agent
+        return agent
+    
     def create_processor_agent(self) -> Agent:
         """Create an application processor agent."""
         if "processor" in self.agents:
@@ -124,7 +395,9 @@ class AgentSDKService:
         - Evaluate experience level appropriately
         - Account for transferable skills from other domains
         - Consider career trajectory and growth potential
-        - Provide a match percentage and detailed reasoning
+        - Give the match percentage as overall_score and your reasoning as justification
+        - Return one evaluation per candidate, with that candidate's id as candidate_id,
+          and the job's id as job_id
         
         Focus on finding the right matches for long-term success, not just immediate needs.
         """
@@ -133,6 +406,7 @@ class AgentSDKService:
             name="AI Job Matcher",
             instructions=instructions,
             model="gpt-4o",
+            output_type=JobMatches,
             model_settings=ModelSettings(
                 temperature=0.3
             )
@@ -196,7 +470,7 @@ class AgentSDKService:
         2. Route the task to the appropriate specialized agent
         
         Available agents:
-        - Recruiter: For evaluating candidates and providing hiring recommendations
+        - Recruiter: For evaluating one candidate and providing a hiring recommendation
         - Processor: For extracting and processing application information
         - Matcher: For matching candidates to job opportunities
         - Search: For finding candidates based on specific criteria
@@ -235,54 +509,140 @@ class AgentSDKService:
         """Process a candidate using the recruiter agent."""
         recruiter = self.create_recruiter_agent()
         
-        # Format the query with candidate and job data
-        query = f"Analyze this candidate: {candidate_data}"
-        if job_data:
-            query += f"\n\nFor this job: {job_data}"
-        
-        query += """
-        Provide:
-        1. Overall assessment (score out of 100)
-        2. Key strengths (at least 3)
-        3. Areas for improvement (at least 2)
-        4. Recommendation (Interview, Consider, or Reject)
-        5. Justification for your recommendation
-        
-        Format your response in a clear, structured way.
-        """
+        # The job is shared by a whole screening batch, so it precedes the candidate
+        query = _prompt(CANDIDATE_ASSESSMENT_PROMPT, ("Job", job_data), ("Candidate", candidate_data))
         
         # Run the agent
-        result = await Runner.run(recruiter, input=query)
+        result = await self._run(recruiter, query)
+        evaluation = result.final_output
         return {
-            "assessment": result.final_output,
+            "evaluation": evaluation.model_dump(),
+            "assessment": _assessment_text(evaluation),
+            "justification": evaluation.justification,
+            "job_id": (job_data or {}).get("id"),
             "candidate_id": candidate_data.get("id"),
             "name": candidate_data.get("name")
         }
     
-    async def search_candidates(self, job_requirements: Dict[str, Any], filters: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
-        """Search for candidates matching job requirements."""
-        search = self.create_search_agent()
+    async def _evaluate_pack(self, pack: List[Dict[str, Any]], job_data: Optional[Dict[str, Any]], stats: Dict[str, int]) -> Dict[str, Dict[str, Any]]:
+        """
+        Evaluate a pack of candidate profiles in one call.
         
-        # Format the query
-        query = f"Find candidates matching these job requirements: {job_requirements}"
-        if filters:
-            query += f"\n\nApply these filters: {filters}"
+        Returns:
+            dict: Evaluations by profile id; candidates the model skipped are missing
+        """
+        screener = self.create_screening_agent()
+        # The job precedes the candidates, so every pack shares the prefix
+        query = _prompt(PACKED_SCREENING_PROMPT, ("Job", job_data), ("Candidates", pack))
+        
+        stats["calls"] += 1
+        result = await self._run(screener, query)
+        input_tokens = sum(response.usage.input_tokens for response in result.raw_responses)
+        stats["input_tokens"] += input_tokens
+        stats["output_tokens"] += sum(response.usage.output_tokens for response in result.raw_responses)
+        self.token_estimator.observe(len(query) + len(screener.instructions), input_tokens)
+        
+        wanted = {profile["id"] for profile in pack}
+        evaluations = {}
+        for evaluation in result.final_output.evaluations:
+            if evaluation.candidate_id in wanted and evaluation.candidate_id not in evaluations:
+                evaluations[evaluation.candidate_id] = evaluation.model_dump(exclude={"candidate_id"})
+        return evaluations
+    
+    async def screen_candidates(self, candidates: List[Dict[str, Any]], job_data: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Screen many candidates for one job, several per model call.
+        
+        Candidates are reduced to compact profiles and packed as many per call
+        as the token budget allows (see plan_packs), so the instructions and
+        job are sent once per pack instead of once per candidate. Any
+        candidate a packed call failed to score is retried alone.
         
-        query += """
-        For each matching candidate, provide:
-        1. Match score (0-100)
-        2. Key matching skills and qualifications
-        3. Potential fit assessment
+        Profiles are identified to the model by their position in the input,
+        not by candidate ID, so candidates without an ID or sharing one still
+        get their own evaluation.
         
-        Return the top 5 candidates ordered by match score.
+        Args:
+            candidates: Candidate profiles, each with an id
+            job_data: The job they are screened for
+            
+        Returns:
+            dict: Per-candidate evaluations, in input order, and call statistics
         """
+        profiles = [{"id": str(position), **compact_profile(candidate)} for position, candidate in enumerate(candidates)]
+        packs = plan_packs(profiles, self.token_estimator)
+        stats = {"candidates": len(profiles), "calls": 0, "packs": len(packs), "fallbacks": 0, "input_tokens": 0, "output_tokens": 0}
+        limit = asyncio.Semaphore(settings.SCREENING_PACK_CONCURRENCY)
+        
+        async def evaluate(pack: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+            async with limit:
+                try:
+                    return await self._evaluate_pack(pack, job_data, stats)
+                except DeadlineExceeded:
+                    raise
+                except Exception as e:
+                    logger.warning(f"Screening pack of {len(pack)} candidates failed: {str(e)}")
+                    return {}
+        
+        evaluations: Dict[str, Dict[str, Any]] = {}
+        for pack_evaluations in await asyncio.gather(*(evaluate(pack) for pack in packs)):
+            evaluations.update(pack_evaluations)
+        
+        # Retry, one call each, whoever a multi-candidate pack left unscored
+        retry = [profile for pack in packs if len(pack) > 1 for profile in pack if profile["id"] not in evaluations]
+        stats["fallbacks"] = len(retry)
+        for single_evaluations in await asyncio.gather(*(evaluate([profile]) for profile in retry)):
+            evaluations.update(single_evaluations)
+        
+        results = []
+        for candidate, profile in zip(candidates, profiles):
+            entry = {"candidate_id": candidate.get("id"), "name": profile.get("name")}
+            if profile["id"] in evaluations:
+                entry["evaluation"] = evaluations[profile["id"]]
+            else:
+                entry["error"] = "The model did not return an evaluation for this candidate"
+            results.append(entry)
         
-        # Run the agent
-        result = await Runner.run(search, input=query)
         return {
-            "search_results": result.final_output,
+            "job_id": (job_data or {}).get("id"),
+            "evaluations": results,
+            "stats": stats
+        }
+    
+    async def search_candidates(
+        self,
+        job_requirements: Dict[str, Any],
+        filters: Optional[Dict[str, Any]] = None,
+        tenant_id: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        Search for candidates matching job requirements.
+        
+        A tenant's earlier search with the same filters and a paraphrase of
+        the same requirements is served from the semantic cache.
+        
+        Args:
+            job_requirements: What the candidates should match
+            filters: Filters the search must apply
+            tenant_id: Whose search cache to use; without one nothing is cached
+        """
+        search = self.create_search_agent()
+        
+        async def run() -> Tuple[Any, int]:
+            query = _prompt(CANDIDATE_SEARCH_PROMPT, ("Filters", filters), ("Job requirements", job_requirements))
+            
+            # Run the agent
+            result = await self._run(search, query)
+            return result.final_output, _run_tokens(result)
+        
+        # IDs name the job, not what is searched for
+        requirements = {key: value for key, value in job_requirements.items() if key not in ("id", "job_id")}
+        search_results, cached = await self.search_cache.get_or_run(tenant_id, query_text(requirements), filters, run)
+        return {
+            "search_results": search_results,
             "job_id": job_requirements.get("job_id"),
-            "title": job_requirements.get("title")
+            "title": job_requirements.get("title"),
+            "cached": cached
         }
     
     async def process_task(self, task_id: str, action: str, parameters: Dict[str, Any]) -> Dict[str, Any]:
@@ -290,15 +650,15 @@ class AgentSDKService:
         # Create a Triage agent to route to the appropriate specialized agent
         triage = self.create_triage_agent()
         
-        # Format the query
-        query = f"Task ID: {task_id}\nAction: {action}\nParameters: {parameters}\n\nProcess this task according to the action type."
+        # The task ID differs on every call, so it goes last
+        query = _prompt(TASK_PROMPT, ("Action", action), ("Parameters", parameters), ("Task ID", task_id))
         
         # Run the agent
-        result = await Runner.run(triage, input=query)
+        result = await self._run(triage, query)
         
         return {
             "task_id": task_id,
             "action": action,
-            "result": result.final_output,
+            "result": _output_data(result.final_output),
             "status": "completed"
         } 
\ No newline at end of file
@@ -1,7 +1,12 @@
 from celery import Celery
+from celery.signals import worker_init, worker_process_init, worker_process_shutdown
 import os
 import logging
 
+from app.core import metrics, profiling, tracing
+from app.core.config import settings
+from app.core.serialization import available_serializer, register_serializers, task_serializers
+
 logger = logging.getLogger(__name__)
 
 # Get Redis URL from environment
@@ -11,18 +16,101 @@ redis_url = os.getenv('REDIS_URL', 'redis://localhost:6379/0')
 celery_app = Celery('app',
              broker=redis_url,
              backend=redis_url,
-             include=['app.tasks'])
+             include=[
+                 'app.tasks',
+                 'app.agents.celery_tasks',
+                 'app.agents.processor.tasks',
+                 'app.agents.matcher.tasks',
+                 'app.agents.search.tasks',
+             ])
 
 # Make app available for backwards compatibility
 app = celery_app
 
+# Register the compact msgpack serializer; JSON stays accepted for old messages
+register_serializers()
+
 # Configure Celery
 celery_app.conf.update(
     result_expires=3600,  # 1 hour
     task_acks_late=True,
     task_reject_on_worker_lost=True,
     worker_hijack_root_logger=False,
+    task_serializer=available_serializer(settings.CELERY_SERIALIZER),
+    result_serializer=available_serializer(settings.CELERY_RESULT_SERIALIZER),
+    accept_content=["json", "pladder"],
+    result_accept_content=["json", "pladder"],
+    # Per-task serializers for messages sent through task signatures
+    task_annotations={
+        task_name: {"serializer": serializer}
+        for task_name, serializer in task_serializers().items()
+    },
 )
 
+# Record enqueue-to-start and run time for every task
+metrics.connect_celery_signals()
+tracing.connect_celery_signals()
+profiling.connect_celery_signals()
+
+
+@worker_init.connect
+def init_worker(**kwargs):
+    """Start one metrics exporter for all children when metrics are multiprocess."""
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        metrics.start_worker_exporter()
+    
+    # Local SQLite databases are created on demand; Postgres schemas are migrated
+    if settings.DATABASE_URL.startswith("sqlite"):
+        from app.core.database import dispose_engine, init_db
+        init_db()
+        # Children must open their own connections
+        dispose_engine()
+
+
+@worker_process_init.connect
+def init_worker_process(**kwargs):
+    """Create the shared, pooled Supabase and OpenAI clients in each worker child process."""
+    if not os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        from billiard.process import current_process
+        metrics.start_worker_exporter(getattr(current_process(), "index", 0) or 0)
+    tracing.init_tracing("pladder-worker")
+    
+    # One pooled Supabase client per child, never inherited from the parent
+    try:
+        from app.core.supabase_client import init_supabase
+        init_supabase()
+    except Exception as e:
+        logger.error(f"Error creating Supabase client in worker: {str(e)}")
+    
+    if not os.getenv("OPENAI_API_KEY"):
+        logger.warning("OPENAI_API_KEY not set, Agents SDK may not work correctly")
+        return
+
+    try:
+        from app.core.openai_client import install_default_openai_client
+        install_default_openai_client()
+        
+        from app.core.agent_tracing import install_trace_processors
+        install_trace_processors()
+    except Exception as e:
+        logger.error(f"Error installing OpenAI client in worker: {str(e)}")
+
+
+@worker_process_shutdown.connect
+def shutdown_worker_process(**kwargs):
+    """Close the worker's event loop and the pooled connections bound to it."""
+    from app.agents.celery_tasks import close_worker_loop
+    close_worker_loop()
+    
+    from app.core.agent_tracing import shutdown_trace_processors
+    shutdown_trace_processors()
+    
+    from app.core.database import dispose_engine
+    dispose_engine()
+    
+    from app.core.supabase_client import close_supabase
+    close_supabase()
+
+
 if __name__ == '__main__':
-    celery_app.start() 
\ No newline at end of file
+    celery_app.start() 
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Measure the per-run overhead of Agents SDK tracing.
+
+Each synthetic run opens one trace with an agent span, several generation
+spans and a function span, which is roughly what one Runner.run of the
+recruiter agent produces. Compares tracing disabled, exporting every trace
+and the sampled processor, reporting wall time per run on the calling
+thread and total process CPU per run including the background export.
+The "null" row is the SDK's own span bookkeeping with nothing exported.
+
+Usage:
+    python benchmarks/bench_agent_tracing.py --runs 5000
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agents import agent_span, function_span, generation_span, set_trace_processors, set_tracing_disabled, trace
+from agents.tracing import TracingProcessor
+from agents.tracing.processors import BatchTraceProcessor, default_processor
+
+from app.core.agent_tracing import JsonlTraceExporter, SampledTraceProcessor
+
+PROMPT = [{"role": "user", "content": "Evaluate this candidate for the Senior Data Scientist role. " * 20}]
+OUTPUT = [{"role": "assistant", "content": "Overall assessment: 84/100. Recommendation: Interview. " * 20}]
+
+
+class NullProcessor(TracingProcessor):
+    """Receives spans and discards them: the cost of the SDK creating spans at all."""
+
+    def on_trace_start(self, trace): pass
+    def on_trace_end(self, trace): pass
+    def on_span_start(self, span): pass
+    def on_span_end(self, span): pass
+    def shutdown(self): pass
+    def force_flush(self): pass
+
+
+def one_run(turns: int) -> None:
+    with trace("Agent workflow"):
+        with agent_span("AI Recruiter", tools=["search_candidates"]):
+            for _ in range(turns):
+                with generation_span(input=PROMPT, output=OUTPUT, model="gpt-4o",
+                                     usage={"input_tokens": 900, "output_tokens": 300}):
+                    pass
+            with function_span("search_candidates", input='{"skills": ["python"]}', output="[]"):
+                pass
+
+
+def measure(name: str, processor, runs: int, turns: int) -> dict:
+    if processor is None:
+        set_tracing_disabled(True)
+        set_trace_processors([])
+    else:
+        set_tracing_disabled(False)
+        set_trace_processors([processor])
+
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+    for _ in range(runs):
+        one_run(turns)
+    wall = time.perf_counter() - wall_start
+    if processor is not None:
+        processor.force_flush()
+        processor.shutdown()
+    cpu = time.process_time() - cpu_start
+
+    return {
+        "config": name,
+        "hot_path_us_per_run": round(wall / runs * 1e6, 1),
+        "cpu_us_per_run": round(cpu / runs * 1e6, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5000)
+    parser.add_argument("--turns", type=int, default=3, help="Generation spans per run")
+    parser.add_argument("--sample-rate", type=float, default=0.05)
+    args = parser.parse_args()
+
+    out_dir = tempfile.mkdtemp(prefix="agent-trace-bench-")
+
+    def batch(name: str) -> BatchTraceProcessor:
+        return BatchTraceProcessor(JsonlTraceExporter(os.path.join(out_dir, f"{name}.jsonl")))
+
+    results = [
+        measure("disabled", None, args.runs, args.turns),
+        measure("null", NullProcessor(), args.runs, args.turns),
+        measure("export_all", batch("all"), args.runs, args.turns),
+        measure(
+            f"sampled_{args.sample_rate}",
+            SampledTraceProcessor(batch("sampled"), sample_rate=args.sample_rate, slow_seconds=30),
+            args.runs,
+            args.turns,
+        ),
+    ]
+    for result, name in zip(results, [None, None, "all", "sampled"]):
+        path = os.path.join(out_dir, f"{name}.jsonl")
+        result["bytes_exported"] = os.path.getsize(path) if name and os.path.exists(path) else 0
+
+    set_trace_processors([default_processor()])
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
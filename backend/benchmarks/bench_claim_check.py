@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Benchmark broker message size and enqueue-side encode time for a large
+match_candidates call, with and without claim-check references.
+
+The message body is encoded the way Celery's protocol v2 does it (a JSON
+[args, kwargs, embed] triple), so the sizes are what Redis would hold.
+
+Usage:
+    python benchmarks/bench_claim_check.py --candidates 2000 --backend file
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import statistics
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core import claim_check
+from app.core.config import settings
+
+
+def make_candidate_pool(count: int) -> list:
+    return [
+        {
+            "id": f"cand{i:05d}",
+            "name": f"Candidate {i}",
+            "skills": ["Python", "SQL", "Machine Learning", "AWS", "Docker"][: 2 + i % 4],
+            "experience": [
+                {
+                    "title": "Software Engineer",
+                    "company": f"Company {i % 97}",
+                    "duration": f"{1 + i % 6} years",
+                    "description": "Built and operated backend services and data pipelines. " * 4,
+                }
+            ],
+            "education": [{"degree": "BSc Computer Science", "institution": "State University"}],
+        }
+        for i in range(count)
+    ]
+
+
+def encode_message(task_id: str, kwargs: dict) -> bytes:
+    return json.dumps([[task_id], kwargs, {"callbacks": None, "errbacks": None, "chain": None, "chord": None}]).encode()
+
+
+def measure(kwargs: dict, use_claim_check: bool, repeat: int) -> dict:
+    timings = []
+    body = b""
+    for _ in range(repeat):
+        start = time.perf_counter()
+        message_kwargs = claim_check.check_in_values(kwargs) if use_claim_check else kwargs
+        body = encode_message("task-1", message_kwargs)
+        timings.append(time.perf_counter() - start)
+    return {
+        "message_bytes": len(body),
+        "enqueue_encode_ms_p50": round(statistics.median(timings) * 1000, 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--candidates", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--backend", choices=["file", "redis"], default="file")
+    args = parser.parse_args()
+
+    settings.CLAIM_CHECK_BACKEND = args.backend
+    if args.backend == "file":
+        settings.CLAIM_CHECK_DIR = tempfile.mkdtemp(prefix="claim-check-bench-")
+
+    kwargs = {"job_data": {"id": "job456", "title": "Senior Data Scientist"},
+              "candidate_pool": make_candidate_pool(args.candidates)}
+
+    results = {
+        "candidates": args.candidates,
+        "inline": measure(kwargs, False, args.repeat),
+        "claim_check": measure(kwargs, True, args.repeat),
+    }
+    results["message_size_reduction"] = round(
+        results["inline"]["message_bytes"] / results["claim_check"]["message_bytes"], 1
+    )
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Benchmark back-to-back agent runs with a fresh client per run versus the
+shared, pooled OpenAI client.
+
+By default the runs go against a local stub of the chat completions API that
+counts new connections and can add a per-connection setup delay to emulate a
+TLS handshake. Point --base-url at a real provider to measure the real thing.
+
+Usage:
+    python benchmarks/bench_openai_client.py --runs 50 --handshake-ms 30
+"""
+
+import os
+import sys
+import json
+import socket
+import time
+import asyncio
+import argparse
+import threading
+import statistics
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+
+from agents import Agent, Runner, OpenAIChatCompletionsModel, set_tracing_disabled
+
+from app.core import openai_client
+
+COMPLETION = {
+    "id": "chatcmpl-bench",
+    "object": "chat.completion",
+    "created": 0,
+    "model": "gpt-4o",
+    "choices": [{
+        "index": 0,
+        "finish_reason": "stop",
+        "message": {"role": "assistant", "content": "Recommendation: Interview"},
+    }],
+    "usage": {"prompt_tokens": 500, "completion_tokens": 50, "total_tokens": 550},
+}
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Minimal keep-alive chat completions endpoint."""
+
+    protocol_version = "HTTP/1.1"
+    handshake_delay = 0.0
+    connections = 0
+    lock = threading.Lock()
+
+    def setup(self):
+        with StubHandler.lock:
+            StubHandler.connections += 1
+        time.sleep(self.handshake_delay)
+        self.request.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        super().setup()
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        body = json.dumps(COMPLETION).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def start_stub_server(handshake_ms: float) -> str:
+    StubHandler.handshake_delay = handshake_ms / 1000
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{server.server_port}/v1"
+
+
+async def run_once(client) -> float:
+    agent = Agent(
+        name="Benchmark Recruiter",
+        instructions="Evaluate the candidate.",
+        model=OpenAIChatCompletionsModel(model="gpt-4o", openai_client=client),
+    )
+    start = time.perf_counter()
+    await Runner.run(agent, input="Analyze this candidate: {'name': 'Jane Smith'}")
+    return time.perf_counter() - start
+
+
+def bench_fresh(runs: int) -> list:
+    """Previous behaviour: new event loop and new client for every task."""
+    timings = []
+    for _ in range(runs):
+        loop = asyncio.new_event_loop()
+        try:
+            client = openai_client.create_openai_client()
+            timings.append(loop.run_until_complete(run_once(client)))
+            loop.run_until_complete(client.close())
+        finally:
+            loop.close()
+    return timings
+
+
+def bench_shared(runs: int) -> list:
+    """Shared pooled client on a long-lived loop, as in the API and workers."""
+    loop = asyncio.new_event_loop()
+    try:
+        client = openai_client.get_openai_client(loop)
+        timings = [loop.run_until_complete(run_once(client)) for _ in range(runs)]
+        loop.run_until_complete(openai_client.close_openai_client())
+    finally:
+        loop.close()
+    return timings
+
+
+def summarize(timings: list) -> dict:
+    ordered = sorted(timings)
+    return {
+        "runs": len(ordered),
+        "mean_ms": round(statistics.mean(ordered) * 1000, 2),
+        "p50_ms": round(ordered[len(ordered) // 2] * 1000, 2),
+        "p95_ms": round(ordered[int(len(ordered) * 0.95) - 1] * 1000, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=50)
+    parser.add_argument("--handshake-ms", type=float, default=30.0,
+                        help="Simulated per-connection setup cost of the local stub")
+    parser.add_argument("--base-url", help="Benchmark against this API instead of the local stub")
+    args = parser.parse_args()
+
+    set_tracing_disabled(True)
+    stub = args.base_url is None
+    openai_client.settings.OPENAI_BASE_URL = args.base_url or start_stub_server(args.handshake_ms)
+
+    results = {}
+    for name, bench in (("fresh_client_per_run", bench_fresh), ("shared_pooled_client", bench_shared)):
+        before = StubHandler.connections
+        results[name] = summarize(bench(args.runs))
+        if stub:
+            results[name]["connections_opened"] = StubHandler.connections - before
+
+    saved = results["fresh_client_per_run"]["mean_ms"] - results["shared_pooled_client"]["mean_ms"]
+    results["saved_per_run_ms"] = round(saved, 2)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Compare model calls, tokens and wall time of screening a batch of candidates
+one per call (process_candidate) and packed several per call
+(screen_candidates).
+
+The model is a fake: it answers after a fixed per-call latency plus a
+per-output-token delay, and reports input tokens as characters / 4 of the
+instructions and prompt it received, so the token figures follow the real
+prompt sizes.
+
+Usage:
+    python benchmarks/bench_packed_screening.py --candidates 100 --pack-size 10
+"""
+
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agents import ModelProvider, RunConfig, Usage
+from agents.items import ModelResponse
+from agents.models.interface import Model
+from openai.types.responses import ResponseOutputMessage, ResponseOutputText
+
+from app.core.config import settings
+from app.services.agents_sdk_service import AgentSDKService
+
+EVALUATION = {
+    "overall_score": 84,
+    "strengths": ["Python", "SQL", "Applied ML"],
+    "areas_for_improvement": ["Cloud platforms", "Project leadership"],
+    "recommendation": "Interview",
+    "justification": "Strong backend and data background.",
+}
+
+
+class BenchModel(Model):
+    def __init__(self, call_latency: float, seconds_per_output_token: float, output_tokens_per_candidate: int):
+        self.call_latency = call_latency
+        self.seconds_per_output_token = seconds_per_output_token
+        self.output_tokens_per_candidate = output_tokens_per_candidate
+
+    async def get_response(self, system_instructions, input, model_settings, tools, output_schema, handoffs, tracing):
+        text = input if isinstance(input, str) else input[-1]["content"]
+        if "Candidates:\n" in text:
+            candidates = json.loads(text.split("Candidates:\n", 1)[1])
+            answer = json.dumps({"evaluations": [{"candidate_id": candidate["id"], **EVALUATION} for candidate in candidates]})
+            scored = len(candidates)
+        else:
+            answer, scored = json.dumps(EVALUATION), 1
+
+        output_tokens = self.output_tokens_per_candidate * scored
+        await asyncio.sleep(self.call_latency + output_tokens * self.seconds_per_output_token)
+        message = ResponseOutputMessage(
+            id="msg_bench",
+            type="message",
+            role="assistant",
+            status="completed",
+            content=[ResponseOutputText(type="output_text", text=answer, annotations=[])],
+        )
+        input_tokens = (len(system_instructions or "") + len(text)) // 4
+        usage = Usage(requests=1, input_tokens=input_tokens, output_tokens=output_tokens, total_tokens=input_tokens + output_tokens)
+        return ModelResponse(output=[message], usage=usage, referenceable_id=None)
+
+    def stream_response(self, *args, **kwargs):
+        raise NotImplementedError("The benchmark does not stream")
+
+
+class BenchProvider(ModelProvider):
+    def __init__(self, model: Model):
+        self.model = model
+
+    def get_model(self, model_name):
+        return self.model
+
+
+def make_job() -> dict:
+    return {
+        "id": "job-1",
+        "title": "Senior Backend Engineer",
+        "required_skills": ["Python", "PostgreSQL", "AWS", "Docker", "Kubernetes"],
+        "description": "Design, build and operate the APIs and data pipelines behind our hiring platform. " * 20,
+    }
+
+
+def make_candidates(count: int) -> list:
+    return [
+        {
+            "id": f"cand{i:04d}",
+            "name": f"Candidate {i}",
+            "title": "Software Engineer",
+            "skills": ["Python", "SQL", "Machine Learning", "AWS", "Docker"][: 2 + i % 4],
+            "years_experience": 2 + i % 9,
+            "summary": "Built and operated backend services and data pipelines at scale. " * 3,
+            "experience": [{"company": f"Company {i % 37}", "years": 1 + i % 5}],
+        }
+        for i in range(count)
+    ]
+
+
+class Counter:
+    def __init__(self):
+        self.calls = 0
+        self.input_tokens = 0
+        self.output_tokens = 0
+
+    def wrap(self, service: AgentSDKService) -> None:
+        run = service._run
+
+        async def counted(agent, query):
+            result = await run(agent, query)
+            self.calls += 1
+            self.input_tokens += sum(response.usage.input_tokens for response in result.raw_responses)
+            self.output_tokens += sum(response.usage.output_tokens for response in result.raw_responses)
+            return result
+
+        service._run = counted
+
+
+async def screen_one_by_one(service: AgentSDKService, candidates: list, job: dict, concurrency: int) -> None:
+    limit = asyncio.Semaphore(concurrency)
+
+    async def one(candidate):
+        async with limit:
+            await service.process_candidate(candidate, job)
+
+    await asyncio.gather(*(one(candidate) for candidate in candidates))
+
+
+def report(name: str, counter: Counter, seconds: float, candidates: int) -> dict:
+    tokens = counter.input_tokens + counter.output_tokens
+    row = {
+        "mode": name,
+        "calls": counter.calls,
+        "input_tokens": counter.input_tokens,
+        "output_tokens": counter.output_tokens,
+        "seconds": round(seconds, 3),
+        "candidates_per_call": round(candidates / counter.calls, 2),
+        "candidates_per_1k_tokens": round(1000 * candidates / tokens, 2),
+    }
+    print(
+        f"{name:<10} calls {row['calls']:>5}  input {row['input_tokens']:>9}  output {row['output_tokens']:>8}  "
+        f"{row['seconds']:>7.2f}s  {row['candidates_per_call']:>5} cand/call  {row['candidates_per_1k_tokens']:>6} cand/1k tok"
+    )
+    return row
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--candidates", type=int, default=100)
+    parser.add_argument("--pack-size", type=int, default=settings.SCREENING_PACK_MAX_CANDIDATES)
+    parser.add_argument("--concurrency", type=int, default=settings.SCREENING_PACK_CONCURRENCY)
+    parser.add_argument("--call-latency-ms", type=float, default=400)
+    parser.add_argument("--output-token-us", type=float, default=100, help="Microseconds per output token")
+    parser.add_argument("--output-tokens", type=int, default=250, help="Output tokens per candidate evaluated")
+    args = parser.parse_args()
+
+    settings.SCREENING_PACK_MAX_CANDIDATES = args.pack_size
+    settings.SCREENING_PACK_CONCURRENCY = args.concurrency
+    model = BenchModel(args.call_latency_ms / 1000, args.output_token_us / 1e6, args.output_tokens)
+    job, candidates = make_job(), make_candidates(args.candidates)
+
+    rows = []
+    for name, screen in (
+        ("single", lambda service: screen_one_by_one(service, candidates, job, args.concurrency)),
+        ("packed", lambda service: service.screen_candidates(candidates, job)),
+    ):
+        service = AgentSDKService(run_config=RunConfig(model_provider=BenchProvider(model)))
+        counter = Counter()
+        counter.wrap(service)
+        start = time.perf_counter()
+        asyncio.run(screen(service))
+        rows.append(report(name, counter, time.perf_counter() - start, args.candidates))
+
+    single, packed = rows
+    print(
+        f"packed vs single: {single['calls'] / packed['calls']:.1f}x fewer calls, "
+        f"{packed['candidates_per_1k_tokens'] / single['candidates_per_1k_tokens']:.1f}x candidates per token, "
+        f"{single['seconds'] / packed['seconds']:.1f}x faster"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Benchmark Celery serializers on realistic process_candidate and
+search_candidates messages and results.
+
+Reports bytes on the wire, encode/decode CPU per body and, when --redis-url
+points at a reachable Redis, the memory Redis uses to hold each body.
+
+Usage:
+    python benchmarks/bench_serialization.py --redis-url redis://localhost:6379/15
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from kombu import compression as kombu_compression
+from kombu.serialization import dumps, loads
+
+from app.core import serialization
+from app.core.config import settings
+
+ASSESSMENT = (
+    "Overall assessment: 84/100.\n\nKey strengths:\n"
+    "1. Five years of production machine learning, including customer segmentation and churn models.\n"
+    "2. Strong Python and SQL, with hands-on TensorFlow experience matching the job requirements.\n"
+    "3. Experience deploying NLP models for sentiment analysis and text classification.\n\n"
+    "Areas for improvement:\n1. No evidence of leading data science projects end to end.\n"
+    "2. Limited exposure to cloud platforms such as AWS or GCP.\n\n"
+    "Recommendation: Interview.\n\nJustification: The candidate's technical depth in Python, SQL and "
+    "deep learning frameworks closely matches the role, and their applied ML work is directly relevant. "
+) * 3
+
+CANDIDATE = {
+    "id": "cand123",
+    "name": "Jane Smith",
+    "skills": ["Python", "Machine Learning", "Data Analysis", "SQL", "TensorFlow"],
+    "experience": [
+        {"title": "Data Scientist", "company": "TechCorp", "duration": "3 years",
+         "description": "Developed ML models for customer segmentation and churn prediction."},
+        {"title": "ML Engineer", "company": "AI Solutions Inc.", "duration": "2 years",
+         "description": "Built and deployed NLP models for sentiment analysis and text classification."},
+    ],
+    "education": [{"degree": "Master's in Computer Science", "institution": "Stanford University", "year": 2018}],
+}
+
+JOB = {
+    "job_id": "job456",
+    "title": "Senior Data Scientist",
+    "requirements": [
+        "5+ years of experience in Data Science or Machine Learning",
+        "Proficiency in Python and SQL",
+        "Experience with deep learning frameworks (TensorFlow or PyTorch)",
+        "Strong problem-solving and analytical skills",
+        "Experience leading data science projects",
+    ],
+    "preferred": ["PhD in Computer Science, Statistics, or related field",
+                  "Experience in cloud computing platforms (AWS, GCP)", "Publications in ML conferences"],
+}
+
+EMBED = {"callbacks": None, "errbacks": None, "chain": None, "chord": None}
+
+PAYLOADS = {
+    "process_candidate.message": [["task-1"], {"candidate_data": CANDIDATE, "job_data": JOB}, EMBED],
+    "process_candidate.result": {
+        "status": "SUCCESS",
+        "result": {"status": "completed", "completed_at": "2025-01-01T00:00:00",
+                   "result": {"assessment": ASSESSMENT, "candidate_id": "cand123", "name": "Jane Smith"}},
+        "traceback": None, "children": [], "date_done": "2025-01-01T00:00:00", "task_id": "task-1",
+    },
+    "search_candidates.result": {
+        "status": "SUCCESS",
+        "result": {
+            "search_criteria": {"skills": ["python", "django"], "location": "San Francisco"},
+            "total_results": 50,
+            "candidates": [
+                {**CANDIDATE, "id": f"cand{i:04d}", "relevance_score": round(1 - i / 100, 4)}
+                for i in range(50)
+            ],
+            "search_results": ASSESSMENT,
+        },
+        "traceback": None, "children": [], "date_done": "2025-01-01T00:00:00", "task_id": "task-2",
+    },
+}
+
+
+def encode(payload, serializer: str, compression: str):
+    settings.CELERY_COMPRESSION = compression
+    content_type, encoding, body = dumps(payload, serializer=serializer)
+    if isinstance(body, str):
+        body = body.encode("utf-8")
+    if serializer == "json" and compression != "none":
+        body, _ = kombu_compression.compress(body, compression)
+    return content_type, encoding, body
+
+
+def decode(body, content_type, encoding, serializer: str, compression: str):
+    if serializer == "json" and compression != "none":
+        body = kombu_compression.decompress(body, "application/x-" + compression)
+    return loads(body, content_type, encoding)
+
+
+def timed(fn, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+def redis_memory(client, body: bytes):
+    if client is None:
+        return None
+    client.set("serialization-bench", body)
+    usage = client.memory_usage("serialization-bench")
+    client.delete("serialization-bench")
+    return usage
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=2000)
+    parser.add_argument("--redis-url", help="Measure Redis memory usage on this server")
+    args = parser.parse_args()
+
+    serialization.register_serializers()
+    settings.CELERY_COMPRESSION_THRESHOLD = 1024
+
+    redis_client = None
+    if args.redis_url:
+        import redis
+        redis_client = redis.Redis.from_url(args.redis_url)
+
+    configs = [("json", "none"), ("json", "gzip"), ("pladder", "none"), ("pladder", "gzip"), ("pladder", "zstd")]
+    report = {}
+    for name, payload in PAYLOADS.items():
+        report[name] = {}
+        for serializer, compression in configs:
+            content_type, encoding, body = encode(payload, serializer, compression)
+            report[name][f"{serializer}+{compression}"] = {
+                "bytes": len(body),
+                "encode_us": round(timed(lambda: encode(payload, serializer, compression), args.repeat), 1),
+                "decode_us": round(timed(
+                    lambda: decode(body, content_type, encoding, serializer, compression), args.repeat
+                ), 1),
+                "redis_memory_bytes": redis_memory(redis_client, body),
+            }
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,224 @@
+"""
+In-memory stand-ins used by the load-test suite.
+
+FakeSupabase implements the slice of the supabase-py query builder that
+AgentService and the search shards use, with optional per-call latency.
+FakeModelProvider is an Agents SDK ModelProvider whose models answer after
+a latency drawn from a log-normal distribution fitted to a p50/p95 pair,
+reporting configurable token counts.
+"""
+
+import copy
+import json
+import math
+import time
+import random
+import asyncio
+import threading
+from collections import defaultdict
+from typing import Any, Callable, Dict, List, Optional
+
+from agents import ModelProvider, Usage
+from agents.items import ModelResponse
+from agents.models.interface import Model
+from openai.types.responses import ResponseOutputMessage, ResponseOutputText
+
+Recorder = Callable[[str, float], None]
+
+
+class _Result:
+    def __init__(self, data: List[Dict[str, Any]]):
+        self.data = data
+
+
+class _Query:
+    def __init__(self, db: "FakeSupabase", table: str):
+        self.db = db
+        self.table_name = table
+        self.operation = "select"
+        self.payload: Any = None
+        self.filters: List[Callable[[Dict[str, Any]], bool]] = []
+        self.order_by: Optional[tuple] = None
+        self.limit_to: Optional[int] = None
+
+    def select(self, *columns, **kwargs) -> "_Query":
+        self.operation = "select"
+        return self
+
+    def insert(self, payload) -> "_Query":
+        self.operation, self.payload = "insert", payload
+        return self
+
+    def upsert(self, payload, on_conflict: str = "", ignore_duplicates: bool = False) -> "_Query":
+        self.operation, self.payload = "upsert", payload
+        self.conflict_columns = [column for column in on_conflict.split(",") if column] or ["id"]
+        self.ignore_duplicates = ignore_duplicates
+        return self
+
+    def update(self, payload: Dict[str, Any]) -> "_Query":
+        self.operation, self.payload = "update", payload
+        return self
+
+    def delete(self) -> "_Query":
+        self.operation = "delete"
+        return self
+
+    def eq(self, column: str, value: Any) -> "_Query":
+        self.filters.append(lambda row: row.get(column) == value)
+        return self
+
+    def gte(self, column: str, value: Any) -> "_Query":
+        self.filters.append(lambda row: row.get(column) is not None and row.get(column) >= value)
+        return self
+
+    def lt(self, column: str, value: Any) -> "_Query":
+        self.filters.append(lambda row: row.get(column) is not None and row.get(column) < value)
+        return self
+
+    def in_(self, column: str, values: List[Any]) -> "_Query":
+        wanted = set(values)
+        self.filters.append(lambda row: row.get(column) in wanted)
+        return self
+
+    def order(self, column: str, desc: bool = False) -> "_Query":
+        self.order_by = (column, desc)
+        return self
+
+    def limit(self, count: int) -> "_Query":
+        self.limit_to = count
+        return self
+
+    def execute(self) -> _Result:
+        start = time.perf_counter()
+        if self.db.latency:
+            time.sleep(self.db.latency)
+        with self.db.lock:
+            rows = self.db.tables[self.table_name]
+            if self.operation == "insert":
+                new_rows = self.payload if isinstance(self.payload, list) else [self.payload]
+                rows.extend(copy.deepcopy(new_rows))
+                data = copy.deepcopy(new_rows)
+            elif self.operation == "upsert":
+                data = []
+                for new_row in self.payload if isinstance(self.payload, list) else [self.payload]:
+                    key = [new_row.get(column) for column in self.conflict_columns]
+                    existing = next((row for row in rows if [row.get(column) for column in self.conflict_columns] == key), None)
+                    if existing is None:
+                        rows.append(copy.deepcopy(new_row))
+                    elif not self.ignore_duplicates:
+                        existing.update(copy.deepcopy(new_row))
+                    else:
+                        continue
+                    data.append(copy.deepcopy(new_row))
+            else:
+                matched = [row for row in rows if all(f(row) for f in self.filters)]
+                if self.operation == "update":
+                    for row in matched:
+                        row.update(copy.deepcopy(self.payload))
+                elif self.operation == "delete":
+                    self.db.tables[self.table_name] = [row for row in rows if row not in matched]
+                if self.order_by:
+                    column, desc = self.order_by
+                    matched.sort(key=lambda row: row.get(column) or "", reverse=desc)
+                if self.limit_to is not None:
+                    matched = matched[:self.limit_to]
+                data = copy.deepcopy(matched)
+        self.db.record(f"db.{self.operation}.{self.table_name}", time.perf_counter() - start)
+        return _Result(data)
+
+
+class FakeSupabase:
+    """Thread-safe in-memory tables behind the supabase-py builder API."""
+
+    def __init__(self, latency: float = 0.0, recorder: Optional[Recorder] = None):
+        self.latency = latency
+        self.tables: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        self.lock = threading.Lock()
+        self.record: Recorder = recorder or (lambda stage, seconds: None)
+
+    def table(self, name: str) -> _Query:
+        return _Query(self, name)
+
+
+class LatencyDistribution:
+    """Log-normal latency fitted so its median and 95th percentile match the inputs."""
+
+    def __init__(self, p50: float, p95: float, seed: Optional[int] = None):
+        self.mu = math.log(max(p50, 1e-6))
+        self.sigma = max(math.log(max(p95, p50) / max(p50, 1e-6)) / 1.6449, 0.0)
+        self.random = random.Random(seed)
+
+    def sample(self) -> float:
+        return self.random.lognormvariate(self.mu, self.sigma)
+
+
+class FakeModel(Model):
+    def __init__(self, provider: "FakeModelProvider", name: str):
+        self.provider = provider
+        self.name = name
+
+    async def get_response(self, system_instructions, input, model_settings, tools, output_schema, handoffs, tracing):
+        delay = self.provider.latency.sample()
+        await asyncio.sleep(delay)
+        self.provider.record("model", delay)
+        message = ResponseOutputMessage(
+            id="msg_fake",
+            type="message",
+            role="assistant",
+            status="completed",
+            content=[ResponseOutputText(type="output_text", text=self.provider.answer(output_schema), annotations=[])],
+        )
+        usage = Usage(
+            requests=1,
+            input_tokens=self.provider.input_tokens,
+            output_tokens=self.provider.output_tokens,
+            total_tokens=self.provider.input_tokens + self.provider.output_tokens,
+        )
+        return ModelResponse(output=[message], usage=usage, referenceable_id=None)
+
+    def stream_response(self, *args, **kwargs):
+        raise NotImplementedError("The load test does not stream")
+
+
+class FakeModelProvider(ModelProvider):
+    """
+    Model provider for Runner.run that never touches the network.
+
+    Args:
+        p50: Median model latency in seconds
+        p95: 95th percentile model latency in seconds
+        input_tokens: Input tokens reported per call
+        output_tokens: Output tokens reported per call
+    """
+
+    def __init__(
+        self,
+        p50: float = 0.8,
+        p95: float = 2.5,
+        input_tokens: int = 900,
+        output_tokens: int = 300,
+        seed: Optional[int] = None,
+        recorder: Optional[Recorder] = None,
+    ):
+        self.latency = LatencyDistribution(p50, p95, seed)
+        self.input_tokens = input_tokens
+        self.output_tokens = output_tokens
+        self.output_text = (
+            "Overall assessment: 84/100. Key strengths: Python, SQL, applied ML. "
+            "Areas for improvement: cloud platforms, project leadership. Recommendation: Interview."
+        )
+        # Answer for agents with a structured output type, such as CandidateEvaluation
+        self.output_json = json.dumps({
+            "overall_score": 84,
+            "strengths": ["Python", "SQL", "Applied ML"],
+            "areas_for_improvement": ["Cloud platforms", "Project leadership"],
+            "recommendation": "Interview",
+            "justification": "Strong backend and data background; limited cloud experience.",
+        })
+        self.record: Recorder = recorder or (lambda stage, seconds: None)
+
+    def answer(self, output_schema) -> str:
+        return self.output_text if output_schema is None or output_schema.is_plain_text() else self.output_json
+
+    def get_model(self, model_name: Optional[str]) -> Model:
+        return FakeModel(self, model_name or "fake")
@@ -0,0 +1,3 @@
+-- Tasks created together through POST /agents/{agent_id}/tasks:batch share a batch_id
+alter table agent_tasks add column if not exists batch_id uuid;
+create index if not exists agent_tasks_batch_id_idx on agent_tasks (batch_id);
@@ -0,0 +1,22 @@
+-- Typed results of candidate evaluations (process_candidate, screen_candidates and job matcher tasks),
+-- so filtering and ranking by score or recommendation needs no model call
+create table if not exists candidate_evaluations (
+    id uuid primary key default gen_random_uuid(),
+    task_id uuid not null references agent_tasks (id) on delete cascade,
+    job_id text,
+    candidate_id text not null,
+    score smallint not null check (score between 0 and 100),
+    recommendation text not null check (recommendation in ('Interview', 'Consider', 'Reject')),
+    strengths text[] not null default '{}',
+    areas_for_improvement text[] not null default '{}',
+    justification text,
+    created_at timestamptz not null default now(),
+    -- Storing a task's evaluations again is a no-op
+    unique (task_id, candidate_id)
+);
+
+-- "Interview recommendations above 80 for job X, best first"
+create index if not exists candidate_evaluations_job_idx
+    on candidate_evaluations (job_id, recommendation, score desc);
+create index if not exists candidate_evaluations_candidate_idx
+    on candidate_evaluations (candidate_id);
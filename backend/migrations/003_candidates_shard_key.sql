@@ -0,0 +1,6 @@
+-- Search shards own contiguous ranges of shard_key, the first 32 bits of md5(id)
+-- (app/agents/search/sharding.py computes the same value), so each shard reads
+-- only its own rows with a range predicate instead of scanning the corpus
+alter table candidates add column if not exists shard_key bigint
+    generated always as (('x' || substr(md5(id::text), 1, 8))::bit(32)::bigint) stored;
+create index if not exists candidates_shard_key_idx on candidates (shard_key);
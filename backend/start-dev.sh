@@ -26,6 +26,10 @@ export APP_ENV=development
 export PRODUCTION=false
 export BYPASS_AUTH=${BYPASS_AUTH:-false}
 
+# Create the sample agents if the database has none
+echo "Seeding sample agents..."
+python -m app.seed || echo "Seeding failed; continuing"
+
 # Start the development server
 echo "Starting FastAPI development server..."
 uvicorn app.main:app --reload --host 0.0.0.0 --port 8000 
\ No newline at end of file
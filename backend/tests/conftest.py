@@ -0,0 +1,43 @@
+"""
+Shared fixtures: in-memory Supabase tables and a Celery app that never reaches a broker.
+"""
+
+import pytest
+
+from app.core import supabase_client, task_events
+from benchmarks.fakes import FakeSupabase
+
+
+@pytest.fixture
+def db(monkeypatch):
+    """
+    Empty in-memory tables behind the Supabase client; tests seed what they need.
+
+    The stages the queries went through are listed in db.stages. Task status
+    notifications are dropped, since there is no Redis to publish them to.
+    """
+    stages = []
+    fake = FakeSupabase(recorder=lambda stage, seconds: stages.append(stage))
+    fake.stages = stages
+    monkeypatch.setattr(supabase_client, "supabase", fake)
+    monkeypatch.setattr(task_events, "publish_task_update", lambda task_id, status: None)
+    monkeypatch.setattr(task_events, "publish_task_updates", lambda task_ids, status: None)
+    return fake
+
+
+@pytest.fixture
+def celery_memory(monkeypatch):
+    """Records the tasks sent through send_task instead of publishing them."""
+    from app.worker import celery_app
+
+    monkeypatch.setitem(celery_app.conf, "broker_url", "memory://")
+    monkeypatch.setitem(celery_app.conf, "result_backend", "cache+memory://")
+    sent = []
+
+    def send_task(name, args=None, kwargs=None, **options):
+        from celery.result import AsyncResult
+        sent.append({"name": name, "args": list(args or []), "kwargs": kwargs, **options})
+        return AsyncResult(options.get("task_id"), app=celery_app)
+
+    monkeypatch.setattr(celery_app, "send_task", send_task)
+    return sent
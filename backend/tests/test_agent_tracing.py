@@ -0,0 +1,88 @@
+"""
+Unit tests for tail sampling of Agents SDK traces.
+"""
+
+import json
+
+import pytest
+from agents import custom_span, set_trace_processors, set_tracing_disabled, trace
+from agents.tracing import TracingProcessor
+from agents.tracing.processors import BatchTraceProcessor, default_processor
+
+from app.core.agent_tracing import JsonlTraceExporter, SampledTraceProcessor
+
+
+class CollectingProcessor(TracingProcessor):
+    def __init__(self):
+        self.traces = []
+        self.spans = []
+
+    def on_trace_start(self, trace):
+        self.traces.append(trace)
+
+    def on_trace_end(self, trace):
+        pass
+
+    def on_span_start(self, span):
+        pass
+
+    def on_span_end(self, span):
+        self.spans.append(span)
+
+    def shutdown(self):
+        pass
+
+    def force_flush(self):
+        pass
+
+
+@pytest.fixture
+def install():
+    set_tracing_disabled(False)
+
+    def _install(processor):
+        set_trace_processors([processor])
+        return processor
+
+    yield _install
+    set_trace_processors([default_processor()])
+
+
+def _run(name, error=False):
+    with trace(name):
+        with custom_span("turn") as span:
+            if error:
+                span.set_error({"message": "model error", "data": None})
+
+
+def test_unsampled_fast_runs_are_dropped(install):
+    sink = CollectingProcessor()
+    install(SampledTraceProcessor(sink, sample_rate=0.0, slow_seconds=60))
+    _run("fast")
+    assert sink.traces == [] and sink.spans == []
+
+
+def test_errors_and_slow_runs_are_always_kept(install):
+    sink = CollectingProcessor()
+    install(SampledTraceProcessor(sink, sample_rate=0.0, slow_seconds=60))
+    _run("failing", error=True)
+    assert [t.name for t in sink.traces] == ["failing"]
+    assert len(sink.spans) == 1
+
+    slow_sink = CollectingProcessor()
+    install(SampledTraceProcessor(slow_sink, sample_rate=0.0, slow_seconds=0))
+    _run("slow")
+    assert [t.name for t in slow_sink.traces] == ["slow"]
+
+
+def test_kept_traces_are_batched_to_jsonl(install, tmp_path):
+    path = tmp_path / "traces.jsonl"
+    batch = BatchTraceProcessor(JsonlTraceExporter(str(path)), schedule_delay=60)
+    install(SampledTraceProcessor(batch, sample_rate=1.0, slow_seconds=60))
+    _run("sampled")
+    assert not path.exists()
+
+    batch.force_flush()
+    batch.shutdown()
+    items = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [item["object"] for item in items] == ["trace", "trace.span"]
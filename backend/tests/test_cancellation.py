@@ -0,0 +1,174 @@
+"""
+Unit tests for task cancellation: flags, revokes, cooperative stops and savings metrics.
+"""
+
+import asyncio
+import time
+
+import httpx
+import pytest
+from prometheus_client import REGISTRY
+
+from app.core import cancellation, metrics, redis_client
+from app.core.config import settings
+from app.schemas.agent import TaskStatus
+from app.services.agent_service import AgentService
+
+
+class FakeRedis:
+    """Keys with SET/EXISTS, through pipelines too."""
+
+    def __init__(self):
+        self.keys = {}
+
+    def set(self, key, value, ex=None):
+        self.keys[key] = value
+
+    def exists(self, key):
+        return int(key in self.keys)
+
+    def pipeline(self, transaction=True):
+        return self
+
+    def execute(self):
+        return []
+
+
+@pytest.fixture
+def redis(monkeypatch):
+    fake = FakeRedis()
+    monkeypatch.setattr(redis_client, "get_redis", lambda: fake)
+    monkeypatch.setattr(settings, "TASK_CANCEL_POLL_INTERVAL", 0.05)
+    return fake
+
+
+@pytest.fixture
+def revoked(monkeypatch):
+    from app.worker import celery_app
+
+    calls = []
+    monkeypatch.setattr(celery_app.control, "revoke", lambda task_ids: calls.append(list(task_ids)))
+    return calls
+
+
+@pytest.fixture
+def db(db):
+    for task_id, status, batch_id in [
+        ("task-1", "queued", None),
+        ("task-2", "completed", None),
+        ("task-3", "running", "batch-1"),
+        ("task-4", "queued", "batch-1"),
+        ("task-5", "failed", "batch-1"),
+    ]:
+        db.table("agent_tasks").insert({
+            "id": task_id, "agent_id": "agent-1", "batch_id": batch_id, "status": status,
+        }).execute()
+    return db
+
+
+def test_run_cancellable_aborts_in_flight_requests(redis):
+    aborted = []
+
+    async def slow_model(request):
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            aborted.append(request.url.path)
+            raise
+        return httpx.Response(200, json={})
+
+    async def agent_run():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(slow_model)) as client:
+            await client.post("https://api.openai.com/v1/responses", json={})
+
+    async def scenario():
+        loop = asyncio.get_running_loop()
+        loop.call_later(0.1, redis.set, "task-cancel:task-1", 1)
+        start = time.perf_counter()
+        with pytest.raises(cancellation.TaskCancelled):
+            await cancellation.run_cancellable(agent_run(), "task-1")
+        return time.perf_counter() - start
+
+    elapsed = asyncio.run(scenario())
+    assert elapsed < 1
+    assert aborted == ["/v1/responses"]
+
+
+def test_run_cancellable_never_starts_a_cancelled_task(redis):
+    started = []
+
+    async def work():
+        started.append(True)
+        return "done"
+
+    redis.set("task-cancel:task-1", 1)
+    with pytest.raises(cancellation.TaskCancelled):
+        asyncio.run(cancellation.run_cancellable(work(), "task-1"))
+    assert started == []
+    assert asyncio.run(cancellation.run_cancellable(work(), "task-2")) == "done"
+
+
+def test_cancel_task_flags_revokes_and_cannot_be_overwritten(db, redis, revoked):
+    service = AgentService()
+
+    assert service.cancel_task("agent-1", "task-1") == {"task_id": "task-1", "status": "cancelled", "cancelled": True}
+    assert redis.exists("task-cancel:task-1")
+    assert revoked == [["task-1"]]
+
+    # The result tracking thread reporting late does not undo the cancellation
+    assert service.update_task_status("task-1", TaskStatus.FAILED, error="revoked") is False
+    row = db.tables["agent_tasks"][0]
+    assert row["status"] == "cancelled"
+    assert row["completed_at"]
+
+    assert service.cancel_task("agent-1", "task-2")["cancelled"] is False
+    assert service.cancel_task("agent-2", "task-1") is None
+
+
+def test_cancel_endpoints(db, redis, revoked):
+    from app.main import app
+
+    async def scenario():
+        async with httpx.AsyncClient(app=app, base_url="http://test") as client:
+            batch = await client.delete("/api/v1/agents/agent-1/batches/batch-1")
+            finished = await client.delete("/api/v1/agents/agent-1/tasks/task-2")
+            missing = await client.delete("/api/v1/agents/agent-1/tasks/task-9")
+            progress = await client.get("/api/v1/agents/agent-1/batches/batch-1")
+            return batch, finished, missing, progress
+
+    batch, finished, missing, progress = asyncio.run(scenario())
+    assert batch.json() == {"batch_id": "batch-1", "cancelled": 2}
+    assert sorted(revoked[0]) == ["task-3", "task-4"]
+    assert finished.status_code == 409
+    assert missing.status_code == 404
+    assert progress.json()["counts"]["cancelled"] == 2
+    assert progress.json()["finished"] is True
+
+
+def test_cancellation_metrics_estimate_savings(monkeypatch):
+    monkeypatch.setattr(metrics, "_task_costs", {})
+    task_name = "tests.cancellable"
+    metrics._task_costs[task_name] = metrics.TaskCost()
+    metrics._task_costs[task_name].record(10.0, 1000)
+
+    def saved():
+        return (
+            REGISTRY.get_sample_value("pladder_cancel_saved_worker_seconds_total", {"task": task_name}) or 0.0,
+            REGISTRY.get_sample_value("pladder_cancel_saved_tokens_total", {"task": task_name}) or 0.0,
+        )
+
+    metrics.record_task_cancelled("celery-1", task_name, "queued")
+    assert saved() == (10.0, 1000.0)
+
+    monkeypatch.setitem(metrics._task_started, "celery-2", time.monotonic() - 4)
+    token = metrics._task_tokens.set({"tokens": 300})
+    try:
+        metrics.record_task_cancelled("celery-2", task_name, "running")
+    finally:
+        metrics._task_tokens.reset(token)
+    seconds, tokens = saved()
+    assert 15.5 < seconds < 16.1
+    assert tokens == 1700.0
+    assert REGISTRY.get_sample_value(
+        "pladder_tasks_cancelled_total", {"task": task_name, "stage": "running"}
+    ) == 1.0
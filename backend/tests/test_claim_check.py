@@ -0,0 +1,47 @@
+"""
+Unit tests for claim-check storage of large task payloads (local blob backend).
+"""
+
+import pytest
+
+from app.core import claim_check
+from app.core.config import settings
+
+
+@pytest.fixture(autouse=True)
+def file_backend(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "CLAIM_CHECK_BACKEND", "file")
+    monkeypatch.setattr(settings, "CLAIM_CHECK_DIR", str(tmp_path))
+    monkeypatch.setattr(settings, "CLAIM_CHECK_THRESHOLD", 1024)
+    claim_check._blob_cache.clear()
+
+
+def test_small_values_pass_through():
+    params = {"job_data": {"id": "job1"}, "top_k": 5}
+    assert claim_check.check_in_values(params) == params
+
+
+def test_large_value_round_trips_through_reference():
+    pool = [{"id": f"c{i}", "skills": ["Python", "SQL"]} for i in range(200)]
+    params = claim_check.check_in_values({"job_data": {"id": "job1"}, "candidate_pool": pool})
+
+    assert params["job_data"] == {"id": "job1"}
+    assert claim_check.is_reference(params["candidate_pool"])
+    assert len(str(params["candidate_pool"])) < 200
+
+    claim_check._blob_cache.clear()
+    assert claim_check.resolve(params["candidate_pool"]) == pool
+
+
+def test_identical_payloads_share_one_blob(tmp_path):
+    pool = [{"id": f"c{i}"} for i in range(200)]
+    first = claim_check.check_in(pool)
+    second = claim_check.check_in(list(pool))
+
+    assert first == second
+    assert len([path for path in tmp_path.rglob("*") if path.is_file()]) == 1
+
+
+def test_missing_blob_raises_key_error():
+    with pytest.raises(KeyError):
+        claim_check.resolve({claim_check.REFERENCE_KEY: "0" * 64, "size": 10})
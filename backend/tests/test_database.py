@@ -0,0 +1,61 @@
+"""
+Unit tests for the SQL task store used by the processor, matcher and search tasks.
+"""
+
+import pytest
+
+from app.core import database
+from app.core.config import settings
+from app.models.agent import Agent, AgentTaskModel
+from app.schemas.agent import AgentType, TaskStatus
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "DATABASE_URL", f"sqlite:///{tmp_path / 'tasks.db'}")
+    database.dispose_engine()
+    database.init_db()
+    with database.session_scope() as session:
+        session.add(Agent(id="agent-1", name="Processor", type=AgentType.PROCESSOR))
+        session.add(AgentTaskModel(id="task-1", agent_id="agent-1", action="process_application"))
+    yield
+    database.dispose_engine()
+
+
+def _task(task_id):
+    with database.session_scope() as session:
+        return session.get(AgentTaskModel, task_id)
+
+
+def test_update_task_status_sets_timestamps_in_one_statement(db):
+    assert database.update_task_status("task-1", TaskStatus.RUNNING)
+    task = _task("task-1")
+    assert task.status == TaskStatus.RUNNING
+    assert task.started_at is not None and task.completed_at is None
+
+    assert database.update_task_status("task-1", TaskStatus.COMPLETED, result={"score": 78})
+    task = _task("task-1")
+    assert task.status == TaskStatus.COMPLETED
+    assert task.result == {"score": 78}
+    assert task.completed_at is not None
+
+
+def test_update_task_status_reports_missing_task(db):
+    assert not database.update_task_status("missing", TaskStatus.RUNNING)
+
+
+def test_processor_task_records_result(db):
+    from app.agents.processor.tasks import process_application
+
+    result = process_application("task-1", application_data={"id": "app-1", "candidate_name": "Jane"})
+
+    task = _task("task-1")
+    assert task.status == TaskStatus.COMPLETED
+    assert task.result == result
+
+
+def test_processor_task_fails_for_unknown_task(db):
+    from app.agents.processor.tasks import process_application
+
+    with pytest.raises(ValueError):
+        process_application("missing", application_data={})
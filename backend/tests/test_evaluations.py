@@ -0,0 +1,135 @@
+"""
+Unit tests for structured candidate evaluations and their typed storage.
+"""
+
+import asyncio
+
+import httpx
+import pytest
+from agents import RunConfig
+
+from app.schemas.agent import TaskStatus
+from app.services.agent_service import AgentService, evaluation_rows
+from app.services.agents_sdk_service import AgentSDKService
+from benchmarks.fakes import FakeModelProvider
+
+
+def evaluation(score, recommendation):
+    return {
+        "overall_score": score,
+        "strengths": ["Python", "SQL", "APIs"],
+        "areas_for_improvement": ["Cloud", "Leadership"],
+        "recommendation": recommendation,
+        "justification": "Reasons.",
+    }
+
+
+@pytest.fixture
+def db(db):
+    for task_id in ("task-1", "task-2"):
+        db.table("agent_tasks").insert({"id": task_id, "agent_id": "agent-1", "status": "running"}).execute()
+    return db
+
+
+def test_recruiter_returns_a_structured_evaluation():
+    service = AgentSDKService(run_config=RunConfig(model_provider=FakeModelProvider(p50=0.001, p95=0.002)))
+    result = asyncio.run(service.process_candidate({"id": "c1", "name": "Ada"}, {"id": "j1"}))
+
+    assert result["evaluation"]["overall_score"] == 84
+    assert result["evaluation"]["recommendation"] == "Interview"
+    assert result["justification"] == result["evaluation"]["justification"]
+    # The full prose stays where callers of the free-text recruiter read it
+    assert result["assessment"].startswith("Overall assessment: 84/100.\n\nKey strengths:\n1. ")
+    assert "Recommendation: Interview." in result["assessment"]
+    assert result["assessment"].endswith(f"Justification: {result['justification']}")
+    assert (result["job_id"], result["candidate_id"]) == ("j1", "c1")
+
+
+def test_evaluation_rows_from_single_and_packed_results():
+    single = {"status": "completed", "result": {"job_id": "j1", "candidate_id": "c1", "evaluation": evaluation(120, "Interview")}}
+    packed = {"job_id": "j1", "evaluations": [
+        {"candidate_id": "c2", "evaluation": evaluation(70, "Consider")},
+        {"candidate_id": "c3", "error": "not scored"},
+    ]}
+
+    rows = evaluation_rows("task-1", single) + evaluation_rows("task-2", packed)
+    assert [(row["task_id"], row["candidate_id"], row["score"]) for row in rows] == [("task-1", "c1", 100), ("task-2", "c2", 70)]
+    assert rows[1]["recommendation"] == "Consider"
+    assert evaluation_rows("task-3", {"status": "completed", "result": {"assessment": "free text"}}) == []
+
+
+def test_evaluation_rows_from_job_matcher_tasks():
+    matches = {"job_id": "j1", "evaluations": [
+        {"candidate_id": "c1", **evaluation(88, "Interview")},
+        {"candidate_id": "c2", **evaluation(40, "Reject")},
+    ]}
+    envelope = {"status": "completed", "result": {"task_id": "task-1", "action": "match", "result": matches, "status": "completed"}}
+
+    rows = evaluation_rows("task-1", envelope)
+    assert [(row["job_id"], row["candidate_id"], row["recommendation"]) for row in rows] == [
+        ("j1", "c1", "Interview"), ("j1", "c2", "Reject")
+    ]
+    # A recruiter handoff evaluates no identified candidate, so there is nothing to store
+    unidentified = {"result": {"task_id": "task-1", "action": "assess", "result": evaluation(70, "Consider")}}
+    assert evaluation_rows("task-1", unidentified) == []
+
+
+def test_completion_stores_evaluations_once_and_queries_by_columns(db):
+    service = AgentService()
+    packed = {"result": {"job_id": "j1", "evaluations": [
+        {"candidate_id": f"c{i}", "evaluation": evaluation(score, recommendation)}
+        for i, (score, recommendation) in enumerate([(92, "Interview"), (78, "Interview"), (85, "Consider"), (88, "Interview")])
+    ]}}
+
+    assert service.update_task_status("task-1", TaskStatus.COMPLETED, result=packed)
+    # A late duplicate result leaves the finished task, and its evaluations, alone
+    assert not service.update_task_status("task-1", TaskStatus.COMPLETED, result=packed)
+    assert len(db.tables["candidate_evaluations"]) == 4
+
+    found = service.find_evaluations("j1", recommendation="Interview", min_score=80)
+    assert [row["candidate_id"] for row in found] == ["c0", "c3"]
+    assert len(service.find_evaluations("j2")) == 0
+
+
+def test_evaluations_endpoint(db):
+    from app.main import app
+
+    AgentService().update_task_status("task-2", TaskStatus.COMPLETED, result={"result": {
+        "job_id": "j1", "candidate_id": "c1", "evaluation": evaluation(91, "Interview"),
+    }})
+
+    async def scenario():
+        async with httpx.AsyncClient(app=app, base_url="http://test") as client:
+            found = await client.get("/api/v1/jobs/j1/evaluations", params={"recommendation": "Interview", "min_score": 80})
+            invalid = await client.get("/api/v1/jobs/j1/evaluations", params={"recommendation": "Maybe"})
+            return found, invalid
+
+    found, invalid = asyncio.run(scenario())
+    assert found.status_code == 200
+    assert [(e["candidate_id"], e["score"]) for e in found.json()["evaluations"]] == [("c1", 91)]
+    assert invalid.status_code == 422
+
+
+def test_completion_fails_when_its_evaluations_cannot_be_stored(db, monkeypatch):
+    service = AgentService()
+    result = {"result": {"job_id": "j1", "candidate_id": "c1", "evaluation": evaluation(91, "Interview")}}
+
+    def unavailable(rows):
+        raise ConnectionError("database unavailable")
+
+    monkeypatch.setattr(service, "record_evaluations", unavailable)
+    assert service.update_task_status("task-1", TaskStatus.COMPLETED, result=result)
+
+    task = db.tables["agent_tasks"][0]
+    assert task["status"] == TaskStatus.FAILED.value
+    assert task["result"] == result
+    assert "database unavailable" in task["error"]
+
+
+def test_result_arriving_after_cancellation_leaves_no_evaluations(db):
+    service = AgentService()
+    assert service.update_task_status("task-1", TaskStatus.CANCELLED)
+
+    result = {"result": {"job_id": "j1", "candidate_id": "c1", "evaluation": evaluation(91, "Interview")}}
+    assert not service.update_task_status("task-1", TaskStatus.COMPLETED, result=result)
+    assert db.tables["candidate_evaluations"] == []
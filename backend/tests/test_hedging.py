@@ -0,0 +1,61 @@
+"""
+Unit tests for deadlines and hedged calls used around Runner.run.
+"""
+
+import asyncio
+
+import pytest
+
+from app.core.deadlines import deadline_scope, remaining, timeout_for
+from app.core.hedging import LatencyWindow, RunStats, hedged_call
+
+
+def test_deadline_scope_only_tightens():
+    assert remaining() is None
+    with deadline_scope(10):
+        with deadline_scope(60):
+            assert remaining() <= 10
+        assert timeout_for(2) == 2
+        assert timeout_for(None) <= 10
+    assert remaining() is None
+
+
+def test_latency_window_percentile():
+    window = LatencyWindow(size=100)
+    for value in range(1, 101):
+        window.record(value / 100)
+    assert window.percentile(50) == pytest.approx(0.5, abs=0.01)
+    assert window.percentile(95) == pytest.approx(0.95, abs=0.01)
+
+
+def test_hedge_wins_and_loser_is_cancelled():
+    delays = [0.5, 0.01]
+    cancelled = []
+
+    async def call():
+        delay = delays.pop(0)
+        try:
+            await asyncio.sleep(delay)
+            return delay
+        except asyncio.CancelledError:
+            cancelled.append(delay)
+            raise
+
+    stats = RunStats()
+    result = asyncio.run(hedged_call(call, hedge_after=0.05, stats=stats))
+
+    assert result == 0.01
+    assert cancelled == [0.5]
+    assert stats.hedges == 1 and stats.hedge_wins == 1
+
+
+def test_no_hedge_when_primary_is_fast():
+    calls = []
+
+    async def call():
+        calls.append(1)
+        return "ok"
+
+    stats = RunStats()
+    assert asyncio.run(hedged_call(call, hedge_after=0.5, stats=stats)) == "ok"
+    assert len(calls) == 1 and stats.hedges == 0
@@ -0,0 +1,87 @@
+"""
+Unit tests for conditional GETs of agents and tasks.
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+
+AGENT = {
+    "id": "agent-1",
+    "name": "Recruiter",
+    "type": "recruiter",
+    "description": "",
+    "status": "active",
+    "parameters": {},
+    "created_at": "2026-01-01T00:00:00+00:00",
+    "updated_at": "2026-01-02T00:00:00+00:00",
+}
+TASK = {
+    "id": "task-1",
+    "agent_id": "agent-1",
+    "action": "process_candidate",
+    "status": "running",
+    "created_at": "2026-01-02T00:00:00+00:00",
+    "updated_at": "2026-01-02T00:00:01+00:00",
+}
+
+
+@pytest.fixture
+def db(db):
+    db.table("agents").insert(AGENT).execute()
+    db.table("agent_tasks").insert(TASK).execute()
+    return db
+
+
+@pytest.fixture
+def client(db):
+    from app.main import app
+    return TestClient(app)
+
+
+def test_agent_revalidates_with_etag_and_last_modified(client, db):
+    first = client.get("/api/v1/agents/agent-1")
+    assert first.status_code == 200
+    assert first.headers["Cache-Control"].startswith("private, max-age=")
+    assert first.headers["Last-Modified"] == "Fri, 02 Jan 2026 00:00:00 GMT"
+
+    assert client.get("/api/v1/agents/agent-1", headers={"If-None-Match": first.headers["ETag"]}).status_code == 304
+    assert client.get(
+        "/api/v1/agents/agent-1", headers={"If-Modified-Since": first.headers["Last-Modified"]}
+    ).status_code == 304
+
+    db.table("agents").update({"name": "Renamed", "updated_at": "2026-01-03T00:00:00+00:00"}).eq("id", "agent-1").execute()
+    changed = client.get("/api/v1/agents/agent-1", headers={"If-None-Match": first.headers["ETag"]})
+    assert changed.status_code == 200
+    assert changed.json()["name"] == "Renamed"
+    assert changed.headers["ETag"] != first.headers["ETag"]
+
+
+def test_listing_etag_changes_when_an_agent_is_added(client, db):
+    first = client.get("/api/v1/agents/")
+    assert client.get("/api/v1/agents/", headers={"If-None-Match": first.headers["ETag"]}).status_code == 304
+
+    db.table("agents").insert({**AGENT, "id": "agent-2"}).execute()
+    assert client.get("/api/v1/agents/", headers={"If-None-Match": first.headers["ETag"]}).status_code == 200
+
+
+def test_finished_task_is_immutable_and_revalidates_to_304(client, db):
+    running = client.get("/api/v1/agents/agent-1/tasks/task-1")
+    assert running.headers["Cache-Control"] == "private, no-cache"
+
+    db.table("agent_tasks").update({
+        "status": "completed",
+        "result": {"assessment": "x" * 10000},
+        "updated_at": "2026-01-02T00:05:00+00:00",
+    }).eq("id", "task-1").execute()
+    assert client.get(
+        "/api/v1/agents/agent-1/tasks/task-1", headers={"If-None-Match": running.headers["ETag"]}
+    ).status_code == 200
+
+    done = client.get("/api/v1/agents/agent-1/tasks/task-1")
+    assert "immutable" in done.headers["Cache-Control"]
+    assert "updated_at" not in done.json()
+
+    not_modified = client.get("/api/v1/agents/agent-1/tasks/task-1", headers={"If-None-Match": done.headers["ETag"]})
+    assert not_modified.status_code == 304
+    assert not_modified.content == b""
+    assert not_modified.headers["ETag"] == done.headers["ETag"]
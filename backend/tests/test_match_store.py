@@ -0,0 +1,232 @@
+"""
+Unit tests for the materialized top-K matches of open jobs.
+"""
+
+import asyncio
+
+import httpx
+import pytest
+
+from app.agents.matcher import match_store
+from app.agents.matcher.match_store import CandidateIndex, MatchStore, job_criteria, tasks_for_change
+from app.core.config import settings
+from app.agents.search.sharding import score_candidate
+from app.main import app
+
+
+class FakePipeline:
+    """Queues calls and returns their results on execute."""
+
+    def __init__(self, redis):
+        self.redis = redis
+        self.results = []
+
+    def __getattr__(self, name):
+        method = getattr(self.redis, name)
+        return lambda *args, **kwargs: self.results.append(method(*args, **kwargs))
+
+    def execute(self):
+        results, self.results = self.results, []
+        return results
+
+
+class FakeRedis:
+    """Hashes, sorted sets and strings in memory; script calls are recorded, not run."""
+
+    def __init__(self):
+        self.hashes = {}
+        self.zsets = {}
+        self.strings = {}
+        self.offers = []
+        self.stale_jobs = set()
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    def register_script(self, script):
+        def offer(keys, args, client=None):
+            self.offers.append((keys[0], args))
+            stale = int(keys[0][len(match_store.TOP_PREFIX):] in self.stale_jobs)
+            if client is not None:
+                client.results.append(stale)
+            return stale
+        return offer
+
+    def hset(self, key, field, value):
+        self.hashes.setdefault(key, {})[field] = value
+
+    def hdel(self, key, field):
+        self.hashes.get(key, {}).pop(field, None)
+
+    def hexists(self, key, field):
+        return field in self.hashes.get(key, {})
+
+    def hgetall(self, key):
+        return dict(self.hashes.get(key, {}))
+
+    def zadd(self, key, mapping):
+        self.zsets.setdefault(key, {}).update(mapping)
+
+    def zrevrange(self, key, start, end, withscores=False):
+        ranked = sorted(self.zsets.get(key, {}).items(), key=lambda item: item[1], reverse=True)
+        return ranked[start:end + 1]
+
+    def set(self, key, value):
+        self.strings[key] = value
+
+    def delete(self, *keys):
+        for key in keys:
+            self.zsets.pop(key, None)
+            self.strings.pop(key, None)
+
+
+def make_candidates(count):
+    return [
+        {"id": f"c{i:03d}", "skills": ["Python"] if i % 3 else ["Go"], "location": "Berlin", "years_experience": i % 8}
+        for i in range(count)
+    ]
+
+
+@pytest.fixture
+def redis():
+    return FakeRedis()
+
+
+def test_index_top_matches_scoring_each_candidate():
+    candidates = make_candidates(60)
+    criteria = {"skills": ["python"], "location": "berlin", "min_years_experience": 6}
+    expected = sorted(((score_candidate(c, criteria), c["id"]) for c in candidates), reverse=True)[:6]
+    assert CandidateIndex(candidates).top(criteria, 5) == expected
+
+
+def test_job_criteria_reads_required_skills():
+    job = {"id": "j1", "title": "Backend Engineer", "required_skills": ["Python"], "location": ""}
+    assert job_criteria(job) == {"title": "Backend Engineer", "skills": ["Python"]}
+
+
+def test_open_job_keeps_top_k_and_floor(redis):
+    index = CandidateIndex(make_candidates(30))
+    criteria = {"skills": ["python"], "min_years_experience": 7}
+    store = MatchStore(redis, k=3)
+    store.open_job("j1", criteria, index)
+
+    ranked = index.top(criteria, 3)
+    top = store.top_candidates("j1")
+    assert [(m["match_score"], m["candidate_id"]) for m in top] == ranked[:3]
+    assert redis.strings[match_store.FLOOR_PREFIX + "j1"] == ranked[3][0]
+    assert len(store.top_candidates("j1", limit=2)) == 2
+    assert store.top_candidates("unknown") is None
+
+    store.close_job("j1")
+    assert store.top_candidates("j1") is None
+
+
+def test_candidate_change_scores_open_jobs_only(redis):
+    index = CandidateIndex(make_candidates(10))
+    store = MatchStore(redis, k=3)
+    store.open_job("j1", {"skills": ["python"]}, index)
+    store.open_job("j2", {"skills": ["go"]}, index)
+
+    candidate = {"id": "new", "skills": ["Go"], "years_experience": 2}
+    assert store.upsert_candidate(candidate, index) == 2
+    assert "new" in index.features
+    assert sorted(redis.offers) == [
+        (match_store.TOP_PREFIX + "j1", [3, "new", 0.0]),
+        (match_store.TOP_PREFIX + "j2", [3, "new", score_candidate(candidate, {"skills": ["go"]})]),
+    ]
+
+
+def test_stale_job_is_rebuilt_from_a_fresh_index(redis):
+    candidates = make_candidates(10)
+    cached = CandidateIndex(candidates)
+    # Another worker indexed a strong candidate after this process cached its index
+    elsewhere = {"id": "elsewhere", "skills": ["Python"], "years_experience": 9}
+    database = [*candidates, elsewhere]
+    store = MatchStore(redis, k=3, reload_index=lambda: CandidateIndex(database))
+    criteria = {"skills": ["python"], "min_years_experience": 7}
+    store.open_job("j1", criteria, cached)
+    dropped = store.top_candidates("j1")[0]["candidate_id"]
+
+    # The script reports that removing a kept candidate may hide an evicted one;
+    # the database still lists the candidate, so the removal is applied to the reload
+    redis.stale_jobs.add("j1")
+    store.remove_candidate(dropped, cached)
+
+    ids = [m["candidate_id"] for m in store.top_candidates("j1")]
+    assert dropped not in ids
+    assert ids[0] == "elsewhere"
+    expected = CandidateIndex([c for c in database if c["id"] != dropped]).top(criteria, 3)[:3]
+    assert [(m["match_score"], m["candidate_id"]) for m in store.top_candidates("j1")] == expected
+
+
+def test_matches_endpoint(redis, monkeypatch):
+    monkeypatch.setattr("app.core.redis_client.get_redis", lambda: redis)
+    MatchStore(redis, k=3).open_job("j1", {"skills": ["python"]}, CandidateIndex(make_candidates(5)))
+
+    async def scenario():
+        async with httpx.AsyncClient(app=app, base_url="http://test") as client:
+            found = await client.get("/api/v1/jobs/j1/matches", params={"limit": 2})
+            missing = await client.get("/api/v1/jobs/j2/matches")
+            return found, missing
+
+    found, missing = asyncio.run(scenario())
+
+    assert found.status_code == 200
+    assert len(found.json()["matches"]) == 2
+    assert missing.status_code == 404
+
+
+def test_match_task_answers_open_jobs_from_the_store(redis, monkeypatch):
+    from app.agents.matcher import tasks
+
+    monkeypatch.setattr("app.core.redis_client.get_redis", lambda: redis)
+    updates = []
+    monkeypatch.setattr(tasks, "update_task_status", lambda task_id, status, **kwargs: updates.append(status) or True)
+    # Reporting a stored ranking must not load the whole candidate index
+    monkeypatch.setattr(match_store, "load_candidate_index", pytest.fail)
+    MatchStore(redis, k=3).open_job("j1", {"skills": ["python"]}, CandidateIndex(make_candidates(5)))
+
+    result = tasks.match_candidates("task-1", job_data={"id": "j1", "title": "Backend Engineer"}, limit=2)
+
+    assert result["source"] == "match_store"
+    assert len(result["matches"]) == 2
+    assert "total_candidates_considered" not in result
+    assert updates[-1] == "completed"
+
+
+def test_table_changes_map_to_match_store_tasks():
+    candidate = {"id": "c1", "name": "Ada", "skills": ["Python"], "resume_pdf": "x" * 10000}
+    assert tasks_for_change("candidates", "INSERT", candidate) == [
+        ("app.agents.matcher.tasks.index_candidate", [{"id": "c1", "skills": ["Python"]}])
+    ]
+    assert tasks_for_change("candidates", "DELETE", None, {"id": "c1"}) == [("app.agents.matcher.tasks.remove_candidate", ["c1"])]
+
+    job = {"id": 7, "title": "Backend Engineer", "required_skills": ["Python"], "status": "open", "description": "..."}
+    assert tasks_for_change("jobs", "UPDATE", job) == [
+        ("app.agents.matcher.tasks.open_job", [{"id": 7, "required_skills": ["Python"], "title": "Backend Engineer"}])
+    ]
+    assert tasks_for_change("jobs", "UPDATE", {**job, "status": "Filled"}) == [("app.agents.matcher.tasks.close_job", ["7"])]
+    assert tasks_for_change("jobs", "DELETE", None, job) == [("app.agents.matcher.tasks.close_job", ["7"])]
+    assert tasks_for_change("agent_tasks", "INSERT", {"id": "t1"}) == []
+
+
+def test_match_store_webhook_queues_tasks(monkeypatch):
+    from app.worker import celery_app
+
+    sent = []
+    monkeypatch.setattr(celery_app, "send_task", lambda name, args=None, **options: sent.append((name, args)))
+    monkeypatch.setattr(settings, "MATCH_WEBHOOK_SECRET", "hook-secret")
+    change = {"type": "DELETE", "table": "candidates", "record": None, "old_record": {"id": "c1"}}
+
+    async def scenario():
+        async with httpx.AsyncClient(app=app, base_url="http://test") as client:
+            url = "/api/v1/webhooks/match-store"
+            accepted = await client.post(url, json=change, headers={"X-Webhook-Secret": "hook-secret"})
+            rejected = await client.post(url, json=change, headers={"X-Webhook-Secret": "wrong"})
+            return accepted, rejected
+
+    accepted, rejected = asyncio.run(scenario())
+    assert accepted.status_code == 202
+    assert accepted.json() == {"queued": ["app.agents.matcher.tasks.remove_candidate"]}
+    assert rejected.status_code == 401
+    assert sent == [("app.agents.matcher.tasks.remove_candidate", ["c1"])]
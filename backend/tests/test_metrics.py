@@ -0,0 +1,150 @@
+"""
+Unit tests for the Prometheus metrics: request labels, Celery task timings, agent runs and queue depth.
+"""
+
+import asyncio
+import time
+from types import SimpleNamespace
+
+import httpx
+import pytest
+from prometheus_client import REGISTRY
+
+from app.core import metrics, redis_client
+
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+class FakeRedis:
+    """List lengths through a pipeline, as QueueDepthCollector reads them."""
+
+    def __init__(self, lengths):
+        self.lengths = lengths
+
+    def pipeline(self, transaction=True):
+        redis = self
+
+        class Pipeline:
+            def __init__(self):
+                self.queued = []
+
+            def llen(self, key):
+                self.queued.append(redis.lengths.get(key, 0))
+
+            def execute(self):
+                return self.queued
+
+        return Pipeline()
+
+
+@pytest.fixture
+def task():
+    return SimpleNamespace(name="app.worker.tasks.process_task", request={})
+
+
+@pytest.fixture(autouse=True)
+def no_task_running():
+    yield
+    metrics._task_tokens.set(None)
+
+
+def test_requests_are_labelled_by_route_template(db):
+    from app.main import app
+
+    route = "/api/v1/jobs/{job_id}/evaluations"
+    before = sample("pladder_http_request_duration_seconds_count", method="GET", route=route, status="2xx")
+    unmatched = sample("pladder_http_request_duration_seconds_count", method="GET", route="unmatched", status="4xx")
+
+    async def scenario():
+        async with httpx.AsyncClient(app=app, base_url="http://test") as client:
+            for job_id in ("j1", "j2"):
+                assert (await client.get(f"/api/v1/jobs/{job_id}/evaluations")).status_code == 200
+            assert (await client.get("/api/v1/no-such-route")).status_code == 404
+
+    asyncio.run(scenario())
+    assert sample("pladder_http_request_duration_seconds_count", method="GET", route=route, status="2xx") == before + 2
+    assert sample("pladder_http_request_duration_seconds_count", method="GET", route="/api/v1/jobs/j1/evaluations", status="2xx") == 0
+    assert sample("pladder_http_request_duration_seconds_count", method="GET", route="unmatched", status="4xx") == unmatched + 1
+
+
+def test_publish_stamps_the_enqueue_time():
+    headers = {}
+    metrics.on_task_publish(headers=headers)
+    assert time.time() - headers["enqueued_at"] < 1
+
+    # A retried message keeps the time it was first enqueued
+    metrics.on_task_publish(headers={"enqueued_at": 1.0})
+    metrics.on_task_publish(headers=None)
+
+
+def test_prerun_observes_queue_wait(task):
+    before = sample("pladder_celery_task_queue_wait_seconds_count", task=task.name)
+    before_sum = sample("pladder_celery_task_queue_wait_seconds_sum", task=task.name)
+
+    task.request["enqueued_at"] = time.time() - 5
+    metrics.on_task_prerun(task_id="t-wait", task=task)
+    metrics.on_task_postrun(task_id="t-wait", task=task, state="SUCCESS")
+
+    assert sample("pladder_celery_task_queue_wait_seconds_count", task=task.name) == before + 1
+    assert 5 <= sample("pladder_celery_task_queue_wait_seconds_sum", task=task.name) - before_sum < 6
+
+    # Messages published without the header are not observed
+    metrics.on_task_prerun(task_id="t-unstamped", task=SimpleNamespace(name=task.name, request={}))
+    metrics.on_task_postrun(task_id="t-unstamped", task=task, state="SUCCESS")
+    assert sample("pladder_celery_task_queue_wait_seconds_count", task=task.name) == before + 1
+
+
+def test_postrun_observes_runtime_and_task_tokens(task):
+    runtime = sample("pladder_celery_task_runtime_seconds_count", task=task.name, state="SUCCESS")
+    failures = sample("pladder_celery_task_runtime_seconds_count", task=task.name, state="FAILURE")
+    tokens = {kind: sample("pladder_task_tokens_total", task=task.name, kind=kind) for kind in metrics.TOKEN_KINDS}
+
+    metrics.on_task_prerun(task_id="t-ok", task=task)
+    metrics.record_agent_run("Recruiter", 1.0, input_tokens=300, output_tokens=50)
+    metrics.record_cached_input_tokens("Recruiter", 200)
+    assert metrics.task_usage() == {"input_tokens": 300, "cached_input_tokens": 200, "output_tokens": 50}
+    metrics.on_task_postrun(task_id="t-ok", task=task, state="SUCCESS")
+
+    assert metrics.task_usage() is None
+    assert sample("pladder_celery_task_runtime_seconds_count", task=task.name, state="SUCCESS") == runtime + 1
+    assert sample("pladder_task_tokens_total", task=task.name, kind="input_tokens") == tokens["input_tokens"] + 300
+    assert sample("pladder_task_tokens_total", task=task.name, kind="cached_input_tokens") == tokens["cached_input_tokens"] + 200
+    assert sample("pladder_task_tokens_total", task=task.name, kind="output_tokens") == tokens["output_tokens"] + 50
+
+    # Failed runs are timed under their state, but their tokens are not counted per task
+    metrics.on_task_prerun(task_id="t-failed", task=task)
+    metrics.record_agent_run("Recruiter", 1.0, input_tokens=100, output_tokens=10)
+    metrics.on_task_postrun(task_id="t-failed", task=task, state="FAILURE")
+    assert sample("pladder_celery_task_runtime_seconds_count", task=task.name, state="FAILURE") == failures + 1
+    assert sample("pladder_task_tokens_total", task=task.name, kind="input_tokens") == tokens["input_tokens"] + 300
+
+
+def test_record_agent_run_outside_a_task():
+    runs = sample("pladder_agent_run_duration_seconds_count", agent="Matcher")
+    seconds = sample("pladder_agent_run_duration_seconds_sum", agent="Matcher")
+    input_tokens = sample("pladder_agent_tokens_total", agent="Matcher", kind="input")
+    output_tokens = sample("pladder_agent_tokens_total", agent="Matcher", kind="output")
+
+    metrics.record_agent_run("Matcher", 2.5, input_tokens=1200, output_tokens=0)
+
+    assert metrics.task_usage() is None
+    assert sample("pladder_agent_run_duration_seconds_count", agent="Matcher") == runs + 1
+    assert sample("pladder_agent_run_duration_seconds_sum", agent="Matcher") == pytest.approx(seconds + 2.5)
+    assert sample("pladder_agent_tokens_total", agent="Matcher", kind="input") == input_tokens + 1200
+    assert sample("pladder_agent_tokens_total", agent="Matcher", kind="output") == output_tokens
+
+
+def test_queue_depth_is_read_from_redis_when_collected(monkeypatch):
+    redis = FakeRedis({"celery": 7, "search-shard-0": 2})
+    monkeypatch.setattr(redis_client, "get_redis", lambda: redis)
+
+    collector = metrics.QueueDepthCollector(["celery", "search-shard-0", "search-shard-1"])
+    [gauge] = list(collector.collect())
+    assert {s.labels["queue"]: s.value for s in gauge.samples} == {"celery": 7, "search-shard-0": 2, "search-shard-1": 0}
+
+    # The scrape still answers, without depths, when Redis is down
+    redis.lengths = None
+    [gauge] = list(collector.collect())
+    assert gauge.samples == []
@@ -0,0 +1,67 @@
+"""
+Unit tests for the pooled OpenAI clients: one per event loop, and the SDK default resolving to it.
+"""
+
+import asyncio
+
+import pytest
+from agents.models import _openai_shared
+from agents.tracing.processors import default_exporter
+
+from app.core import openai_client
+
+
+@pytest.fixture(autouse=True)
+def api_key(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    # Installing a default client also sets the key traces are exported with
+    monkeypatch.setattr(_openai_shared, "_default_openai_client", _openai_shared.get_default_openai_client())
+    monkeypatch.setattr(default_exporter(), "api_key", default_exporter().api_key)
+
+
+async def current_client():
+    return openai_client.get_openai_client()
+
+
+def test_each_loop_gets_its_own_client():
+    first, second = asyncio.new_event_loop(), asyncio.new_event_loop()
+    try:
+        client = first.run_until_complete(current_client())
+        assert first.run_until_complete(current_client()) is client
+        assert openai_client.get_openai_client(first) is client
+        assert second.run_until_complete(current_client()) is not client
+
+        # Closing on one loop leaves the other loop's pool open
+        first.run_until_complete(openai_client.close_openai_client())
+        assert client.is_closed()
+        assert not openai_client.get_openai_client(second).is_closed()
+        assert first.run_until_complete(current_client()) is not client
+    finally:
+        for loop in (first, second):
+            loop.run_until_complete(openai_client.close_openai_client())
+            loop.close()
+
+
+def test_sdk_default_client_is_the_running_loops_client():
+    installed = openai_client.install_default_openai_client()
+    assert _openai_shared.get_default_openai_client() is installed
+    assert installed.api_key == "sk-test"
+
+    async def pools():
+        # What the SDK's models reach through the default client
+        return installed._client, openai_client.get_openai_client()._client
+
+    first, second = asyncio.new_event_loop(), asyncio.new_event_loop()
+    try:
+        used, own = first.run_until_complete(pools())
+        assert used is own
+        assert second.run_until_complete(pools())[0] is not used
+    finally:
+        for loop in (first, second):
+            loop.run_until_complete(openai_client.close_openai_client())
+            loop.close()
+
+
+def test_no_client_outside_a_loop():
+    with pytest.raises(RuntimeError):
+        openai_client.get_openai_client()
@@ -0,0 +1,114 @@
+"""
+Unit tests for packed multi-candidate screening.
+"""
+
+import asyncio
+import json
+
+from agents import ModelProvider, RunConfig, Usage
+from agents.items import ModelResponse
+from agents.models.interface import Model
+from openai.types.responses import ResponseOutputMessage, ResponseOutputText
+
+from app.core.config import settings
+from app.services.agents_sdk_service import AgentSDKService, TokenEstimator, compact_profile, plan_packs
+
+
+class ScreeningModel(Model):
+    """Scores every candidate in its input, except those it is told to skip in packed calls."""
+
+    def __init__(self, skip=()):
+        self.skip = set(skip)
+        self.packs = []
+
+    async def get_response(self, system_instructions, input, model_settings, tools, output_schema, handoffs, tracing):
+        text = input if isinstance(input, str) else input[-1]["content"]
+        candidates = json.loads(text.split("Candidates:\n", 1)[1])
+        self.packs.append([candidate["id"] for candidate in candidates])
+        evaluations = [
+            {
+                "candidate_id": candidate["id"],
+                "overall_score": 80,
+                "strengths": ["Python", "SQL", "APIs"],
+                "areas_for_improvement": ["Cloud", "Leadership"],
+                "recommendation": "Interview",
+                "justification": "Strong backend background.",
+            }
+            for candidate in candidates
+            if len(candidates) == 1 or candidate["id"] not in self.skip
+        ]
+        message = ResponseOutputMessage(
+            id="msg_fake",
+            type="message",
+            role="assistant",
+            status="completed",
+            content=[ResponseOutputText(type="output_text", text=json.dumps({"evaluations": evaluations}), annotations=[])],
+        )
+        usage = Usage(requests=1, input_tokens=len(text) // 4, output_tokens=100 * len(evaluations), total_tokens=0)
+        return ModelResponse(output=[message], usage=usage, referenceable_id=None)
+
+    def stream_response(self, *args, **kwargs):
+        raise NotImplementedError
+
+
+class Provider(ModelProvider):
+    def __init__(self, model):
+        self.model = model
+
+    def get_model(self, model_name):
+        return self.model
+
+
+def make_candidates(count):
+    return [
+        {"id": f"c{i}", "name": f"Candidate {i}", "skills": ["Python", "SQL"], "years_experience": i, "resume_pdf": "x" * 5000}
+        for i in range(count)
+    ]
+
+
+def test_compact_profile_keeps_screening_fields():
+    profile = compact_profile({"id": 7, "name": "Ada", "summary": "s" * 5000, "photo": "...", "skills": []})
+    assert profile == {"name": "Ada", "summary": "s" * settings.SCREENING_PROFILE_MAX_CHARS + "..."}
+
+
+def test_plan_packs_respects_size_and_token_budget(monkeypatch):
+    monkeypatch.setattr(settings, "SCREENING_PACK_MAX_CANDIDATES", 4)
+    profiles = [compact_profile(candidate) for candidate in make_candidates(10)]
+    assert [len(pack) for pack in plan_packs(profiles, TokenEstimator())] == [4, 4, 2]
+
+    # A tight budget shrinks the packs; a profile larger than the budget travels alone
+    monkeypatch.setattr(settings, "SCREENING_PACK_INPUT_TOKENS", 50)
+    assert [len(pack) for pack in plan_packs(profiles, TokenEstimator())] == [2, 2, 2, 2, 2]
+    monkeypatch.setattr(settings, "SCREENING_PACK_INPUT_TOKENS", 1)
+    assert [len(pack) for pack in plan_packs(profiles, TokenEstimator())] == [1] * 10
+
+
+def test_screening_packs_candidates_and_retries_skipped_ones(monkeypatch):
+    monkeypatch.setattr(settings, "SCREENING_PACK_MAX_CANDIDATES", 5)
+    # The model sees candidates by input position
+    model = ScreeningModel(skip={"3"})
+    service = AgentSDKService(run_config=RunConfig(model_provider=Provider(model)))
+
+    result = asyncio.run(service.screen_candidates(make_candidates(10), {"id": "j1", "title": "Backend Engineer"}))
+
+    assert sorted(map(sorted, model.packs)) == [
+        ["0", "1", "2", "3", "4"], ["3"], ["5", "6", "7", "8", "9"]
+    ]
+    assert [entry["candidate_id"] for entry in result["evaluations"]] == [f"c{i}" for i in range(10)]
+    assert all(entry["evaluation"]["recommendation"] == "Interview" for entry in result["evaluations"])
+    assert result["stats"]["calls"] == 3
+    assert result["stats"]["fallbacks"] == 1
+
+
+def test_candidates_without_unique_ids_get_their_own_evaluations():
+    model = ScreeningModel()
+    service = AgentSDKService(run_config=RunConfig(model_provider=Provider(model)))
+    candidates = [{"name": "No ID"}, {"id": "dup", "name": "First"}, {"id": "dup", "name": "Second"}, {"name": "Also no ID"}]
+
+    result = asyncio.run(service.screen_candidates(candidates, {"id": "j1"}))
+
+    assert model.packs == [["0", "1", "2", "3"]]
+    assert [(entry["candidate_id"], entry["name"]) for entry in result["evaluations"]] == [
+        (None, "No ID"), ("dup", "First"), ("dup", "Second"), (None, "Also no ID")
+    ]
+    assert all("evaluation" in entry for entry in result["evaluations"])
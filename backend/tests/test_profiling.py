@@ -0,0 +1,115 @@
+"""
+Unit tests for on-demand request and task profiling.
+"""
+
+import os
+import time
+import tracemalloc
+from types import SimpleNamespace
+
+import pytest
+
+from app.core import profiling
+from app.core.config import settings
+
+
+@pytest.fixture(autouse=True)
+def profile_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "PROFILING_DIR", str(tmp_path))
+    monkeypatch.setattr(settings, "PROFILING_INTERVAL", 0.001)
+    monkeypatch.setattr(settings, "PROFILING_TOKEN", "secret")
+    return tmp_path
+
+
+def busy_work(seconds):
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        sum(range(100))
+
+
+def test_cpu_profile_writes_collapsed_stacks():
+    with profiling.profile("GET /api/v1/agents", "cpu") as paths:
+        busy_work(0.1)
+
+    lines = open(paths["cpu"]).read().splitlines()
+    assert lines
+    stack, count = lines[0].rsplit(" ", 1)
+    assert "busy_work" in stack and int(count) > 0
+    assert set(paths) == {"cpu"}
+
+
+@pytest.fixture
+def memory_tracing(monkeypatch):
+    monkeypatch.setattr(profiling, "_last_snapshot", None)
+    yield
+    tracemalloc.stop()
+
+
+def leak_between_profiles():
+    return [bytearray(1024) for _ in range(3000)]
+
+
+def test_memory_profile_reports_allocation_growth(memory_tracing):
+    with profiling.profile("leaky", "memory") as paths:
+        retained = [bytearray(1024) for _ in range(2000)]
+
+    assert os.path.exists(paths["snapshot"])
+    report = open(paths["memory"]).read()
+    assert "test_profiling.py" in report
+    assert retained
+
+
+def test_memory_profiles_stop_tracing_by_default(memory_tracing):
+    with profiling.profile("first", "memory"):
+        pass
+    assert not tracemalloc.is_tracing()
+
+    with profiling.profile("second", "memory") as paths:
+        pass
+    assert "since the previous memory profile" not in open(paths["memory"]).read()
+
+
+def test_growth_between_memory_profiles_is_traced_when_continuous(memory_tracing, monkeypatch):
+    monkeypatch.setattr(settings, "PROFILING_TRACEMALLOC_CONTINUOUS", True)
+    with profiling.profile("first", "memory"):
+        pass
+    assert tracemalloc.is_tracing()
+
+    leaked = leak_between_profiles()
+    with profiling.profile("second", "memory") as paths:
+        pass
+
+    report = open(paths["memory"]).read()
+    since_previous = report.split("since the previous memory profile", 1)[1].split("# Largest live", 1)[0]
+    leak_line = leak_between_profiles.__code__.co_firstlineno + 1
+    assert f"test_profiling.py:{leak_line}:" in since_previous
+    assert leaked
+
+
+def test_requested_mode_requires_matching_token(monkeypatch):
+    assert profiling.requested_mode("secret", None) == "cpu"
+    assert profiling.requested_mode("secret", "memory") == "memory"
+    assert profiling.requested_mode("wrong", "cpu") is None
+
+    monkeypatch.setattr(settings, "PROFILING_TOKEN", "")
+    assert profiling.requested_mode("", "cpu") is None
+
+
+def test_task_kwarg_is_stripped_and_profiles_the_task(profile_dir):
+    task = SimpleNamespace(name="app.agents.celery_tasks.process_candidate")
+    kwargs = {"candidate_data": {}, profiling.TASK_PROFILE_KWARG: "cpu"}
+
+    profiling.on_task_prerun(task_id="task-1", task=task, kwargs=kwargs)
+    assert profiling.TASK_PROFILE_KWARG not in kwargs
+    busy_work(0.02)
+    profiling.on_task_postrun(task_id="task-1")
+
+    assert [path.suffix for path in profile_dir.iterdir()] == [".folded"]
+
+
+def test_unprofiled_tasks_are_untouched(profile_dir):
+    kwargs = {"candidate_data": {}}
+    profiling.on_task_prerun(task_id="task-2", task=None, kwargs=kwargs)
+    profiling.on_task_postrun(task_id="task-2")
+    assert kwargs == {"candidate_data": {}}
+    assert list(profile_dir.iterdir()) == []
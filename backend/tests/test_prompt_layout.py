@@ -0,0 +1,88 @@
+"""
+Unit tests for cache-friendly prompt layout and cached-token accounting.
+"""
+
+import asyncio
+import os
+from types import SimpleNamespace
+
+from agents import agent_span, set_trace_processors, set_tracing_disabled, trace
+from agents.tracing import response_span
+from agents.tracing.processors import default_processor
+
+from app.core import metrics
+from app.core.agent_tracing import PromptCacheUsageProcessor
+from app.services.agents_sdk_service import AgentSDKService, CandidateEvaluation
+
+EVALUATION = CandidateEvaluation(
+    overall_score=80,
+    strengths=["Python", "SQL", "APIs"],
+    areas_for_improvement=["Cloud", "Leadership"],
+    recommendation="Interview",
+    justification="Strong backend background.",
+)
+
+
+def captured_prompts(service):
+    prompts = []
+
+    async def run(agent, query):
+        prompts.append(query)
+        return SimpleNamespace(final_output=EVALUATION)
+
+    service._run = run
+    return prompts
+
+
+def test_candidate_prompts_share_the_job_prefix():
+    service = AgentSDKService()
+    prompts = captured_prompts(service)
+    job = {"id": "j1", "title": "Backend Engineer", "description": "Build APIs " * 200}
+    same_job_reordered = dict(reversed(list(job.items())))
+
+    async def screen():
+        await service.process_candidate({"id": "c1", "name": "Ada"}, job)
+        await service.process_candidate({"id": "c2", "name": "Grace"}, same_job_reordered)
+
+    asyncio.run(screen())
+    first, second = prompts
+    shared = len(os.path.commonprefix([first, second]))
+    assert first.index("Candidate:") < shared
+    assert first.index("Job:") < first.index("Candidate:")
+    assert first.endswith('Candidate:\n{"id": "c1", "name": "Ada"}')
+
+
+def test_task_prompt_puts_the_task_id_last():
+    service = AgentSDKService()
+    prompts = captured_prompts(service)
+    asyncio.run(service.process_task("task-1", "screen", {"job_id": "j1"}))
+    assert prompts[0].rstrip().endswith("Task ID:\ntask-1")
+
+
+def model_call(cached_tokens=None):
+    """Emit the response span the SDK's Responses model emits for one call."""
+    details = None if cached_tokens is None else SimpleNamespace(cached_tokens=cached_tokens)
+    with response_span() as span:
+        span.span_data.response = SimpleNamespace(usage=SimpleNamespace(input_tokens=1200, input_tokens_details=details))
+
+
+def test_cached_tokens_are_recorded_per_task():
+    set_tracing_disabled(False)
+    set_trace_processors([PromptCacheUsageProcessor()])
+    cached = metrics.AGENT_TOKENS.labels("AI Recruiter", "cached_input")
+    before = cached._value.get()
+
+    assert metrics.task_usage() is None
+    metrics.on_task_prerun(task_id="t1")
+    try:
+        with trace("process_candidate"):
+            with agent_span(name="AI Recruiter"):
+                model_call(cached_tokens=1024)
+                model_call()
+        metrics.record_agent_run("AI Recruiter", 1.0, 2400, 600)
+        assert metrics.task_usage() == {"input_tokens": 2400, "cached_input_tokens": 1024, "output_tokens": 600}
+    finally:
+        metrics.on_task_postrun(task_id="t1")
+        set_trace_processors([default_processor()])
+    assert metrics.task_usage() is None
+    assert cached._value.get() - before == 1024
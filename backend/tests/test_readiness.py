@@ -0,0 +1,71 @@
+"""
+Unit tests for the cached dependency probes behind /ready.
+"""
+
+import asyncio
+import time
+
+from app.core import readiness
+
+
+def failing():
+    raise ConnectionError("connection refused")
+
+
+def hanging():
+    time.sleep(0.5)
+
+
+def monitor(*probes, stale_after=60):
+    return readiness.ReadinessMonitor(list(probes), interval=0.01, timeout=0.1, stale_after=stale_after)
+
+
+def test_not_ready_until_probed():
+    status = monitor(readiness.DependencyProbe("redis_broker", lambda: None)).status()
+    assert not status["ready"]
+    assert status["checks"]["redis_broker"]["error"] == "not checked yet"
+
+
+def test_failing_critical_probe_makes_replica_unready():
+    ok = readiness.DependencyProbe("redis_broker", lambda: None)
+    down = readiness.DependencyProbe("supabase", failing)
+    asyncio.run(ok.run(0.1))
+    asyncio.run(down.run(0.1))
+
+    status = monitor(ok, down).status()
+    assert not status["ready"]
+    assert status["checks"]["redis_broker"]["ok"]
+    assert status["checks"]["supabase"]["error"] == "connection refused"
+
+    down.critical = False
+    assert monitor(ok, down).status()["ready"]
+
+
+def test_hanging_probe_times_out():
+    probe = readiness.DependencyProbe("model_provider", hanging)
+    asyncio.run(probe.run(0.05))
+    assert probe.result["error"].startswith("timed out")
+
+
+def test_stale_results_count_as_failing():
+    probe = readiness.DependencyProbe("supabase", lambda: None)
+    asyncio.run(probe.run(0.1))
+    probe.checked_at -= 10
+    status = monitor(probe, stale_after=5).status()
+    assert not status["ready"]
+    assert status["checks"]["supabase"]["error"] == "result is stale"
+
+
+def test_background_loop_refreshes_results():
+    calls = []
+    probe = readiness.DependencyProbe("redis_broker", lambda: calls.append(1))
+
+    async def scenario():
+        checks = monitor(probe)
+        checks.start()
+        await asyncio.sleep(0.1)
+        await checks.stop()
+
+    asyncio.run(scenario())
+    assert len(calls) >= 2
+    assert probe.result["ok"]
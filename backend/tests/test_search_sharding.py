@@ -0,0 +1,152 @@
+"""
+Unit tests for candidate sharding and top-K merging in scatter-gather search.
+"""
+
+import time
+
+import pytest
+from celery.exceptions import Retry
+
+from app.agents.search import sharding, tasks
+from app.agents.search.sharding import TopK, merge_top_k, score_candidate, shard_for, shard_key, shard_range
+from app.core.config import settings
+
+
+def make_candidates(count):
+    return [
+        {"id": f"c{i:04d}", "skills": ["Python"] if i % 2 else ["Java"], "years_experience": i % 10}
+        for i in range(count)
+    ]
+
+
+def test_shard_for_is_stable_and_covers_all_shards():
+    ids = [f"c{i:04d}" for i in range(1000)]
+    shards = [shard_for(candidate_id, 4) for candidate_id in ids]
+    assert shards == [shard_for(candidate_id, 4) for candidate_id in ids]
+    assert set(shards) == {0, 1, 2, 3}
+
+
+def test_score_candidate_prefers_matching_skills():
+    criteria = {"skills": ["python", "django"], "min_years_experience": 5}
+    strong = {"skills": ["Python", "Django"], "years_experience": 6}
+    weak = {"skills": ["Java"], "years_experience": 1}
+    assert score_candidate(strong, criteria) > score_candidate(weak, criteria)
+    assert score_candidate(strong, {}) == 0.0
+
+
+def test_merge_of_shard_top_k_equals_global_top_k():
+    criteria = {"skills": ["python"], "min_years_experience": 9}
+    candidates = make_candidates(400)
+
+    shard_results = []
+    for shard_index in range(4):
+        best = TopK(5)
+        for candidate in candidates:
+            if shard_for(candidate["id"], 4) == shard_index:
+                best.push(score_candidate(candidate, criteria), candidate)
+        shard_results.append({"shard": shard_index, "candidates": best.results()})
+
+    overall = TopK(5)
+    for candidate in candidates:
+        overall.push(score_candidate(candidate, criteria), candidate)
+
+    assert merge_top_k(shard_results, 5) == overall.results()
+
+
+def test_shard_ranges_partition_the_key_space():
+    for shard_count in (1, 3, 4, 7):
+        ranges = [shard_range(shard_index, shard_count) for shard_index in range(shard_count)]
+        assert ranges[0][0] == 0 and ranges[-1][1] == sharding.SHARD_KEY_SPACE
+        assert all(ranges[i][1] == ranges[i + 1][0] for i in range(shard_count - 1))
+        for candidate_id in ("c0001", "c0002", "c0420"):
+            low, high = ranges[shard_for(candidate_id, shard_count)]
+            assert low <= shard_key(candidate_id) < high
+
+
+def test_load_shard_reads_only_its_own_rows(db, monkeypatch):
+    # The database fills shard_key as a generated column
+    for candidate in make_candidates(200):
+        db.table("candidates").insert({**candidate, "shard_key": shard_key(candidate["id"])}).execute()
+    monkeypatch.setattr(sharding, "_shard_cache", {})
+
+    shards = [sharding.load_shard(shard_index, 4) for shard_index in range(4)]
+
+    assert sum(len(shard) for shard in shards) == 200
+    for shard_index, shard in enumerate(shards):
+        assert shard and all(shard_for(row["id"], 4) == shard_index for row in shard)
+
+
+class FakeShardResult:
+    def __init__(self, shard_id, result=None):
+        self.id = shard_id
+        self.result = result
+
+    def ready(self):
+        return self.result is not None
+
+    def successful(self):
+        return self.result is not None
+
+
+@pytest.fixture
+def task_updates(monkeypatch):
+    updates = []
+
+    def update_task_status(task_id, status, **fields):
+        updates.append((task_id, status, fields))
+        return True
+
+    monkeypatch.setattr(tasks, "update_task_status", update_task_status)
+    return updates
+
+
+def test_shards_expire_unless_taken_in_time(monkeypatch):
+    monkeypatch.setattr(settings, "SEARCH_SHARD_QUEUES", True)
+    signature = tasks._shard_signature(2, 4, {"skills": ["Python"]}, 5)
+
+    assert signature.options["expires"] == settings.SEARCH_SHARD_EXPIRES
+    assert signature.options["queue"] == "search-shard-2"
+
+
+def test_merge_waits_for_shards_until_the_deadline(monkeypatch, task_updates):
+    from app.worker import celery_app
+
+    returned = {"shard": 0, "scanned": 3, "partial": False, "error": None, "candidates": [{"id": "c1", "score": 0.9}]}
+    shards = {"s0": FakeShardResult("s0", returned), "s1": FakeShardResult("s1")}
+    revoked = []
+    monkeypatch.setattr(celery_app, "AsyncResult", lambda shard_id: shards[shard_id])
+    monkeypatch.setattr(celery_app.control, "revoke", revoked.append)
+
+    with pytest.raises(Retry):
+        tasks.merge_candidate_results(["s0", "s1"], "task-1", {}, 5, time.time() + 60)
+    assert task_updates == []
+
+    # Shard 1 never ran, say because its queue has no consumer
+    result = tasks.merge_candidate_results(["s0", "s1"], "task-1", {}, 5, time.time() - 1)
+    assert [candidate["id"] for candidate in result["candidates"]] == ["c1"]
+    assert (result["shards"], result["partial_shards"], result["partial"]) == (2, [1], True)
+    assert revoked == [["s1"]]
+    assert task_updates[0][:2] == ("task-1", "completed")
+
+
+def test_search_fans_out_to_the_configured_shard_count(monkeypatch, task_updates, celery_memory):
+    from app.worker import celery_app
+
+    candidates = make_candidates(40)
+    # Eager runs still create the app's result backend; celery_memory keeps it off Redis
+    monkeypatch.setitem(celery_app.conf, "task_always_eager", True)
+    monkeypatch.setattr(settings, "SEARCH_SHARD_COUNT", 3)
+    monkeypatch.setattr(
+        tasks, "load_shard",
+        lambda shard_index, shard_count, ttl: [c for c in candidates if shard_for(c["id"], shard_count) == shard_index],
+    )
+
+    # A caller cannot choose how many shard tasks a search starts
+    result = tasks.search_candidates.apply(
+        args=("task-1",), kwargs={"search_criteria": {"skills": ["Python"]}, "top_k": 5, "shard_count": 1000}
+    ).get()
+
+    assert result["shards"] == 3
+    assert result["candidates_scanned"] == 40
+    assert result["partial"] is False
+    assert [status for _, status, _ in task_updates] == ["running", "completed"]
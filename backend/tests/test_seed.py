@@ -0,0 +1,16 @@
+"""
+Unit tests for the one-shot sample-agent seed command.
+"""
+
+from app import seed
+
+
+def test_seeds_an_empty_agents_table(db):
+    assert seed.seed_agents() == 3
+    assert {agent["type"] for agent in db.tables["agents"]} == {"recruiter", "processor", "matcher"}
+
+
+def test_existing_agents_are_left_alone(db):
+    db.table("agents").insert({"id": "agent-1", "name": "Existing"}).execute()
+    assert seed.seed_agents() == 0
+    assert len(db.tables["agents"]) == 1
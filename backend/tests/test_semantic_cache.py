@@ -0,0 +1,161 @@
+"""
+Unit tests for the semantic cache of candidate searches.
+"""
+
+import asyncio
+import json
+
+import pytest
+from agents import RunConfig
+
+from app.core import semantic_cache
+from app.core.config import settings
+from app.core.semantic_cache import SemanticCache, local_embedding, normalize_query, similarity
+from benchmarks.fakes import FakeModelProvider
+
+
+class FakePipeline:
+    """Queues calls and returns their results on execute."""
+
+    def __init__(self, redis):
+        self.redis = redis
+        self.results = []
+
+    def __getattr__(self, name):
+        method = getattr(self.redis, name)
+        return lambda *args, **kwargs: self.results.append(method(*args, **kwargs))
+
+    def execute(self):
+        results, self.results = self.results, []
+        return results
+
+
+class FakeRedis:
+    """Hash commands in memory; expiry of whole keys is ignored."""
+
+    def __init__(self):
+        self.hashes = {}
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    def hset(self, key, field, value):
+        self.hashes.setdefault(key, {})[field] = value
+
+    def hget(self, key, field):
+        return self.hashes.get(key, {}).get(field)
+
+    def hgetall(self, key):
+        return dict(self.hashes.get(key, {}))
+
+    def hdel(self, key, *fields):
+        for field in fields:
+            self.hashes.get(key, {}).pop(field, None)
+
+    def hlen(self, key):
+        return len(self.hashes.get(key, {}))
+
+    def expire(self, key, seconds):
+        pass
+
+
+@pytest.fixture
+def cache():
+    return SemanticCache(FakeRedis(), threshold=0.95, ttl=60, max_entries=3)
+
+
+def searcher(answer="results", tokens=1000):
+    calls = []
+
+    async def run():
+        calls.append(1)
+        return f"{answer} {len(calls)}", tokens
+
+    return run, calls
+
+
+def test_paraphrases_normalize_alike():
+    assert normalize_query("senior python backend SF") == "senior python backend san francisco"
+    assert normalize_query("Sr. Python backend engineer San Francisco") == "senior python backend san francisco"
+
+
+def test_similarity_separates_different_searches():
+    base = local_embedding(normalize_query("senior python backend SF"))
+    assert similarity(base, local_embedding(normalize_query("python backend senior, San Francisco"))) > 0.99
+    assert similarity(base, local_embedding(normalize_query("senior java backend SF"))) < 0.95
+    assert similarity(base, local_embedding(normalize_query("senior python backend postgres SF"))) < 0.95
+
+
+def test_paraphrase_hits_within_tenant_and_filters(cache):
+    run, calls = searcher()
+
+    async def scenario():
+        first = await cache.get_or_run("t1", "senior python backend SF", {"remote": True}, run)
+        paraphrase = await cache.get_or_run("t1", "Sr. Python backend engineer San Francisco", {"remote": True}, run)
+        other_tenant = await cache.get_or_run("t2", "senior python backend SF", {"remote": True}, run)
+        other_filters = await cache.get_or_run("t1", "senior python backend SF", {"remote": False}, run)
+        anonymous = await cache.get_or_run(None, "senior python backend SF", {"remote": True}, run)
+        return first, paraphrase, other_tenant, other_filters, anonymous
+
+    first, paraphrase, other_tenant, other_filters, anonymous = asyncio.run(scenario())
+    assert first == ("results 1", False)
+    assert paraphrase == ("results 1", True)
+    assert other_tenant == ("results 2", False)
+    assert other_filters == ("results 3", False)
+    assert anonymous == ("results 4", False)
+    assert len(calls) == 4
+
+    stats = cache.stats.snapshot()
+    assert stats["hits"] == 1 and stats["misses"] == 3
+    assert stats["hit_rate"] == 0.25
+    assert stats["budget_saved"] == 0.25
+
+
+def test_expired_entries_miss_and_are_dropped(cache, monkeypatch):
+    run, calls = searcher()
+    clock = [1000.0]
+    monkeypatch.setattr(semantic_cache.time, "time", lambda: clock[0])
+
+    asyncio.run(cache.get_or_run("t1", "python backend", None, run))
+    clock[0] += 61
+    result = asyncio.run(cache.get_or_run("t1", "python backend", None, run))
+
+    assert result == ("results 2", False)
+    key = cache.key_for("t1", None)
+    assert len(cache.redis.hashes[f"{key}:vectors"]) == 1
+    assert len(cache.redis.hashes[f"{key}:results"]) == 1
+
+
+def test_oldest_entries_are_evicted(cache):
+    run, _ = searcher()
+    for query in ("python", "java", "golang", "rust"):
+        asyncio.run(cache.get_or_run("t1", query, None, run))
+
+    key = cache.key_for("t1", None)
+    assert len(cache.redis.hashes[f"{key}:vectors"]) == 3
+    assert set(json.loads(value) for value in cache.redis.hashes[f"{key}:results"].values()) == {
+        "results 2", "results 3", "results 4"
+    }
+
+
+def test_search_candidates_reuses_cached_results(monkeypatch):
+    from app.services.agents_sdk_service import AgentSDKService
+
+    provider = FakeModelProvider(p50=0.001, p95=0.002, input_tokens=900, output_tokens=300)
+    calls = []
+    provider.record = lambda stage, seconds: calls.append(stage)
+    service = AgentSDKService(run_config=RunConfig(model_provider=provider))
+    service.search_cache = SemanticCache(FakeRedis())
+    monkeypatch.setattr(settings, "SEMANTIC_CACHE_ENABLED", True)
+
+    async def scenario():
+        first = await service.search_candidates({"job_id": "j1", "title": "Senior Python backend engineer", "location": "SF"}, tenant_id="t1")
+        second = await service.search_candidates({"job_id": "j2", "title": "Sr Python Backend Developer", "location": "San Francisco"}, tenant_id="t1")
+        return first, second
+
+    first, second = asyncio.run(scenario())
+    assert first["cached"] is False and second["cached"] is True
+    assert second["search_results"] == first["search_results"]
+    assert second["job_id"] == "j2"
+    assert calls == ["model"]
+    assert service.search_cache.stats.snapshot()["tokens_saved"] == 1200
@@ -0,0 +1,50 @@
+"""
+Unit tests for the compact msgpack serializer used for Celery messages and results.
+"""
+
+from datetime import datetime
+
+import pytest
+
+from app.core import serialization
+from app.core.config import settings
+from app.schemas.agent import TaskStatus
+
+
+@pytest.fixture(autouse=True)
+def threshold(monkeypatch):
+    monkeypatch.setattr(settings, "CELERY_COMPRESSION_THRESHOLD", 256)
+
+
+def test_small_body_is_not_compressed():
+    body = serialization.dumps({"task_id": "t1"})
+    assert body[:1] == b"\x00"
+    assert serialization.loads(body) == {"task_id": "t1"}
+
+
+@pytest.mark.parametrize("compression,codec", [("gzip", b"\x01"), ("zstd", b"\x02")])
+def test_large_body_is_compressed(monkeypatch, compression, codec):
+    if compression == "zstd" and serialization.zstandard is None:
+        pytest.skip("zstandard not installed")
+    monkeypatch.setattr(settings, "CELERY_COMPRESSION", compression)
+    value = {"assessment": "Recommendation: Interview. " * 100, "scores": list(range(50))}
+
+    body = serialization.dumps(value)
+    assert body[:1] == codec
+    assert len(body) < len(serialization.msgpack.packb(value))
+    assert serialization.loads(body) == value
+
+
+def test_datetimes_and_enums_encode_like_json():
+    value = {"completed_at": datetime(2025, 1, 2, 3, 4, 5), "status": TaskStatus.COMPLETED}
+    assert serialization.loads(serialization.dumps(value)) == {
+        "completed_at": "2025-01-02T03:04:05",
+        "status": "completed",
+    }
+
+
+def test_per_task_serializer_overrides(monkeypatch):
+    monkeypatch.setattr(settings, "CELERY_SERIALIZER", "pladder")
+    monkeypatch.setattr(settings, "CELERY_TASK_SERIALIZERS", "app.tasks.example_task=json")
+    assert serialization.serializer_for("app.tasks.example_task") == "json"
+    assert serialization.serializer_for("app.agents.celery_tasks.process_candidate") == "pladder"
@@ -0,0 +1,217 @@
+"""
+Unit tests for bulk task creation: one insert, one Celery group, one tracking thread.
+"""
+
+import asyncio
+
+import httpx
+import pytest
+
+from app.schemas.agent import TaskStatus
+from app.services.agent_service import AgentService
+
+
+@pytest.fixture
+def db(db):
+    db.table("agents").insert({"id": "agent-1", "name": "Matcher", "type": "matcher", "status": "active"}).execute()
+    return db
+
+
+class FakeGroupResult:
+    """Replays worker messages and results the way join_native delivers them."""
+
+    def __init__(self, messages, results):
+        self.messages = messages
+        self.results = results
+
+    def join_native(self, timeout=None, propagate=True, callback=None, on_message=None):
+        for meta in self.messages:
+            on_message(meta)
+        for task_id, value in self.results:
+            callback(task_id, value)
+        if len(self.results) < len(self.messages):
+            raise TimeoutError("The operation timed out.")
+
+
+def test_batch_endpoint_inserts_once_and_tracks_the_group(db, monkeypatch):
+    from app.main import app
+    from app.api.v1.endpoints.agents import agent_service
+
+    dispatched = []
+    monkeypatch.setattr(agent_service, "_run_batch", lambda batch_id, calls, headers: dispatched.append(calls))
+    tasks = [{"action": "process_candidate", "parameters": {"candidate_id": f"c{i}"}} for i in range(3)]
+    tasks.append({"action": "summarize", "parameters": {}, "ttl": 60})
+
+    async def scenario():
+        async with httpx.AsyncClient(app=app, base_url="http://test") as client:
+            return await client.post("/api/v1/agents/agent-1/tasks:batch", json={"tasks": tasks})
+
+    response = asyncio.run(scenario())
+    body = response.json()
+    assert response.status_code == 200
+    assert body["status"] == "queued"
+    assert body["status_url"] == f"/api/v1/agents/agent-1/batches/{body['batch_id']}"
+
+    assert db.stages.count("db.insert.agent_tasks") == 1
+    rows = db.tables["agent_tasks"]
+    assert [row["id"] for row in rows] == body["task_ids"]
+    assert {row["batch_id"] for row in rows} == {body["batch_id"]}
+
+    calls = dispatched[0]
+    assert [call[1][0] for call in calls] == body["task_ids"]
+    assert calls[0] == (
+        "app.agents.celery_tasks.process_candidate", [body["task_ids"][0]], {"candidate_id": "c0"}, 86400
+    )
+    assert calls[3] == ("app.agents.celery_tasks.process_task", [body["task_ids"][3], "summarize"], {}, 60)
+
+
+def test_batch_endpoint_rejects_unknown_agents_and_oversized_batches(db, monkeypatch):
+    from app.main import app
+    from app.core.config import settings
+
+    monkeypatch.setattr(settings, "TASK_BATCH_MAX_SIZE", 2)
+    task = {"action": "process_candidate", "parameters": {}}
+
+    async def scenario():
+        async with httpx.AsyncClient(app=app, base_url="http://test") as client:
+            unknown = await client.post("/api/v1/agents/agent-2/tasks:batch", json={"tasks": [task]})
+            oversized = await client.post("/api/v1/agents/agent-1/tasks:batch", json={"tasks": [task] * 3})
+            empty = await client.post("/api/v1/agents/agent-1/tasks:batch", json={"tasks": []})
+            return unknown, oversized, empty
+
+    unknown, oversized, empty = asyncio.run(scenario())
+    assert unknown.status_code == 404
+    assert oversized.status_code == 413
+    assert empty.status_code == 422
+    assert db.tables["agent_tasks"] == []
+
+
+def test_send_batch_queues_one_group_with_task_ids(celery_memory):
+    calls = [
+        ("app.agents.celery_tasks.process_candidate", ["task-1"], {"candidate_id": "c1"}, 86400),
+        ("app.agents.celery_tasks.process_task", ["task-2", "summarize"], {}, None),
+    ]
+    group_result = AgentService()._send_batch(calls, {"traceparent": "00-trace-span-01"})
+
+    assert [result.id for result in group_result.results] == ["task-1", "task-2"]
+    assert [message["task_id"] for message in celery_memory] == ["task-1", "task-2"]
+    assert {message["group_id"] for message in celery_memory} == {group_result.id}
+    # Every message goes out through the same producer connection
+    assert len({id(message["producer"]) for message in celery_memory}) == 1
+    assert celery_memory[1]["args"] == ["task-2", "summarize"]
+    assert celery_memory[0]["headers"] == {"traceparent": "00-trace-span-01"}
+    assert celery_memory[0]["expires"] == 86400
+    assert celery_memory[1]["expires"] is None
+
+
+def test_run_batch_records_results_as_they_arrive(db, monkeypatch):
+    from app.core import cancellation
+
+    cancelled = []
+    monkeypatch.setattr(cancellation, "request_cancel", cancelled.append)
+    service = AgentService()
+    for task_id in ("task-1", "task-2", "task-3"):
+        db.table("agent_tasks").insert({
+            "id": task_id, "agent_id": "agent-1", "batch_id": "batch-1", "status": "queued",
+        }).execute()
+
+    group_result = FakeGroupResult(
+        messages=[
+            {"task_id": "task-2", "status": "running"},
+            {"task_id": "task-1", "status": "running"},
+            {"task_id": "task-3", "status": "running"},
+        ],
+        results=[("task-2", {"score": 84}), ("task-1", RuntimeError("model unavailable"))],
+    )
+    monkeypatch.setattr(service, "_send_batch", lambda calls, headers: group_result)
+    calls = [("app.agents.celery_tasks.process_candidate", [task_id], {}, None) for task_id in ("task-1", "task-2", "task-3")]
+    service._run_batch("batch-1", calls)
+
+    rows = {row["id"]: row for row in db.tables["agent_tasks"]}
+    assert rows["task-2"]["status"] == "completed"
+    assert rows["task-2"]["result"] == {"score": 84}
+    assert rows["task-1"]["status"] == "failed"
+    assert rows["task-1"]["error"] == "model unavailable"
+    # Still pending when the batch timed out, so stopped before it can run unobserved
+    assert cancelled == [["task-3"]]
+    assert rows["task-3"]["status"] == "failed"
+    assert rows["task-3"]["error"] == "The operation timed out."
+    assert all(row["started_at"] for row in rows.values())
+
+    progress = service.get_batch_progress("agent-1", "batch-1")
+    assert progress["total"] == 3
+    assert progress["counts"][TaskStatus.FAILED] == 2
+    assert progress["finished"] is True
+    assert service.get_batch_progress("agent-1", "batch-2") is None
+
+
+def test_run_batch_follows_tasks_for_as_long_as_they_may_wait(db, monkeypatch):
+    from app.core import cancellation
+    from app.core.config import settings
+
+    class SlowGroupResult:
+        """Delivers a result only to a join that waits long enough for it."""
+
+        def join_native(self, timeout=None, propagate=True, callback=None, on_message=None):
+            self.timeout = timeout
+            if timeout < 2 * 3600:
+                raise TimeoutError("The operation timed out.")
+            callback("task-1", {"score": 84})
+
+    cancelled = []
+    monkeypatch.setattr(cancellation, "request_cancel", cancelled.append)
+    db.table("agent_tasks").insert({"id": "task-1", "agent_id": "agent-1", "batch_id": "batch-1", "status": "queued"}).execute()
+    service = AgentService()
+    group_result = SlowGroupResult()
+    monkeypatch.setattr(service, "_send_batch", lambda calls, headers: group_result)
+
+    # Queued for a day, the task runs two hours into the batch
+    service._run_batch("batch-1", [
+        ("app.agents.celery_tasks.process_candidate", ["task-1"], {}, 86400),
+        ("app.agents.celery_tasks.process_task", ["task-2", "summarize"], {}, 60),
+    ])
+
+    assert group_result.timeout == 86400 + settings.AGENT_TASK_TIME_LIMIT
+    assert db.tables["agent_tasks"][0]["status"] == "completed"
+    assert cancelled == []
+
+
+def test_search_tasks_use_the_callers_tenant_cache(db, celery_memory):
+    from app.schemas.agent import AgentTask
+
+    service = AgentService()
+    search = AgentTask(action="search_candidates", parameters={"tenant_id": "someone-else"})
+    service.create_task("agent-1", search, tenant_id="org-1")
+    service.create_task("agent-1", AgentTask(action="process_candidate", parameters={"candidate_id": "c1"}), tenant_id="org-1")
+    # Without a known caller the search skips the cache rather than trusting its parameters
+    service.create_task("agent-1", search)
+
+    tenant_search, process, anonymous_search = celery_memory
+    assert tenant_search["kwargs"]["tenant_id"] == "org-1"
+    assert "tenant_id" not in process["kwargs"]
+    assert "tenant_id" not in anonymous_search["kwargs"]
+
+
+def test_batch_endpoint_passes_the_callers_tenant(db, monkeypatch):
+    from app.main import app
+    from app.api.v1.endpoints.agents import agent_service
+    from app.core.auth import get_optional_user
+
+    dispatched = []
+    monkeypatch.setattr(agent_service, "_run_batch", lambda batch_id, calls, headers: dispatched.append(calls))
+    tasks = [{"action": "search_candidates", "parameters": {"job_requirements": "python"}}]
+
+    async def scenario():
+        async with httpx.AsyncClient(app=app, base_url="http://test") as client:
+            return await client.post("/api/v1/agents/agent-1/tasks:batch", json={"tasks": tasks})
+
+    app.dependency_overrides[get_optional_user] = lambda: {"sub": "user-1", "app_metadata": {"tenant_id": "org-1"}}
+    try:
+        assert asyncio.run(scenario()).status_code == 200
+    finally:
+        app.dependency_overrides.clear()
+    assert asyncio.run(scenario()).status_code == 200
+
+    [[(_, _, signed_in, _)], [(_, _, anonymous, _)]] = dispatched
+    assert signed_in["tenant_id"] == "org-1"
+    assert "tenant_id" not in anonymous
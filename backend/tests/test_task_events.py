@@ -0,0 +1,132 @@
+"""
+Unit tests for long-polling task status over pub/sub notifications.
+"""
+
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from app.core import task_events
+
+
+class FakePubSub:
+    """Just enough of redis.asyncio's PubSub, delivering in-process publishes."""
+
+    def __init__(self):
+        self.channels = set()
+        self.messages = asyncio.Queue()
+
+    async def subscribe(self, channel):
+        self.channels.add(channel)
+
+    async def unsubscribe(self, channel):
+        self.channels.discard(channel)
+
+    async def get_message(self, ignore_subscribe_messages=True, timeout=1.0):
+        try:
+            return await asyncio.wait_for(self.messages.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def publish(self, channel, data):
+        if channel in self.channels:
+            self.messages.put_nowait({"type": "message", "channel": channel.encode(), "data": data})
+
+    async def close(self):
+        pass
+
+
+@pytest.fixture
+def pubsub(monkeypatch, db):
+    # Set up after db, which drops task notifications, so these reach the fake instead
+    fake = FakePubSub()
+    hub = task_events.TaskEventHub()
+
+    async def connected():
+        hub._pubsub = fake
+        return fake
+
+    monkeypatch.setattr(hub, "_ensure_connected", connected)
+    monkeypatch.setattr(task_events, "_hub", hub)
+    monkeypatch.setattr(
+        task_events, "publish_task_update", lambda task_id, status: fake.publish(task_events.channel_for(task_id), status)
+    )
+    return fake
+
+
+@pytest.fixture
+def db(db):
+    db.table("agent_tasks").insert({
+        "id": "task-1",
+        "agent_id": "agent-1",
+        "status": "running",
+        "created_at": "2026-01-02T00:00:00+00:00",
+        "updated_at": "2026-01-02T00:00:00+00:00",
+    }).execute()
+    return db
+
+
+def test_hub_wakes_waiters_and_unsubscribes_idle_channels(pubsub):
+    async def scenario():
+        hub = task_events.get_event_hub()
+        first = await hub.subscribe("task-1")
+        second = await hub.subscribe("task-1")
+        pubsub.publish("task-status:task-1", "completed")
+        await asyncio.wait_for(first.wait(), 1)
+        await asyncio.wait_for(second.wait(), 1)
+
+        await hub.unsubscribe("task-1", first)
+        assert pubsub.channels == {"task-status:task-1"}
+        await hub.unsubscribe("task-1", second)
+        assert pubsub.channels == set()
+        await hub.close()
+
+    asyncio.run(scenario())
+
+
+def test_long_poll_returns_when_the_task_finishes(pubsub, db):
+    from app.main import app
+    from app.api.v1.endpoints.agents import agent_service
+    from app.schemas.agent import TaskStatus
+
+    async def scenario():
+        async with httpx.AsyncClient(app=app, base_url="http://test") as client:
+            start = time.perf_counter()
+            poll = asyncio.create_task(client.get("/api/v1/agents/agent-1/tasks/task-1?wait=10"))
+            await asyncio.sleep(0.2)
+            assert not poll.done()
+
+            agent_service.update_task_status("task-1", TaskStatus.COMPLETED, result={"score": 84})
+            response = await asyncio.wait_for(poll, 2)
+            elapsed = time.perf_counter() - start
+
+            # Finished tasks are answered at once
+            start_finished = time.perf_counter()
+            finished = await client.get("/api/v1/agents/agent-1/tasks/task-1?wait=10")
+            return response, elapsed, finished, time.perf_counter() - start_finished
+
+    response, elapsed, finished, finished_elapsed = asyncio.run(scenario())
+    assert response.json()["status"] == "completed"
+    assert elapsed < 2
+    assert finished.json()["result"] == {"score": 84}
+    assert finished_elapsed < 1
+    assert pubsub.channels == set()
+
+
+def test_long_poll_times_out_with_unchanged_status(pubsub, db):
+    from app.main import app
+
+    async def scenario():
+        async with httpx.AsyncClient(app=app, base_url="http://test") as client:
+            first = await client.get("/api/v1/agents/agent-1/tasks/task-1")
+            start = time.perf_counter()
+            response = await client.get(
+                "/api/v1/agents/agent-1/tasks/task-1?wait=0.3", headers={"If-None-Match": first.headers["ETag"]}
+            )
+            return response, time.perf_counter() - start
+
+    response, elapsed = asyncio.run(scenario())
+    assert response.status_code == 304
+    assert 0.3 <= elapsed < 2
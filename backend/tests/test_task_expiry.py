@@ -0,0 +1,49 @@
+"""
+Unit tests for task time-to-live: per-action defaults, expires on send, and expired drops.
+"""
+
+from datetime import datetime, timedelta, timezone
+
+from app.core.config import settings
+from app.schemas.agent import AgentTask
+from app.services.agent_service import AgentService, task_ttl
+
+
+def test_ttl_prefers_the_request_then_the_action_then_the_default(monkeypatch):
+    monkeypatch.setattr(settings, "TASK_TTL_BY_ACTION", "search_candidates=7200, process_candidate=120")
+
+    assert task_ttl(AgentTask(action="process_candidate", ttl=30), 300) == 30
+    assert task_ttl(AgentTask(action="process_candidate"), 300) == 120
+    assert task_ttl(AgentTask(action="search_candidates"), 86400) == 7200
+    assert task_ttl(AgentTask(action="summarize"), 300) == 300
+
+
+def test_single_tasks_are_sent_with_the_interactive_ttl(db, celery_memory):
+    task_id = AgentService().create_task("agent-1", AgentTask(action="process_candidate", parameters={}))
+
+    assert celery_memory[0]["task_id"] == task_id
+    assert celery_memory[0]["expires"] == settings.TASK_TTL_INTERACTIVE
+
+
+def test_workers_drop_expired_messages_and_mark_them_expired(db, monkeypatch):
+    from celery.contrib.testing.mocks import TaskMessage
+    from celery.worker.request import Request
+
+    from app.agents import celery_tasks
+    from app.worker import celery_app
+
+    monkeypatch.setitem(celery_app.conf, "result_backend", "cache+memory://")
+    db.table("agent_tasks").insert({"id": "task-1", "agent_id": "agent-1", "status": "queued"}).execute()
+    ran = []
+    monkeypatch.setattr(celery_tasks.agent_sdk_service, "process_candidate", lambda *args: ran.append(args))
+
+    name = "app.agents.celery_tasks.process_candidate"
+    expired_at = datetime.now(timezone.utc) - timedelta(minutes=5)
+    message = TaskMessage(name, id="task-1", args=["task-1"], expires=expired_at.isoformat())
+    request = Request(message, app=celery_app, task=celery_app.tasks[name])
+
+    assert request.revoked() is True
+    assert ran == []
+    row = db.tables["agent_tasks"][0]
+    assert row["status"] == "expired"
+    assert row["completed_at"]
@@ -0,0 +1,145 @@
+"""
+Unit tests for bulk task status queries and batch progress counters.
+"""
+
+import asyncio
+
+import httpx
+import pytest
+
+from app.core import batch_progress, redis_client
+from app.schemas.agent import TaskStatus
+from app.services.agent_service import AgentService
+
+
+class FakeRedis:
+    """Hash commands and script calls, recorded in memory."""
+
+    def __init__(self):
+        self.hashes = {}
+        self.script_calls = []
+
+    def hmget(self, key, fields):
+        values = self.hashes.get(key, {})
+        return [values.get(field) for field in fields]
+
+    def register_script(self, script):
+        def call(keys, args, client=None):
+            self.script_calls.append((keys, args))
+        return call
+
+
+@pytest.fixture
+def db(db):
+    for i, status in enumerate(["queued", "running", "completed", "failed"]):
+        db.table("agent_tasks").insert({
+            "id": f"task-{i}",
+            "agent_id": "agent-1",
+            "batch_id": "batch-1",
+            "status": status,
+            "result": {"score": i} if status == "completed" else None,
+            "created_at": "2026-01-02T00:00:00+00:00",
+            "updated_at": "2026-01-02T00:00:00+00:00",
+        }).execute()
+    return db
+
+
+@pytest.fixture
+def redis(monkeypatch):
+    fake = FakeRedis()
+    monkeypatch.setattr(redis_client, "get_redis", lambda: fake)
+    monkeypatch.setattr(batch_progress, "_transition", None)
+    return fake
+
+
+def test_bulk_status_uses_one_query_and_keeps_request_order(db):
+    from app.main import app
+
+    async def scenario():
+        async with httpx.AsyncClient(app=app, base_url="http://test") as client:
+            lean = await client.post(
+                "/api/v1/tasks/status:bulk",
+                json={"agent_id": "agent-1", "task_ids": ["task-2", "task-9", "task-0", "task-2"]},
+            )
+            full = await client.post(
+                "/api/v1/tasks/status:bulk",
+                json={"agent_id": "agent-1", "task_ids": ["task-2"], "include_results": True},
+            )
+            return lean, full
+
+    db.stages.clear()
+    lean, full = asyncio.run(scenario())
+    assert db.stages.count("db.select.agent_tasks") == 2
+
+    body = lean.json()
+    assert [task["task_id"] for task in body["tasks"]] == ["task-2", "task-0"]
+    assert [task["status"] for task in body["tasks"]] == ["completed", "queued"]
+    assert body["tasks"][0]["agent_id"] == "agent-1"
+    assert body["missing"] == ["task-9"]
+    assert full.json()["tasks"][0]["result"] == {"score": 2}
+
+
+def test_bulk_status_rejects_too_many_ids(db, monkeypatch):
+    from app.main import app
+    from app.core.config import settings
+
+    monkeypatch.setattr(settings, "TASK_STATUS_BULK_MAX_IDS", 2)
+
+    async def scenario():
+        async with httpx.AsyncClient(app=app, base_url="http://test") as client:
+            return await client.post("/api/v1/tasks/status:bulk", json={"agent_id": "agent-1", "task_ids": ["a", "b", "c"]})
+
+    assert asyncio.run(scenario()).status_code == 413
+
+
+def test_bulk_status_only_returns_the_agents_own_tasks(db):
+    from app.main import app
+
+    async def scenario():
+        async with httpx.AsyncClient(app=app, base_url="http://test") as client:
+            other = await client.post(
+                "/api/v1/tasks/status:bulk", json={"agent_id": "agent-2", "task_ids": ["task-2"], "include_results": True}
+            )
+            unscoped = await client.post("/api/v1/tasks/status:bulk", json={"task_ids": ["task-2"]})
+            return other, unscoped
+
+    other, unscoped = asyncio.run(scenario())
+    assert other.json() == {"tasks": [], "missing": ["task-2"]}
+    assert unscoped.status_code == 422
+
+
+def test_batch_progress_reads_counters_without_scanning(db, redis):
+    redis.hashes["task-batch:batch-1"] = {
+        "agent_id": b"agent-1", "total": b"4", "queued": b"0", "running": b"1", "completed": b"2", "failed": b"1",
+    }
+    db.stages.clear()
+    progress = AgentService().get_batch_progress("agent-1", "batch-1")
+
+    assert db.stages == []
+    assert progress["total"] == 4
+    assert progress["counts"][TaskStatus.COMPLETED] == 2
+    assert progress["finished"] is False
+    # Another agent's batch stays hidden
+    assert AgentService().get_batch_progress("agent-2", "batch-1") is None
+
+
+def test_batch_progress_falls_back_to_the_database(db, redis):
+    progress = AgentService().get_batch_progress("agent-1", "batch-1")
+
+    assert db.stages.count("db.select.agent_tasks") == 1
+    assert progress["total"] == 4
+    assert progress["counts"] == {
+        status: int(status not in (TaskStatus.CANCELLED, TaskStatus.EXPIRED)) for status in TaskStatus
+    }
+
+
+def test_batch_status_updates_move_counters(db, redis):
+    service = AgentService()
+    service.update_task_status("task-0", TaskStatus.RUNNING, batch_id="batch-1")
+    service.update_tasks_status(["task-0", "task-1"], TaskStatus.FAILED, error="timed out", batch_id="batch-1")
+    service.update_task_status("task-3", TaskStatus.COMPLETED)
+
+    assert redis.script_calls == [
+        (["task-batch:batch-1"], ["running", "task-0"]),
+        (["task-batch:batch-1"], ["failed", "task-0", "task-1"]),
+    ]
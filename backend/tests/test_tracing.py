@@ -0,0 +1,60 @@
+"""
+Unit tests for trace propagation from the API into Celery tasks.
+"""
+
+import json
+import time
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("opentelemetry.sdk")
+
+from opentelemetry import trace
+
+from app.core import tracing
+from app.core.config import settings
+
+
+@pytest.fixture(scope="module")
+def trace_file(tmp_path_factory):
+    path = tmp_path_factory.mktemp("traces") / "spans.jsonl"
+    patch = pytest.MonkeyPatch()
+    patch.setattr(settings, "TRACING_ENABLED", True)
+    patch.setattr(settings, "TRACING_SAMPLE_RATIO", 1.0)
+    patch.setattr(settings, "OTEL_EXPORTER_OTLP_ENDPOINT", "")
+    patch.setattr(settings, "TRACING_FILE", str(path))
+    assert tracing.init_tracing("pladder-test")
+    yield path
+    patch.undo()
+
+
+def _spans(path):
+    trace.get_tracer_provider().force_flush()
+    return {span["name"]: span for span in map(json.loads, path.read_text().splitlines())}
+
+
+def test_celery_task_continues_publisher_trace(trace_file):
+    with tracing.span("api.create_task") as parent:
+        headers = tracing.inject_headers()
+    trace_id = format(parent.get_span_context().trace_id, "#034x")
+
+    request = {**headers, "enqueued_at": time.time() - 0.5}
+    task = SimpleNamespace(name="app.agents.celery_tasks.process_candidate", request=request)
+    tracing.on_task_prerun(task_id="task-1", task=task)
+    with tracing.span("agent.run"):
+        pass
+    tracing.on_task_postrun(task_id="task-1", state="SUCCESS")
+
+    spans = _spans(trace_file)
+    task_span = spans["celery.task app.agents.celery_tasks.process_candidate"]
+    assert task_span["context"]["trace_id"] == trace_id
+    assert spans["celery.broker_wait"]["context"]["trace_id"] == trace_id
+    assert spans["agent.run"]["parent_id"] == task_span["context"]["span_id"]
+
+
+def test_helpers_are_noops_when_disabled(monkeypatch):
+    monkeypatch.setattr(tracing, "_tracer", None)
+    assert tracing.inject_headers() == {}
+    with tracing.span("ignored") as current:
+        assert current is None
@@ -0,0 +1,46 @@
+"""
+Unit tests for the per-thread event loops Celery tasks run on.
+"""
+
+import threading
+
+import anyio._backends._asyncio  # noqa: F401  imported lazily on first use, which threads would race
+import pytest
+
+from app.agents.celery_tasks import close_worker_loop, get_worker_loop, run_async_in_celery
+from app.core import openai_client
+
+
+@pytest.fixture(autouse=True)
+def api_key(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+
+
+async def pooled_client():
+    return openai_client.get_openai_client()
+
+
+def test_threads_run_tasks_on_their_own_loops_and_clients():
+    seen = {}
+    barrier = threading.Barrier(4)
+
+    def worker(name):
+        loop = get_worker_loop()
+        # Every thread is running tasks at the same time
+        barrier.wait()
+        clients = [run_async_in_celery(pooled_client()) for _ in range(2)]
+        close_worker_loop()
+        seen[name] = (loop, clients)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len({id(loop) for loop, _ in seen.values()}) == 4
+    for loop, (first, second) in seen.values():
+        # Reused across a thread's tasks, closed with its loop
+        assert first is second
+        assert first.is_closed() and loop.is_closed()
+    assert len({id(clients[0]) for _, clients in seen.values()}) == 4